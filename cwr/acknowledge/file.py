@@ -1,23 +1,36 @@
 # -*- coding: utf-8 -*-
 
 import codecs
+import copy
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
-import sys
 from config_cwr.accessor import CWRConfiguration
 from cwr.acknowledgement import AcknowledgementRecord, MessageRecord
 from cwr.file import CWRFile, FileTag
 from cwr.group import Group, GroupHeader, GroupTrailer
-from cwr.interested_party import IPTerritoryOfControlRecord
-from cwr.parser.encoder.file import default_file_encoder
+from cwr.parser.decoder.file import default_filename_decoder, \
+    default_stream_decoder
+from cwr.parser.decoder.reader import MappedFileReader
+from cwr.parser.encoder.file import default_file_writer
 
 from cwr.record import TransactionRecord
 from cwr.transmission import Transmission, TransmissionTrailer, TransmissionHeader
+from cwr.utils.pool import default_window, imap_unordered
 from cwr.utils.printer import CWRPrinter
+from cwr.utils.territory import TerritoryEngine
 from cwr.validation.common import ValidationStatus, NPValidationStatus
 from cwr.validation.transaction import ValidationTransaction
 
 """
 Class generate acknowledgement file"
+
+The sequence numbers of the acknowledgement groups, transactions and records
+are kept by each instance, so several files can be acknowledged at the same
+time, and the acknowledge_files function acknowledges a batch of files on a
+pool of processes, writing each acknowledgement as it is created.
 """
 
 __author__ = 'Yaroslav O. Golub'
@@ -52,6 +65,10 @@ class AcknowledgeFile(object):
                                                self.config['sender_name'],
                                                self.config['sender_type'])
         self._acknowledge = CWRFile(tag, transmission)
+        self._validation = ValidationTransaction(self.config)
+        self._territories = TerritoryEngine(
+            hierarchy=self.config.get('tis_hierarchy'))
+        self._tis_mask = self._society_mask(self.config['tis'].values())
 
     @staticmethod
     def _year():
@@ -64,17 +81,21 @@ class AcknowledgeFile(object):
     def _version():
         return "2.1"
 
+    def _society_mask(self, codes):
+        # Groups such as the World stand for more than the society
+        # territories, so only the countries listed, and the groups without
+        # known countries, make up the society mask
+        concrete = set(self._territories.countries)
+        concrete.update(self._territories.unresolved)
+
+        return self._territories.mask(
+            *[code for code in codes if int(code) in concrete])
+
     def validate_tis(self, transaction):
-        tis_number = self.config['tis'].values()
-        for record in transaction:
-            if isinstance(record, IPTerritoryOfControlRecord):
-                if record.tis_numeric_code in tis_number:
-                    return True
-        return False
+        return self._territories.covers(transaction, self._tis_mask)
 
     def validate(self, transaction):
-        validation = ValidationTransaction(self.config)
-        return validation.validate(transaction)
+        return self._validation.validate(transaction)
 
     def validate_transaction(self, transaction):
         if self.validate_tis(transaction):
@@ -82,33 +103,76 @@ class AcknowledgeFile(object):
         else:
             return NPValidationStatus()
 
+    def acknowledge_transaction(self, original_group_id, transaction):
+        status = self.validate_transaction(transaction)
+        return AcknowledgeTransaction(original_group_id, transaction,
+                                      status.code, status.message)
+
     def acknowledge_cwr_file(self, cwr_file):
         assert isinstance(cwr_file, CWRFile)
         for group in cwr_file.transmission.groups:
             ack_group = AcknowledgeGroup(group)
             for transaction in group.transactions:
-                status = self.validate_transaction(transaction)
-                ack_transaction = AcknowledgeTransaction(group.group_header.group_id, transaction, status.code, status.message)
+                ack_transaction = self.acknowledge_transaction(
+                    group.group_header.group_id, transaction)
                 ack_group.append_transaction(ack_transaction)
             self._acknowledge.transmission.append_group(ack_group)
 
+    def write_parts(self, parts, handle):
+        """
+        Acknowledges the parts of a transmission, as returned by a
+        StreamFileDecoder, writing the acknowledgement into the handle as
+        each transaction is read.
+
+        Only the acknowledgement header is kept, so the memory used does not
+        depend on the size of the file.
+
+        :param parts: iterable with the transmission parts
+        :param handle: the file handle to write into
+        :return: the TransmissionTrailer written
+        """
+        writer = default_file_writer(handle, 'latin-1')
+        writer.write_header(self._acknowledge.transmission.header)
+
+        group_sequence = SequenceGenerator(1)
+        transaction_sequence = None
+        original_group_id = None
+        trailer = None
+        for part in parts:
+            if isinstance(part, GroupHeader):
+                original_group_id = part.group_id
+                transaction_sequence = SequenceGenerator(0)
+                writer.start_group(acknowledge_group_header(
+                    part, group_sequence.get()))
+            elif isinstance(part, GroupTrailer):
+                writer.end_group()
+            elif isinstance(part, TransmissionTrailer):
+                trailer = writer.write_trailer()
+            elif isinstance(part, list):
+                ack_transaction = self.acknowledge_transaction(
+                    original_group_id, part)
+                ack_transaction.transaction_sequence_n = \
+                    transaction_sequence.get()
+                writer.write_transaction(ack_transaction.records)
+
+        if trailer is None:
+            raise ValueError('The transmission has no trailer')
+
+        return trailer
+
     def print(self, path):
         output = codecs.open(path + '.ack.parsed', 'w', 'latin-1')
         printer = CWRPrinter()
         printer.print_file(self._acknowledge, output)
 
     def encode(self, path):
-        output = codecs.open(path + '.ack', 'w', 'latin-1')
-        out_old = sys.stdout
-        sys.stdout = output
-        file_encoder = default_file_encoder()
-        result = file_encoder.encode(self._acknowledge.transmission)
-        print(result)
-        sys.stdout = out_old
+        transmission = self._acknowledge.transmission
+        with open(path + '.ack', 'wb') as output:
+            writer = default_file_writer(output, 'latin-1')
+            writer.write_transmission(transmission.header, transmission.groups)
 
 
 class AcknowledgeTransmission(Transmission):
-    group_sequence = SequenceGenerator(0)
 
     def __init__(self, sender_id, sender_name, sender_type):
         record_type = 'HDR'
@@ -120,63 +184,74 @@ class AcknowledgeTransmission(Transmission):
                                     sender_type=sender_type,
                                     creation_date_time=creation_date_time,
                                     transmission_date=transmission_date)
-        trailer = TransmissionTrailer(record_type='TRL')
+        # Header and trailer records are counted
+        trailer = TransmissionTrailer(record_type='TRL', record_count=2)
         super(AcknowledgeTransmission, self).__init__(header=header, trailer=trailer)
+        self._group_sequence = SequenceGenerator(1)
 
     def append_group(self, group):
         assert isinstance(group, AcknowledgeGroup)
         if self.groups is None:
             self.groups = []
-        group.group_header.group_id = self.group_sequence.get()
-        group.group_trailer.group_id = self.group_sequence.get()
+        group_id = self._group_sequence.get()
+        group.group_header.group_id = group_id
+        group.group_trailer.group_id = group_id
         self.groups.append(group)
         self.trailer.group_count += 1
         self.trailer.transaction_count += group.group_trailer.transaction_count
         self.trailer.record_count += group.group_trailer.record_count
 
 
+def acknowledge_group_header(original_header, group_id=0):
+    return GroupHeader(record_type='GRH',
+                       group_id=group_id,
+                       transaction_type='ACK',
+                       batch_request_id=original_header.batch_request_id)
+
+
 class AcknowledgeGroup(Group):
-    transactions_sequence = SequenceGenerator(0)
 
     def __init__(self, original_group):
-        header = GroupHeader(record_type='GRH',
-                             transaction_type='ACK',
-                             batch_request_id=original_group.group_header.batch_request_id)
-        trailer = GroupTrailer(record_type='GRT')
+        header = acknowledge_group_header(original_group.group_header)
+        # Header and trailer records are counted
+        trailer = GroupTrailer(record_type='GRT', record_count=2)
         super(AcknowledgeGroup, self).__init__(group_header=header, group_trailer=trailer)
+        self._transactions_sequence = SequenceGenerator(0)
 
     def append_transaction(self, transaction):
         assert isinstance(transaction, AcknowledgeTransaction)
-        transaction.transaction_sequence_n = self.transactions_sequence.get()
+        transaction.transaction_sequence_n = self._transactions_sequence.get()
         self.transactions.append(transaction.records)
         self.group_trailer.transaction_count += 1
         self.group_trailer.record_count += len(transaction.records)
 
 
 class AcknowledgeTransaction(object):
-    record_sequence = SequenceGenerator(0)
-
-    _transaction_sequence_n = 0
 
     def __init__(self, original_group_id, transaction, status, message=''):
         self._records = []
+        self._transaction_sequence_n = 0
         original_transaction = transaction[0]
         ack = AcknowledgementRecord(record_type='ACK',
-                                    record_sequence_n=self.record_sequence.get(),
                                     original_group_id=original_group_id,
                                     original_transaction_sequence_n=original_transaction.transaction_sequence_n,
                                     original_transaction_type=original_transaction.record_type,
                                     transaction_status=status,
                                     creation_date_time=date.today(),
                                     processing_date=date.today(),
-                                    creation_title=original_transaction.title,
+                                    creation_title=getattr(
+                                        original_transaction, 'title', ''),
                                     submitter_creation_n='',
                                     recipient_creation_n='')
         self._records.append(ack)
         #if message:
         #    records.append(MessageRecord())
+        # The records are copied, so the original ones keep their sequence
+        # numbers
         for rec in transaction:
-            self._records.append(rec)
+            self._records.append(copy.copy(rec))
+        for record_sequence_n, record in enumerate(self._records):
+            record.record_sequence_n = record_sequence_n
 
     @property
     def transaction_sequence_n(self):
@@ -200,3 +275,69 @@ class AcknowledgeTransaction(object):
 def example_acknowledge_file(sequence_n, reciver):
     config = CWRConfiguration()
     return AcknowledgeFile(config.load_acknowledge_config('example'), sequence_n, reciver)
+
+
+AcknowledgeResult = namedtuple('AcknowledgeResult',
+                               ['path', 'output', 'seconds', 'error'])
+
+# Decoders used by the processes acknowledging files
+_worker_decoder = None
+_worker_filename_decoder = None
+
+
+def _init_worker(mode):
+    global _worker_decoder
+    global _worker_filename_decoder
+    _worker_decoder = default_stream_decoder(mode)
+    _worker_filename_decoder = default_filename_decoder()
+
+
+def _acknowledge_file(path, config, sequence_n, directory):
+    start = time.perf_counter()
+    output = os.path.join(directory, os.path.basename(path) + '.ack')
+    try:
+        tag = _worker_filename_decoder.decode(os.path.basename(path))
+        acknowledge = AcknowledgeFile(config, sequence_n, tag.sender)
+        with MappedFileReader(path) as reader, open(output, 'wb') as handle:
+            acknowledge.write_parts(_worker_decoder.decode(reader.lines()),
+                                    handle)
+    except Exception as e:
+        if os.path.exists(output):
+            os.remove(output)
+        return AcknowledgeResult(path, None, time.perf_counter() - start,
+                                 '%s: %s' % (type(e).__name__, e))
+
+    return AcknowledgeResult(path, output, time.perf_counter() - start, None)
+
+
+def acknowledge_files(paths, config, directory, sequence_n=1, processes=None,
+                      mode='layout'):
+    """
+    Acknowledges CWR files on a pool of processes.
+
+    Each file is read and acknowledged as a stream, writing its
+    acknowledgement into the directory, with the name of the file followed
+    by .ack, and the receiver being the file sender. The acknowledgements
+    receive consecutive sequence numbers, in the order of the paths.
+
+    The results are returned as each file is done, so not in the order of
+    the paths. A file failing does not stop the others. Only a few files more
+    than the processes are submitted at a time.
+
+    :param paths: paths to the files to acknowledge
+    :param config: the acknowledgement configuration
+    :param directory: folder for the acknowledgement files
+    :param sequence_n: sequence number for the first acknowledgement
+    :param processes: number of processes, by default the number of processors
+    :param mode: the parsing mode, 'grammar' or 'layout'
+    :return: a generator for the AcknowledgeResult of each file
+    """
+    with ProcessPoolExecutor(max_workers=processes,
+                             initializer=_init_worker,
+                             initargs=(mode,)) as executor:
+        arguments = ((path, config, sequence_n + index, directory)
+                     for index, path in enumerate(paths))
+
+        for result in imap_unordered(executor, _acknowledge_file, arguments,
+                                     default_window(processes)):
+            yield result
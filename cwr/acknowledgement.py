@@ -16,6 +16,11 @@ class AcknowledgementRecord(TransactionRecord):
     Represents a CWR Acknowledgement of Transaction (ACK).
     """
 
+    __slots__ = ('_original_group_id', '_original_transaction_sequence_n',
+                 '_original_transaction_type', '_transaction_status',
+                 '_creation_date_time', '_processing_date', '_creation_title',
+                 '_submitter_creation_n', '_recipient_creation_n')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -239,6 +244,10 @@ class MessageRecord(TransactionRecord):
     registration has been rejected.
     """
 
+    __slots__ = ('_message_type', '_message_text', '_message_level',
+                 '_validation_n', '_original_record_sequence_n',
+                 '_message_record_type')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -24,6 +24,11 @@ class InterestedPartyForAgreementRecord(TransactionRecord):
     agreement.
     """
 
+    __slots__ = ('_ip_n', '_agreement_role_code', '_ipi_name_n', '_ipi_base_n',
+                 '_ip_last_name', '_ip_writer_first_name', '_pr_society',
+                 '_pr_share', '_mr_society', '_mr_share', '_sr_society',
+                 '_sr_share')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -301,6 +306,15 @@ class AgreementRecord(TransactionRecord):
     agreement number, then it too can be used as the link.
     """
 
+    __slots__ = ('_submitter_agreement_n', '_society_assigned_agreement_n',
+                 '_international_standard_code', '_agreement_type',
+                 '_agreement_start_date', '_agreement_end_date',
+                 '_prior_royalty_status', '_prior_royalty_start_date',
+                 '_post_term_collection_status',
+                 '_post_term_collection_end_date', '_sales_manufacture_clause',
+                 '_shares_change', '_advance_given', '_date_of_signature',
+                 '_retention_end_date', '_number_of_works')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -718,6 +732,8 @@ class AgreementTerritoryRecord(TransactionRecord):
     This is to be used in an Agreement Transaction.
     """
 
+    __slots__ = ('_tis_numeric_code', '_inclusion_exclusion_indicator')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -28,6 +28,9 @@ class XrfRecord(TransactionRecord):
       validity           1  alphanum  M  Y=valid, U=link invalid, N=identifier invalid
     """
 
+    __slots__ = ('organisation_code', 'identifier', 'identifier_type',
+                 'validity')
+
     def __init__(self, transaction_sequence_n, record_sequence_n,
                  organisation_code, identifier,
                  identifier_type='W', validity='Y'):
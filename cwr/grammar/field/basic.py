@@ -448,6 +448,69 @@ This accepts only values from a table or list.
 """
 
 
+# Lookup tables, shared by all the fields accepting the same values
+_lookup_tables = {}
+
+
+def lookup_table(values):
+    """
+    Returns the values accepted by a lookup field, grouped by their size.
+
+    The result is a tuple with a pair for each size, the longest first,
+    holding the size and a frozenset with the values of that size. So a value
+    is checked by slicing that many characters and testing if they are in the
+    set, which is much faster than matching an alternation of all the values.
+
+    The tables are created once for each list of values, and shared by all
+    the fields using them.
+
+    :param values: values allowed
+    :return: the values grouped by their size
+    """
+    key = tuple(values)
+
+    table = _lookup_tables.get(key)
+    if table is None:
+        by_size = {}
+        for value in values:
+            if value:
+                by_size.setdefault(len(value), set()).add(value)
+
+        table = tuple((size, frozenset(by_size[size]))
+                      for size in sorted(by_size, reverse=True))
+        _lookup_tables[key] = table
+
+    return table
+
+
+class LookupToken(pp.Token):
+    """
+    Pyparsing token accepting only the values from a lookup table.
+
+    As with pp.oneOf, the longest accepted value is matched, but instead of a
+    regular expression the values are looked up on the sets from
+    lookup_table.
+    """
+
+    def __init__(self, values):
+        super(LookupToken, self).__init__()
+        self._table = lookup_table(values)
+        self.mayReturnEmpty = False
+        self.mayIndexError = False
+        self.errmsg = 'Expected ' + self.name
+
+    def _generateDefaultName(self):
+        return 'Lookup'
+
+    def parseImpl(self, instring, loc, doActions=True):
+        for size, accepted in self._table:
+            text = instring[loc:loc + size]
+            if text in accepted:
+                return loc + size, text
+
+        raise pp.ParseException(instring, loc, self.errmsg, self)
+
+
 def lookup(values, name=None):
     """
     Creates the grammar for a Lookup (L) field, accepting only values from a
@@ -473,8 +536,12 @@ def lookup(values, name=None):
     except AttributeError:
         values = values
 
+    # As with pp.oneOf, a string holds the values separated by spaces
+    if isinstance(values, str):
+        values = values.split()
+
     # Only the specified values are allowed
-    lookup_field = pp.oneOf(values)
+    lookup_field = LookupToken(values)
 
     lookup_field.setName(name)
 
@@ -40,6 +40,9 @@ class GroupHeader(Record):
     the Transaction Type field.
     """
 
+    __slots__ = ('_group_id', '_transaction_type', '_version_number',
+                 '_batch_request_id')
+
     def __init__(self,
                  record_type='',
                  group_id=0,
@@ -144,6 +147,9 @@ class GroupTrailer(Record):
     transaction and record counts for the group.
     """
 
+    __slots__ = ('_group_id', '_transaction_count', '_record_count',
+                 '_currency_indicator', '_total_monetary_value')
+
     def __init__(self,
                  record_type='',
                  group_id=0,
@@ -19,6 +19,8 @@ class NonRomanAlphabetRecord(TransactionRecord, metaclass=ABCMeta):
     These are the records to represent alternate names out of the ASCII table.
     """
 
+    __slots__ = ('_language_code',)
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -62,6 +64,8 @@ class NonRomanAlphabetWorkRecord(NonRomanAlphabetRecord):
     describe alternate titles.
     """
 
+    __slots__ = ('_title',)
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -102,6 +106,8 @@ class NonRomanAlphabetTitleRecord(NonRomanAlphabetRecord):
     alternate titles.
     """
 
+    __slots__ = ('_title', '_title_type')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -161,6 +167,8 @@ class NonRomanAlphabetOtherWriterRecord(NonRomanAlphabetRecord):
     the alphabet.
     """
 
+    __slots__ = ('_writer_first_name', '_writer_name', '_position')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -238,6 +246,8 @@ class NonRomanAlphabetAgreementPartyRecord(NonRomanAlphabetRecord):
     preceding IPA record.
     """
 
+    __slots__ = ('_ip_name', '_ip_writer_name', '_ip_n')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -314,6 +324,8 @@ class NonRomanAlphabetPublisherNameRecord(NonRomanAlphabetRecord):
     record.
     """
 
+    __slots__ = ('_publisher_sequence_n', '_ip_n', '_publisher_name')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -389,6 +401,11 @@ class NonRomanAlphabetPerformanceDataRecord(NonRomanAlphabetRecord):
     be a valid code from ISO 639-2(T).
     """
 
+    __slots__ = ('_performing_artist_first_name', '_performing_artist_name',
+                 '_performing_artist_ipi_name_n',
+                 '_performing_artist_ipi_base_n', '_performance_language',
+                 '_performance_dialect')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
@@ -523,6 +540,8 @@ class NonRomanAlphabetWriterNameRecord(NonRomanAlphabetRecord):
     used to identify the name of the writer in the preceding SWR/OWR record.
     """
 
+    __slots__ = ('_writer_first_name', '_writer_last_name', '_ip_n')
+
     def __init__(self,
                  record_type='',
                  transaction_sequence_n=0,
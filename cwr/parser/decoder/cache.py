@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+
+import pyparsing as pp
+
+import config_cwr
+import cwr
+import data_cwr
+
+"""
+Disk cache for the data used to create the decoders.
+
+Creating a decoder requires reading and parsing all the configuration files,
+and the CWR tables, which takes a big part of the time for short-lived
+processes. This cache stores the results in the user cache folder, so they
+are read from a single file on the next start.
+
+The cached values are identified by a hash of the configuration and table
+files, so any change to them is detected and the values are created again.
+
+Only plain data is cached. The Pyparsing grammar uses functions for its parse
+actions, which can't be stored, and so it is still created each time, but
+from the cached configuration.
+
+The folder can be changed with the CWR_CACHE_DIR environment variable. If it
+is set to an empty string the cache is disabled.
+
+The decoder factories share the cache returned by default_cache(), so the
+hash of the files is computed only once for each process.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Environment variable for the cache folder
+CACHE_DIR_VARIABLE = 'CWR_CACHE_DIR'
+
+# Cache shared by the decoder factories
+_default_cache = None
+
+
+def user_cache_dir():
+    """
+    Returns the folder where the cache is stored.
+
+    If the CWR_CACHE_DIR environment variable is set it is used, otherwise
+    this is a folder inside the user cache folder for the platform. If the
+    cache is disabled, then None is returned.
+
+    :return: the cache folder, or None if the cache is disabled
+    """
+    path = os.environ.get(CACHE_DIR_VARIABLE)
+
+    if path is None:
+        if sys.platform.startswith('win'):
+            base = os.environ.get('LOCALAPPDATA') or \
+                   os.path.expanduser('~\\AppData\\Local')
+            path = os.path.join(base, 'cwr-api', 'Cache')
+        elif sys.platform == 'darwin':
+            path = os.path.expanduser('~/Library/Caches/cwr-api')
+        else:
+            base = os.environ.get('XDG_CACHE_HOME') or \
+                   os.path.expanduser('~/.cache')
+            path = os.path.join(base, 'cwr-api')
+    elif not path:
+        path = None
+
+    return path
+
+
+class ConfigurationCache(object):
+    """
+    Stores values created from the configuration files on disk.
+
+    Each value is stored in its own file, named after the value id and the
+    hash of the configuration files. Errors when reading or writing the cache
+    are ignored, and then the value is just created again.
+    """
+
+    def __init__(self, path=None, sources=None):
+        """
+        Constructs a ConfigurationCache.
+
+        If no path is received the default cache folder is used. The sources
+        are the folders with the files the cached values depend on, by default
+        the configuration and the tables folders.
+
+        :param path: the cache folder
+        :param sources: folders with the files used to create the values
+        """
+        if path:
+            self._path = path
+        else:
+            self._path = user_cache_dir()
+
+        if sources:
+            self._sources = sources
+        else:
+            self._sources = [os.path.dirname(config_cwr.__file__),
+                             os.path.dirname(data_cwr.__file__)]
+
+        self._key = None
+
+    @property
+    def path(self):
+        """
+        The folder where the values are stored, or None if the cache is
+        disabled.
+
+        :return: the cache folder
+        """
+        return self._path
+
+    @property
+    def key(self):
+        """
+        Hash identifying the current configuration files.
+
+        :return: the configuration hash
+        """
+        if self._key is None:
+            digest = hashlib.sha1()
+            digest.update(cwr.__version__.encode('utf-8'))
+            digest.update(pp.__version__.encode('utf-8'))
+            digest.update(str(pickle.HIGHEST_PROTOCOL).encode('utf-8'))
+
+            for source in self._sources:
+                for name in sorted(os.listdir(source)):
+                    if os.path.splitext(name)[1] in ('.yml', '.cml', '.csv'):
+                        digest.update(name.encode('utf-8'))
+                        with open(os.path.join(source, name), 'rb') as f:
+                            digest.update(f.read())
+
+            self._key = digest.hexdigest()
+
+        return self._key
+
+    def load(self, value_id, builder):
+        """
+        Returns the cached value for the id.
+
+        If the value is not in the cache it is created with the builder, and
+        then stored.
+
+        :param value_id: id for the value
+        :param builder: function creating the value
+        :return: the value for the id
+        """
+        if self._path is None:
+            return builder()
+
+        file_name = os.path.join(self._path,
+                                 '%s-%s.pickle' % (value_id, self.key))
+
+        try:
+            with open(file_name, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError,
+                ImportError, ValueError, TypeError):
+            pass
+
+        value = builder()
+
+        # The value is written to a temporary file first, so other processes
+        # never read a partial file
+        temp_name = None
+        try:
+            os.makedirs(self._path, exist_ok=True)
+            handle, temp_name = tempfile.mkstemp(dir=self._path)
+            with os.fdopen(handle, 'wb') as f:
+                pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_name, file_name)
+        except (OSError, pickle.PicklingError):
+            if temp_name is not None and os.path.exists(temp_name):
+                os.remove(temp_name)
+
+        return value
+
+
+def default_cache():
+    """
+    Returns the cache shared by the decoder factories.
+
+    The same instance is returned while the cache folder does not change, so
+    the hash of the configuration files is computed only once.
+
+    :return: the ConfigurationCache for the user cache folder
+    """
+    global _default_cache
+
+    path = user_cache_dir()
+    if _default_cache is None or _default_cache.path != path:
+        _default_cache = ConfigurationCache(path)
+
+    return _default_cache
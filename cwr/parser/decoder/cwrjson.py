@@ -2,11 +2,22 @@
 
 import json
 
+from cwr.file import CWRFile
+from cwr.group import Group, GroupHeader, GroupTrailer
 from cwr.parser.decoder.common import Decoder
-from cwr.parser.decoder.dictionary import FileDictionaryDecoder
+from cwr.parser.decoder.dictionary import FileDictionaryDecoder, \
+    FileTagDictionaryDecoder, GroupHeaderDictionaryDecoder, \
+    GroupTrailerDictionaryDecoder, TransactionRecordDictionaryDecoder, \
+    TransmissionHeaderDictionaryDecoder, TransmissionTrailerDictionaryDecoder
+from cwr.transmission import Transmission, TransmissionHeader
 
 """
 Classes for decoding CWR classes from JSON dictionaries.
+
+The JSONDecoder reads a whole JSON document, as created by the JSONEncoder.
+
+The NDJSONDecoder reads the newline delimited JSON created by the
+NDJSONEncoder one line at a time, so files of any size can be read.
 """
 
 __author__ = 'Bernardo Martínez Garrido'
@@ -23,3 +34,146 @@ class JSONDecoder(Decoder):
         decoded = json.loads(data)
 
         return self._dict_decoder.decode(decoded)
+
+
+class NDJSONDecoder(Decoder):
+    """
+    Parses newline delimited JSON, as created by the NDJSONEncoder, yielding
+    the parts of the transmission as each line is read.
+
+    These are the same parts, in the same order, as those returned by the
+    StreamFileDecoder:
+    - The TransmissionHeader
+    - For each group, the GroupHeader, then each transaction and finally the
+    GroupTrailer
+    - The TransmissionTrailer
+
+    Transactions are returned as lists of TransactionRecord instances, created
+    by the TransactionRecordDictionaryDecoder.
+
+    Only the current line is kept in memory, so the memory used does not
+    depend on the size of the file.
+    """
+
+    def __init__(self):
+        super(NDJSONDecoder, self).__init__()
+
+        self._tag_decoder = FileTagDictionaryDecoder()
+        self._transaction_decoder = TransactionRecordDictionaryDecoder()
+
+        self._decoders = {
+            'header': TransmissionHeaderDictionaryDecoder(),
+            'group_header': GroupHeaderDictionaryDecoder(),
+            'group_trailer': GroupTrailerDictionaryDecoder(),
+            'trailer': TransmissionTrailerDictionaryDecoder()
+        }
+
+    def decode(self, data):
+        """
+        Parses the JSON lines, yielding the transmission parts.
+
+        The data can be a string with the lines, or any iterable returning
+        them, such as an open file. Blank lines are ignored.
+
+        :param data: the JSON lines
+        :return: a generator for the transmission parts
+        """
+        for line in _lines(data):
+            yield self.decode_line(line)
+
+    def decode_line(self, line):
+        """
+        Parses a single JSON line into a transmission part.
+
+        :param line: the JSON line
+        :return: the transmission part
+        """
+        decoded = json.loads(line)
+
+        if 'transaction' in decoded:
+            decode_record = self._transaction_decoder.decode
+            return [decode_record(record)
+                    for record in decoded['transaction']]
+
+        for key, decoder in self._decoders.items():
+            if key in decoded:
+                return decoder.decode(decoded[key])
+
+        raise ValueError('The line is not a transmission part: %s' % line)
+
+    def decode_tag(self, line):
+        """
+        Parses the FileTag stored on the transmission header line.
+
+        :param line: the JSON line for the transmission header
+        :return: the FileTag, or None if the line has no tag
+        """
+        tag = json.loads(line).get('tag')
+        if tag is None:
+            return None
+
+        return self._tag_decoder.decode(tag)
+
+    def transactions(self, data):
+        """
+        Parses the JSON lines, yielding only the transactions.
+
+        The lines for the other parts are not parsed into model instances.
+
+        :param data: the JSON lines
+        :return: a generator for the transactions, as lists of records
+        """
+        decode_record = self._transaction_decoder.decode
+        for line in _lines(data):
+            decoded = json.loads(line)
+            if 'transaction' in decoded:
+                yield [decode_record(record)
+                       for record in decoded['transaction']]
+
+    def decode_file(self, data):
+        """
+        Parses the JSON lines into a CWRFile.
+
+        Unlike the decode method, this keeps the whole file in memory.
+
+        :param data: the JSON lines
+        :return: a CWRFile with the file tag and transmission
+        """
+        tag = None
+        header = None
+        trailer = None
+        groups = []
+        group_header = None
+        transactions = []
+
+        for line in _lines(data):
+            part = self.decode_line(line)
+            if isinstance(part, list):
+                transactions.append(part)
+            elif isinstance(part, TransmissionHeader):
+                tag = self.decode_tag(line)
+                header = part
+            elif isinstance(part, GroupHeader):
+                group_header = part
+                transactions = []
+            elif isinstance(part, GroupTrailer):
+                groups.append(Group(group_header, part, transactions))
+            else:
+                trailer = part
+
+        return CWRFile(tag, Transmission(header, trailer, groups))
+
+
+def _lines(data):
+    """
+    Returns the non blank lines from a string or an iterable of lines.
+
+    :param data: string or iterable with the lines
+    :return: a generator for the lines
+    """
+    if isinstance(data, str):
+        data = data.splitlines()
+
+    for line in data:
+        if line.strip():
+            yield line
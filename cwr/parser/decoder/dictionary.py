@@ -729,7 +729,11 @@ class WriterRecordDictionaryDecoder(Decoder):
         self._writer_decoder = WriterDictionaryDecoder()
 
     def decode(self, data):
-        writer = self._writer_decoder.decode(data)
+        # The dictionary encoder stores the writer in its own dictionary
+        if isinstance(data.get('writer'), dict):
+            writer = self._writer_decoder.decode(data['writer'])
+        else:
+            writer = self._writer_decoder.decode(data)
 
         usa_license = None
         if 'usa_license' in data:
@@ -902,7 +906,11 @@ class PublisherRecordDictionaryDecoder(Decoder):
         self._publisher_decoder = PublisherDictionaryDecoder()
 
     def decode(self, data):
-        publisher = self._publisher_decoder.decode(data)
+        # The dictionary encoder stores the publisher in its own dictionary
+        if isinstance(data.get('publisher'), dict):
+            publisher = self._publisher_decoder.decode(data['publisher'])
+        else:
+            publisher = self._publisher_decoder.decode(data)
 
         special_agreements = None
         if 'special_agreements' in data:
@@ -1,5 +1,12 @@
 # -*- coding: utf-8 -*-
+import collections
+import itertools
 import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pyparsing as pp
 
 from cwr.parser.decoder.common import GrammarDecoder
 from config_cwr.accessor import CWRConfiguration
@@ -7,6 +14,15 @@ from cwr.grammar.factory.rule import FieldRuleFactory
 from data_cwr.accessor import CWRTables
 from cwr.grammar.factory.rule import DefaultRuleFactory
 from cwr.file import CWRFile, FileTag
+from cwr.group import Group, GroupHeader, GroupTrailer
+from cwr.record import TransactionRecord
+from cwr.transmission import Transmission, TransmissionHeader, \
+    TransmissionTrailer
+from cwr.parser.decoder.layout import LayoutRecordDecoder, RecordLayoutFactory
+from cwr.parser.decoder.lazy import LazyFileDecoder
+from cwr.parser.decoder.reader import MappedFileReader
+from cwr.parser.decoder.structure import TransactionStructureFactory
+from cwr.parser.decoder.cache import default_cache
 from cwr.grammar.factory.decorator import GroupRuleDecorator, \
     OptionalFieldRuleDecorator, RecordRuleDecorator, \
     TransactionRecordRuleDecorator
@@ -65,6 +81,22 @@ and return a CWRFile instance. The filename decoder will return a FileTag.
 
 The base classes used on these parsers are FileDecoder and FileNameDecoder,
 both of them requiring information about the grammar to be used when parsing.
+By default filenames are instead parsed by the FileNameRegexDecoder, which
+matches both conventions with a single regular expression.
+
+For big files the default_stream_decoder() method returns a decoder which reads
+the file line by line, yielding each part of the transmission as soon as it
+has been read, instead of creating the whole CWRFile at once.
+
+Both the file and the stream decoders can read the records with the Pyparsing
+grammar or with fixed-width record layouts, which just slice each line at the
+field columns. The layouts are much faster, and create the same records, but
+the grammar remains the default.
+
+Files can also be parsed straight from their path with the decode_file method
+of the file decoder, which maps them into memory instead of reading them.
+The default_lazy_file_decoder() method returns a decoder which only indexes
+the file, parsing each transaction when it is accessed.
 """
 
 __author__ = 'Bernardo Martínez Garrido'
@@ -166,7 +198,7 @@ def default_adapters():
     return adapters
 
 
-def default_grammar_factory():
+def _default_field_configs():
     config = CWRConfiguration()
 
     data = config.load_field_config('table')
@@ -179,13 +211,53 @@ def default_grammar_factory():
             values_id = entry['source']
             entry['values'] = field_values.get_data(values_id)
 
+    return data
+
+
+def _default_configs():
+    config = CWRConfiguration()
+
+    return {
+        'fields': _default_field_configs(),
+        'records': _process_rules(config.load_record_config('common')),
+        'transactions': _process_rules(
+            config.load_transaction_config('common')),
+        'groups': _process_rules(config.load_group_config('common'))
+    }
+
+
+def default_configs(cache=None):
+    """
+    Returns the configuration used to create the decoders.
+
+    This is a dict containing the field configurations, with the values for
+    the lookup fields, and the record, transaction and group rules, each of
+    them mapped to their ids.
+
+    As reading the configuration files takes time, the result is stored in the
+    disk cache, and read from it on the next calls.
+
+    :param cache: the ConfigurationCache to use, by default the shared one
+    :return: the configuration for the decoders
+    """
+    if not cache:
+        cache = default_cache()
+
+    return cache.load('decoder_configs', _default_configs)
+
+
+def default_grammar_factory():
+    configs = default_configs()
+
+    data = configs['fields']
+
     factory_field = FieldRuleFactory(data, default_adapters())
 
     optional_decorator = OptionalFieldRuleDecorator(data, default_adapters())
 
-    rules = _process_rules(config.load_record_config('common'))
-    rules.update(_process_rules(config.load_transaction_config('common')))
-    rules.update(_process_rules(config.load_group_config('common')))
+    rules = dict(configs['records'])
+    rules.update(configs['transactions'])
+    rules.update(configs['groups'])
 
     decorators = {'transaction_record': TransactionRecordRuleDecorator(
         factory_field,
@@ -235,28 +307,186 @@ def _process_rules(rules):
     return processed
 
 
-def default_file_decoder():
+def _process_record_heads(rules):
+    """
+    Groups the ids of the record rules by the record type codes they accept.
+
+    The rules for each code are kept in the same order as in the
+    configuration file.
+
+    :param rules: the record rules configuration
+    :return: a dict mapping each record type code to a list of rule ids
+    """
+    processed = {}
+    for rule in rules:
+        for head in rule.head:
+            if head in processed:
+                processed[head].append(rule.id)
+            else:
+                processed[head] = [rule.id]
+
+    return processed
+
+
+def default_file_decoder(mode='grammar', processes=None):
     """
     Creates a decoder which parses a CWR file, creating a CWRFile class
     instance from it.
 
+    The mode indicates how the file is parsed:
+    - grammar, the default, parses the whole file with the Pyparsing grammar
+    - dispatch, parses each line with the grammar rule for its record type,
+    checking the order of the records with the transaction state machines
+    - layout, like dispatch, but reading each line with the fixed-width record
+    layouts
+
+    For the dispatch and layout modes the file can be parsed in parallel, by
+    indicating the number of processes to use. If this is zero then the
+    number of processors is used.
+
+    :param mode: the parsing mode
+    :param processes: number of processes for parsing the file
     :return: a CWR file decoder for the default standard
     """
-    transmission_rule = default_grammar_factory().get_rule('transmission')
+    if mode == 'grammar':
+        if processes is not None:
+            raise ValueError('The grammar mode can not be run in parallel')
+        transmission = default_grammar_factory().get_rule('transmission')
+    elif mode in ('dispatch', 'layout'):
+        if mode == 'dispatch':
+            record_mode = 'grammar'
+        else:
+            record_mode = 'layout'
+
+        if processes is None:
+            stream = default_stream_decoder(record_mode)
+        else:
+            stream = ParallelFileDecoder(record_mode, processes or None)
+
+        transmission = StreamTransmissionDecoder(stream)
+    else:
+        raise ValueError('Unknown parsing mode %s' % mode)
 
     return FileDecoder(
-        transmission_rule,
+        transmission,
         default_filename_decoder()
     )
 
 
-def default_filename_decoder():
+def default_transaction_structures():
+    """
+    Creates the state machines checking the records order for each type of
+    transaction.
+
+    The machine for each transaction is mapped to the record type codes which
+    can begin it, which are the group transaction types.
+
+    These are stored in the disk cache, and read from it on the next calls.
+
+    :return: a dict mapping transaction types to their state machines
+    """
+    return default_cache().load('transaction_structures',
+                                _default_transaction_structures)
+
+
+def _default_transaction_structures():
+    configs = default_configs()
+
+    factory = TransactionStructureFactory(configs['records'],
+                                          configs['transactions'])
+
+    transactions = configs['groups']['transactions'].rules[0].rules
+
+    structures = {}
+    for rule in transactions:
+        structure = factory.get_structure(rule.rule_name)
+        for record_type in structure.record_types:
+            structures[record_type] = structure
+
+    return structures
+
+
+def default_record_decoder(mode='grammar'):
+    """
+    Creates a decoder which parses a single CWR record line, choosing the rule
+    to apply from the record type code at the start of the line.
+
+    The mode indicates if the record is parsed with the Pyparsing grammar, the
+    default, or with the fixed-width record layouts, when it is 'layout'.
+
+    :param mode: the parsing mode
+    :return: a CWR record decoder for the default standard
+    """
+    configs = default_configs()
+    heads = _process_record_heads(configs['records'].values())
+
+    if mode == 'grammar':
+        factory = default_grammar_factory()
+
+        rules = {}
+        for head, rule_ids in heads.items():
+            rules[head] = [factory.get_rule(rule_id) for rule_id in rule_ids]
+
+        decoder = GrammarRecordDecoder(rules)
+    elif mode == 'layout':
+        factory = RecordLayoutFactory(configs['records'], configs['fields'])
+
+        layouts = {}
+        for head, rule_ids in heads.items():
+            layouts[head] = [factory.get_layout(rule_id)
+                             for rule_id in rule_ids]
+
+        decoder = LayoutRecordDecoder(layouts, _default_record_decoders())
+    else:
+        raise ValueError('Unknown parsing mode %s' % mode)
+
+    return decoder
+
+
+def default_stream_decoder(mode='grammar'):
+    """
+    Creates a decoder which parses a CWR file line by line, yielding the
+    transmission contents as soon as they are read.
+
+    The order of the records in each transaction is checked with the state
+    machines from default_transaction_structures().
+
+    :param mode: the parsing mode for the records, 'grammar' or 'layout'
+    :return: a streaming CWR file decoder for the default standard
+    """
+    return StreamFileDecoder(default_record_decoder(mode),
+                             default_transaction_structures())
+
+
+def default_lazy_file_decoder(mode='layout', cache_size=128):
+    """
+    Creates a decoder which scans a CWR file, from its path, into a
+    LazyCWRFile, where the transactions are parsed only when accessed.
+
+    :param mode: the parsing mode for the records, 'grammar' or 'layout'
+    :param cache_size: number of parsed transactions kept on each group
+    :return: a lazy CWR file decoder for the default standard
+    """
+    return LazyFileDecoder(default_record_decoder(mode),
+                           default_filename_decoder(), cache_size)
+
+
+def default_filename_decoder(mode='regex'):
     """
     Creates a decoder which parses CWR filenames following the old or the new
     convention.
 
+    By default the filenames are matched with a single regular expression,
+    which is much faster than the grammar, and creates the same FileTag.
+
+    :param mode: the parsing mode, 'regex' or 'grammar'
     :return: a CWR filename decoder for the old and the new conventions
     """
+    if mode == 'regex':
+        return FileNameRegexDecoder(CWRConfiguration().default_version())
+    elif mode != 'grammar':
+        raise ValueError('Unknown filename parsing mode %s' % mode)
+
     factory = default_filename_grammar_factory()
 
     grammar_old = factory.get_rule('filename_old')
@@ -274,6 +504,10 @@ class FileDecoder(Decoder):
     file's name.
 
     For this it will use a second decoder, which will take care of the filename.
+
+    The contents are parsed with the received grammar rule, unless a Decoder
+    is received instead, in which case it is expected to return the
+    Transmission.
     """
 
     def __init__(self, grammar, filename_decoder):
@@ -283,7 +517,10 @@ class FileDecoder(Decoder):
         self._logger = logging.getLogger(__name__)
 
         self._filename_decoder = filename_decoder
-        self._file_decoder = GrammarDecoder(grammar)
+        if isinstance(grammar, Decoder):
+            self._file_decoder = grammar
+        else:
+            self._file_decoder = GrammarDecoder(grammar)
 
     def decode(self, data):
         """
@@ -299,17 +536,38 @@ class FileDecoder(Decoder):
         file_name = self._filename_decoder.decode(data['filename'])
 
         file_data = data['contents']
-        i = 0
-        max_size = len(file_data)
-        while file_data[i:i + 1] != 'H' and i < max_size:
-            i += 1
-        if i > 0:
-            data['contents'] = file_data[i:]
+        if isinstance(file_data, str):
+            i = file_data.find('H')
+            if i > 0:
+                data['contents'] = file_data[i:]
 
-        transmission = self._file_decoder.decode(data['contents'])[0]
+        transmission = self._file_decoder.decode(data['contents'])
+        if isinstance(transmission, pp.ParseResults):
+            transmission = transmission[0]
 
         return CWRFile(file_name, transmission)
 
+    def decode_file(self, path):
+        """
+        Parses the file on a path, creating a CWRFile from it.
+
+        The file is read with a MappedFileReader, using the encoding from the
+        character set on its header. When the contents are parsed line by
+        line, the lines are decoded as they are parsed, otherwise the whole
+        contents are decoded at once.
+
+        :param path: path to the file
+        :return: a CWRFile instance
+        """
+        with MappedFileReader(path) as reader:
+            if isinstance(self._file_decoder, GrammarDecoder):
+                contents = reader.text()
+            else:
+                contents = reader.lines()
+
+            return self.decode({'filename': os.path.basename(path),
+                                'contents': contents})
+
 
 class FileNameDecoder(Decoder):
     """
@@ -346,3 +604,488 @@ class FileNameDecoder(Decoder):
                 file_tag = FileTag(0, 0, '', '', '')
 
         return file_tag
+
+    def decode_many(self, file_names):
+        """
+        Parses several filenames.
+
+        :param file_names: filenames to parse
+        :return: a list with the FileTag of each filename
+        """
+        return [self.decode(file_name) for file_name in file_names]
+
+
+# Old and new filename conventions, the new one is matched first
+_FILENAME_PATTERN = re.compile(
+    r'CW(?P<year>[0-9]{2})'
+    r'(?:(?P<sequence_new>[0-9]{4})(?P<sender_new>[A-Za-z0-9]{2,3})'
+    r'_(?P<receiver_new>[A-Za-z0-9]{2,3})'
+    r'|(?P<sequence_old>[0-9]{2})(?P<sender_old>[A-Za-z0-9]{2,3})'
+    r'_(?P<receiver_old>[A-Za-z0-9]{2,3}))'
+    r'(?:\.V(?P<version>[0-9]{2})|(?P<zip>\.zip))')
+
+
+class FileNameRegexDecoder(Decoder):
+    """
+    Parses a CWR filename to create a FileTag instance, using a single
+    regular expression for the old and the new naming conventions.
+
+    This accepts the same filenames as the FileNameDecoder grammar rules, and
+    creates the same FileTag, but without building or running any Pyparsing
+    rule, which makes it suitable for classifying big folders.
+
+    If the filename does not conform any of the two conventions, then an empty
+    FileTag will be returned.
+    """
+
+    def __init__(self, default_version):
+        """
+        Constructs a FileNameRegexDecoder.
+
+        :param default_version: the version for zipped files, which do not
+        indicate it
+        """
+        super(FileNameRegexDecoder, self).__init__()
+        self._default_version = default_version
+
+    def decode(self, file_name):
+        """
+        Parses the filename, creating a FileTag from it.
+
+        :param file_name: filename to parse
+        :return: a FileTag instance
+        """
+        match = _FILENAME_PATTERN.match(file_name)
+        if match is None:
+            return FileTag(0, 0, '', '', '')
+
+        if match.group('sequence_new') is not None:
+            sequence_n, sender, receiver = match.group(
+                'sequence_new', 'sender_new', 'receiver_new')
+        else:
+            sequence_n, sender, receiver = match.group(
+                'sequence_old', 'sender_old', 'receiver_old')
+
+        version = match.group('version')
+        if version is None:
+            version = self._default_version
+        else:
+            version = float(version[0] + '.' + version[1])
+
+        return FileTag(2000 + int(match.group('year')), int(sequence_n),
+                       sender, receiver, version)
+
+    def decode_many(self, file_names):
+        """
+        Parses several filenames.
+
+        :param file_names: filenames to parse
+        :return: a list with the FileTag of each filename
+        """
+        decode = self.decode
+        return [decode(file_name) for file_name in file_names]
+
+
+class GrammarRecordDecoder(Decoder):
+    """
+    Parses a single CWR record line into a record instance.
+
+    The first three characters of a line are the record type code, and this is
+    used to pick the Pyparsing rules which may parse it. If several rules
+    accept the same code they are tried in order, and the result of the first
+    one matching the line is returned.
+    """
+
+    def __init__(self, rules):
+        """
+        Constructs a GrammarRecordDecoder.
+
+        The rules should be a dict mapping each record type code to a list of
+        Pyparsing rules for that code.
+
+        :param rules: rules for each record type code
+        """
+        super(GrammarRecordDecoder, self).__init__()
+        self._rules = rules
+
+    def decode(self, line):
+        """
+        Parses the line, creating a record from it.
+
+        :param line: the record line to parse
+        :return: the record parsed from the line
+        """
+        record_type = line[:3]
+
+        if record_type not in self._rules:
+            raise pp.ParseException(line, 0,
+                                    'Unknown record type %s' % record_type)
+
+        error = None
+        for rule in self._rules[record_type]:
+            try:
+                return rule.parseString(line)[0]
+            except pp.ParseException as e:
+                error = e
+
+        raise error
+
+
+class StreamFileDecoder(Decoder):
+    """
+    Parses the contents of a CWR file line by line, yielding the parts of the
+    transmission as soon as they are complete.
+
+    These are returned in the same order they appear in the file:
+    - The TransmissionHeader
+    - For each group, the GroupHeader, then each transaction and finally the
+    GroupTrailer
+    - The TransmissionTrailer
+
+    Transactions are returned as lists of TransactionRecord instances, the same
+    as they are stored in a Group. A transaction is only returned after the
+    line beginning the next one, or the group trailer, has been read.
+
+    As only the current transaction is kept in memory, the memory used does not
+    depend on the size of the file.
+
+    If the state machines for the transactions are received, the order of the
+    records in each transaction is checked as they are read, raising a
+    ParseException when it is not valid. These should be in a dict mapping
+    each group transaction type to its TransactionStructure.
+    """
+
+    def __init__(self, record_decoder, structures=None):
+        """
+        Constructs a StreamFileDecoder.
+
+        :param record_decoder: decoder for a single record line
+        :param structures: state machines for each transaction type
+        """
+        super(StreamFileDecoder, self).__init__()
+
+        # Logger
+        self._logger = logging.getLogger(__name__)
+
+        self._record_decoder = record_decoder
+        self._structures = structures
+
+    def decode(self, data):
+        """
+        Parses the file contents, yielding the transmission parts.
+
+        The data can be any iterable returning the file lines, such as an open
+        file. Any character before the transmission header, for example a
+        BOM, is ignored, and so are blank lines.
+
+        :param data: iterable with the file lines
+        :return: a generator for the transmission parts
+        """
+        return self._decode(data, None, False)
+
+    def decode_part(self, data, transaction_type=None):
+        """
+        Parses a part of the file contents, yielding the transmission parts.
+
+        The part should begin at a control record, such as a group header, or
+        at the first record of a transaction. The transaction type is that of
+        the group the part begins in.
+
+        :param data: iterable with the lines of the part
+        :param transaction_type: the type of the current group
+        :return: a generator for the transmission parts
+        """
+        return self._decode(data, transaction_type, True)
+
+    def _decode(self, data, transaction_type, started):
+        transaction = None
+
+        # Structure checking
+        structure = None
+        state = None
+
+        for line in data:
+            line = line.rstrip('\r\n')
+
+            if not started:
+                i = line.find('H')
+                if i < 0:
+                    continue
+                line = line[i:]
+                started = True
+
+            if not line.strip():
+                continue
+
+            record = self._record_decoder.decode(line)
+
+            if isinstance(record, TransactionRecord):
+                if transaction is None or \
+                                record.record_type == transaction_type:
+                    if transaction is not None:
+                        self._check_complete(structure, state, line)
+                        yield transaction
+                    transaction = [record]
+
+                    if self._structures is not None:
+                        structure = self._get_structure(transaction_type,
+                                                        line)
+                        state = structure.start()
+                else:
+                    transaction.append(record)
+
+                if structure is not None:
+                    state = structure.next_state(state, record.record_type)
+                    if state is None:
+                        raise pp.ParseException(
+                            line, 0, 'Unexpected record %s in %s' %
+                                     (record.record_type, structure.rule_id))
+            else:
+                if transaction is not None:
+                    self._check_complete(structure, state, line)
+                    yield transaction
+                    transaction = None
+
+                if isinstance(record, GroupHeader):
+                    transaction_type = record.transaction_type
+
+                yield record
+
+        if transaction is not None:
+            self._check_complete(structure, state, '')
+            yield transaction
+
+    def _get_structure(self, transaction_type, line):
+        if transaction_type not in self._structures:
+            raise pp.ParseException(line, 0,
+                                    'Unexpected transaction type %s' %
+                                    transaction_type)
+
+        return self._structures[transaction_type]
+
+    @staticmethod
+    def _check_complete(structure, state, line):
+        if structure is not None and not structure.is_complete(state):
+            raise pp.ParseException(line, 0,
+                                    'Incomplete %s' % structure.rule_id)
+
+
+class ParallelFileDecoder(Decoder):
+    """
+    Parses the contents of a CWR file in several processes, yielding the parts
+    of the transmission in the same order as a StreamFileDecoder.
+
+    The lines are split into chunks, always at a group boundary or at the
+    first record of a transaction, and each chunk is parsed by a
+    StreamFileDecoder in a process from a pool. Then the parts from all the
+    chunks are returned in the same order as in the file.
+
+    Each process creates its own decoder, for the received record parsing
+    mode, as these can't be sent between processes.
+    """
+
+    def __init__(self, mode='layout', processes=None, chunk_size=2000,
+                 min_lines=20000):
+        """
+        Constructs a ParallelFileDecoder.
+
+        If the number of processes is None, then the number of processors is
+        used.
+
+        Files with fewer lines than the minimum, and all the files when there
+        is a single processor, are parsed in the current process, as starting
+        the pool would take longer than parsing them.
+
+        :param mode: the parsing mode for the records, 'grammar' or 'layout'
+        :param processes: number of processes to use
+        :param chunk_size: minimum number of lines for each chunk
+        :param min_lines: minimum number of lines for using the pool
+        """
+        super(ParallelFileDecoder, self).__init__()
+
+        self._mode = mode
+        self._processes = processes
+        self._chunk_size = chunk_size
+        self._min_lines = min_lines
+
+    def decode(self, data):
+        """
+        Parses the file contents, yielding the transmission parts.
+
+        Only a few chunks for each process are sent to the pool at a time, so
+        the memory used does not depend on the size of the file.
+
+        :param data: iterable with the file lines
+        :return: a generator for the transmission parts
+        """
+        if os.cpu_count() == 1 or self._processes == 1:
+            for part in default_stream_decoder(self._mode).decode(data):
+                yield part
+            return
+
+        chunks = self._split(data)
+
+        # The first chunks are kept until knowing if the file is big enough
+        first = []
+        lines = 0
+        for chunk in chunks:
+            first.append(chunk)
+            lines += len(chunk[1])
+            if lines >= self._min_lines:
+                break
+
+        if lines < self._min_lines:
+            remaining = itertools.chain.from_iterable(
+                chunk_lines for _, chunk_lines in itertools.chain(first,
+                                                                  chunks))
+            for part in default_stream_decoder(self._mode).decode_part(
+                    remaining):
+                yield part
+            return
+
+        processes = self._processes or os.cpu_count()
+        window = 2 * processes
+
+        with ProcessPoolExecutor(max_workers=processes,
+                                 initializer=_init_part_decoder,
+                                 initargs=(self._mode,)) as executor:
+            pending = collections.deque()
+            for chunk in itertools.chain(first, chunks):
+                pending.append(executor.submit(_decode_part, chunk))
+                if len(pending) >= window:
+                    for part in pending.popleft().result():
+                        yield part
+
+            while pending:
+                for part in pending.popleft().result():
+                    yield part
+
+    def _split(self, data):
+        """
+        Splits the lines into chunks which can be parsed on their own.
+
+        Each chunk is a tuple with the type of the group it begins in and its
+        lines.
+
+        :param data: iterable with the file lines
+        :return: a generator for the chunks
+        """
+        chunk = []
+        chunk_type = None
+        transaction_type = None
+        started = False
+
+        for line in data:
+            line = line.rstrip('\r\n')
+
+            if not started:
+                i = line.find('H')
+                if i < 0:
+                    continue
+                line = line[i:]
+                started = True
+
+            if not line.strip():
+                continue
+
+            record_type = line[:3]
+
+            if len(chunk) >= self._chunk_size and \
+                    (record_type in _control_records or
+                     record_type == transaction_type):
+                yield chunk_type, chunk
+                chunk = []
+
+            if not chunk:
+                chunk_type = transaction_type
+
+            if record_type == 'GRH':
+                transaction_type = line[3:6]
+
+            chunk.append(line)
+
+        if chunk:
+            yield chunk_type, chunk
+
+
+# Records which are not part of a transaction
+_control_records = ('HDR', 'GRH', 'GRT', 'TRL')
+
+# Decoder used by the processes of a ParallelFileDecoder
+_part_decoder = None
+
+
+def _init_part_decoder(mode):
+    global _part_decoder
+    _part_decoder = default_stream_decoder(mode)
+
+
+def _decode_part(chunk):
+    transaction_type, lines = chunk
+    return list(_part_decoder.decode_part(lines, transaction_type))
+
+
+class StreamTransmissionDecoder(Decoder):
+    """
+    Parses the contents of a CWR file into a Transmission, reading it with a
+    StreamFileDecoder.
+
+    This allows using the record decoders of the stream, which parse each line
+    on its own, when the whole Transmission is required.
+    """
+
+    def __init__(self, stream_decoder):
+        """
+        Constructs a StreamTransmissionDecoder.
+
+        :param stream_decoder: the StreamFileDecoder reading the file
+        """
+        super(StreamTransmissionDecoder, self).__init__()
+
+        self._stream_decoder = stream_decoder
+
+    def decode(self, data):
+        """
+        Parses the file contents, creating a Transmission from it.
+
+        The data can be a string with the whole contents, or an iterable with
+        its lines.
+
+        :param data: the file contents
+        :return: a Transmission instance
+        """
+        if isinstance(data, str):
+            data = data.splitlines()
+
+        header = None
+        trailer = None
+        groups = []
+
+        group_header = None
+        transactions = []
+
+        for part in self._stream_decoder.decode(data):
+            if isinstance(part, TransmissionHeader) and header is None:
+                header = part
+            elif header is None or trailer is not None:
+                break
+            elif isinstance(part, GroupHeader) and group_header is None:
+                group_header = part
+                transactions = []
+            elif group_header is None:
+                if isinstance(part, TransmissionTrailer):
+                    trailer = part
+                else:
+                    break
+            elif isinstance(part, GroupTrailer):
+                groups.append(Group(group_header, part, transactions))
+                group_header = None
+            elif isinstance(part, list):
+                transactions.append(part)
+            else:
+                break
+        else:
+            if trailer is not None:
+                return Transmission(header, trailer, groups)
+
+        raise pp.ParseException('', 0, 'Expected a valid CWR transmission')
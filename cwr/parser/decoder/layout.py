@@ -0,0 +1,770 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import re
+
+import pyparsing as pp
+
+from cwr.grammar.field.basic import lookup_table
+from cwr.other import AVIKey
+from cwr.parser.decoder.common import Decoder
+
+"""
+Fixed-width record layouts for decoding CWR records without Pyparsing.
+
+All the CWR records are fixed-width lines, so each field can be read just by
+slicing the line at the correct columns. The classes in this module compile
+the same field and record configuration used for the grammar into layouts
+which do just that, with the conversion for each field precomputed when the
+layout is created.
+
+The layouts reproduce the behaviour of the grammar rules: optional fields
+accept a string of whitespaces, returning None, and the optional and option
+blocks of the record configuration are tried in the same order as the grammar
+would try them. The values read are stored in a dictionary, using the same
+names as the grammar results, which is then handed to the same dictionary
+decoders used by the grammar, so both paths create the same records.
+
+The main classes are:
+- RecordLayoutFactory, which creates the layout for each record rule.
+- LayoutRecordDecoder, which parses a record line with the layouts for its
+record type code.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Characters allowed in Alphanumeric fields
+_alphanum_chars = '[\x00-\x60\x7B-\x7F]'
+_alphanum_ext_chars = '[\x00-\x09\x0E-\x60\x7B-\x7F\x80-\U0010FFFF]'
+
+_alphanum = re.compile(_alphanum_chars + '*')
+_alphanum_ext = re.compile(_alphanum_ext_chars + '*')
+
+# ASCII digits, as str.isdigit also accepts other Unicode digits
+_digits = re.compile(r'[0-9]+\Z')
+
+# Whitespaces skipped by the grammar before some compulsory fields
+_whitespaces = ' \n\t\r'
+
+# Types for which the compulsory grammar rule skips leading whitespaces
+_skip_whitespace_types = ('boolean', 'percentage', 'numeric_float', 'isrc',
+                          'visan', 'charset')
+
+# Types which also accept a field filled with zeros as empty
+_numeric_types = ('date',)
+
+
+class FieldLayout(object):
+    """
+    Layout for a single field.
+
+    It reads the field from the line at the received position, returning the
+    position where the next field begins, and storing the value read.
+
+    The matcher is a function receiving the line and the position, and
+    returning a tuple with the value and the end position, or None if the
+    field is not valid.
+    """
+
+    def __init__(self, name, columns, matcher, optional=True, numeric=False,
+                 skip_whitespace=False):
+        """
+        Constructs a FieldLayout.
+
+        :param name: name used to store the value
+        :param columns: number of columns of the field
+        :param matcher: function reading the field
+        :param optional: indicates if an empty field is accepted
+        :param numeric: indicates if a field filled with zeros is empty
+        :param skip_whitespace: indicates if leading whitespaces are skipped
+        """
+        self._name = name
+        self._matcher = matcher
+        self._skip_whitespace = skip_whitespace
+
+        if optional:
+            self._empty = ' ' * columns
+        else:
+            self._empty = None
+
+        if optional and numeric:
+            self._zeros = '0' * columns
+        else:
+            self._zeros = None
+
+    @property
+    def name(self):
+        """
+        Name used to store the value of the field.
+
+        :return: the field name
+        """
+        return self._name
+
+    def match(self, line, pos, values):
+        """
+        Reads the field from the line.
+
+        :param line: the line being parsed
+        :param pos: the position where the field begins
+        :param values: list where the name and value read are stored
+        :return: the position where the field ends, or -1 if it is not valid
+        """
+        if self._skip_whitespace:
+            while line[pos:pos + 1] and line[pos] in _whitespaces:
+                pos += 1
+
+        result = self._matcher(line, pos)
+
+        if result is None:
+            if self._empty is None:
+                return -1
+
+            end = pos + len(self._empty)
+            text = line[pos:end]
+            if text == self._empty or text == self._zeros:
+                result = (None, end)
+            else:
+                return -1
+
+        values.append((self._name, result[0]))
+
+        return result[1]
+
+
+class SequenceLayout(object):
+    """
+    Layout for a sequence of layouts, all of which should be valid.
+    """
+
+    def __init__(self, layouts):
+        self._layouts = layouts
+
+    def match(self, line, pos, values):
+        for layout in self._layouts:
+            pos = layout.match(line, pos, values)
+            if pos < 0:
+                break
+
+        return pos
+
+
+class OptionalLayout(object):
+    """
+    Layout for an optional block. If it is not valid the position does not
+    change, and no value is stored.
+    """
+
+    def __init__(self, layout):
+        self._layout = layout
+
+    def match(self, line, pos, values):
+        size = len(values)
+
+        end = self._layout.match(line, pos, values)
+        if end < 0:
+            del values[size:]
+            end = pos
+
+        return end
+
+
+class OptionLayout(object):
+    """
+    Layout for a list of options. The first valid option is used.
+    """
+
+    def __init__(self, layouts):
+        self._layouts = layouts
+
+    def match(self, line, pos, values):
+        size = len(values)
+
+        for layout in self._layouts:
+            end = layout.match(line, pos, values)
+            if end >= 0:
+                return end
+            del values[size:]
+
+        return -1
+
+
+class RecordLayout(object):
+    """
+    Layout for a full record line.
+
+    This is composed of the record prefix, the fields and the line end, which
+    only accepts whitespaces.
+    """
+
+    def __init__(self, rule_id, prefix, layout):
+        """
+        Constructs a RecordLayout.
+
+        :param rule_id: id of the record rule
+        :param prefix: layout for the record prefix
+        :param layout: layout for the record fields
+        """
+        self._rule_id = rule_id
+        self._prefix = prefix
+        self._layout = layout
+
+    @property
+    def rule_id(self):
+        """
+        Id of the record rule this layout was created from.
+
+        :return: the rule id
+        """
+        return self._rule_id
+
+    def read(self, line):
+        """
+        Reads all the fields in the line.
+
+        If the line does not follow the layout a ParseException is raised.
+
+        :param line: the line to read
+        :return: a dict with the values read
+        """
+        values = []
+
+        pos = self._prefix.match(line, 0, values)
+        if pos >= 0:
+            pos = self._layout.match(line, pos, values)
+
+        if pos < 0:
+            raise pp.ParseException(line, 0, 'Expected %s' % self._rule_id)
+
+        if line[pos:].strip(' \t\r'):
+            raise pp.ParseException(line, pos,
+                                    'Expected end of line for %s' %
+                                    self._rule_id)
+
+        return dict(values)
+
+
+class RecordLayoutFactory(object):
+    """
+    Factory for acquiring record layouts.
+
+    The layouts are created from the same configuration as the grammar rules.
+    """
+
+    def __init__(self, record_configs, field_configs):
+        """
+        Constructs a RecordLayoutFactory.
+
+        The record configurations should be a dict mapping the rule ids to
+        their configuration, while the field configurations should already
+        contain the values of the lookup fields.
+
+        :param record_configs: configuration for the records
+        :param field_configs: configuration for the fields
+        """
+        super(RecordLayoutFactory, self).__init__()
+        # Layouts already created
+        self._layouts = {}
+        self._fields = {}
+
+        self._record_configs = record_configs
+        self._field_configs = field_configs
+
+        self._matchers = {
+            'alphanum': _alphanum_matcher,
+            'alphanum_ext': _alphanum_ext_matcher,
+            'alphanum_end': _alphanum_end_matcher,
+            'numeric': _numeric_matcher,
+            'numeric_float': _numeric_float_matcher,
+            'percentage': _percentage_matcher,
+            'boolean': _boolean_matcher,
+            'flag': _flag_matcher,
+            'date': _date_matcher,
+            'time': _time_matcher,
+            'date_time': _date_time_matcher,
+            'blank': _blank_matcher,
+            'lookup': _lookup_matcher,
+            'lookup_int': _lookup_int_matcher,
+            'iswc': _iswc_matcher,
+            'ipi_base_n': _ipi_base_matcher,
+            'ipi_name_n': _ipi_name_matcher,
+            'ean13': _ean13_matcher,
+            'isrc': _isrc_matcher,
+            'visan': _visan_matcher,
+            'avi': _avi_matcher,
+            'charset': _charset_matcher,
+        }
+
+    def get_layout(self, rule_id):
+        """
+        Returns the layout for the record rule identified by the id.
+
+        :param rule_id: id of the record rule
+        :return: the layout for the record
+        """
+        if rule_id in self._layouts:
+            layout = self._layouts[rule_id]
+        else:
+            layout = self._build_layout(rule_id)
+            self._layouts[rule_id] = layout
+
+        return layout
+
+    def _build_layout(self, rule_id):
+        config = self._record_configs[rule_id]
+
+        heads = config.head
+        try:
+            heads = heads.asList()
+        except AttributeError:
+            heads = list(heads)
+
+        prefix = [FieldLayout('record_type', 3, _lookup_matcher(3, heads),
+                              optional=False)]
+        if config.rule_type == 'transaction_record':
+            prefix.append(self._get_field('transaction_sequence_n', False))
+            prefix.append(self._get_field('record_sequence_n', False))
+
+        return RecordLayout(rule_id, SequenceLayout(prefix),
+                            self._process_rules(config.rules))
+
+    def _process_rules(self, rules):
+        return SequenceLayout(self._process_rules_list(rules))
+
+    def _process_rules_list(self, rules):
+        sequence = []
+
+        for rule in rules:
+            if rule.rules:
+                layout = self._process_rules_group(rule)
+            else:
+                layout = self._build_terminal_layout(rule)
+
+            sequence.append(layout)
+
+        return sequence
+
+    def _process_rules_group(self, rules):
+        group_type = rules.list_type
+
+        if group_type == 'sequence':
+            layout = self._process_rules(rules.rules)
+        elif group_type == 'option':
+            layout = OptionLayout(self._process_rules_list(rules.rules))
+        elif group_type == 'optional':
+            layout = OptionalLayout(self._process_rules(rules.rules))
+        else:
+            raise ValueError('Unknown rules group %s' % group_type)
+
+        return layout
+
+    def _build_terminal_layout(self, rule):
+        modifiers = rule.rule_options
+
+        try:
+            modifiers = modifiers.asList()
+        except AttributeError:
+            modifiers = []
+
+        if rule.rule_type != 'field':
+            raise ValueError('Records can only contain fields, found %s' %
+                             rule.rule_name)
+
+        layout = self._get_field(rule.rule_name,
+                                 'compulsory' not in modifiers)
+
+        if 'optional' in modifiers:
+            layout = OptionalLayout(layout)
+
+        return layout
+
+    def _get_field(self, field_id, optional):
+        key = (field_id, optional)
+
+        if key not in self._fields:
+            config = self._field_configs[field_id]
+
+            field_type = config['type']
+            columns = config['size']
+
+            if 'results_name' in config:
+                name = config['results_name']
+            else:
+                name = field_id
+
+            if 'values' in config:
+                values = config['values']
+            else:
+                values = None
+
+            matcher = self._matchers[field_type](columns, values)
+
+            self._fields[key] = FieldLayout(
+                name, columns, matcher, optional=optional,
+                numeric=field_type in _numeric_types,
+                skip_whitespace=(not optional and
+                                 field_type in _skip_whitespace_types))
+
+        return self._fields[key]
+
+
+class LayoutRecordDecoder(Decoder):
+    """
+    Parses a single CWR record line into a record instance, using the record
+    layouts.
+
+    The first three characters of a line are the record type code, and this is
+    used to pick the layouts which may read it. If several layouts accept the
+    same code they are tried in order, and the first one which can read the
+    line is used.
+
+    The values read are transformed into a record by the dictionary decoder
+    for the rule the layout was created from.
+    """
+
+    def __init__(self, layouts, decoders):
+        """
+        Constructs a LayoutRecordDecoder.
+
+        The layouts should be a dict mapping each record type code to a list of
+        RecordLayout instances, while the decoders should map each rule id to
+        the decoder creating the record.
+
+        :param layouts: layouts for each record type code
+        :param decoders: dictionary decoders for each rule id
+        """
+        super(LayoutRecordDecoder, self).__init__()
+        self._layouts = layouts
+        self._decoders = decoders
+
+    def decode(self, line):
+        """
+        Parses the line, creating a record from it.
+
+        :param line: the record line to parse
+        :return: the record parsed from the line
+        """
+        record_type = line[:3]
+
+        if record_type not in self._layouts:
+            raise pp.ParseException(line, 0,
+                                    'Unknown record type %s' % record_type)
+
+        error = None
+        for layout in self._layouts[record_type]:
+            try:
+                values = layout.read(line)
+            except pp.ParseException as e:
+                error = e
+            else:
+                return self._decoders[layout.rule_id].decode(values)
+
+        raise error
+
+
+# Field matchers.
+# Each of these receives the configuration of a field and returns a function
+# which reads the field from a line.
+
+
+def _slice_matcher(columns, convert):
+    """
+    Creates a matcher reading a fixed number of columns.
+
+    The converter receives the text and returns the field value, or None if it
+    is not valid.
+
+    :param columns: number of columns to read
+    :param convert: function transforming the text into the value
+    :return: a matcher for the field
+    """
+
+    def match(line, pos):
+        end = pos + columns
+        text = line[pos:end]
+
+        if len(text) < columns:
+            return None
+
+        value = convert(text)
+        if value is None:
+            return None
+
+        return value, end
+
+    return match
+
+
+def _pattern_matcher(pattern, convert=None):
+    """
+    Creates a matcher reading the text accepted by a regular expression.
+
+    :param pattern: regular expression for the field
+    :param convert: function transforming the text into the value
+    :return: a matcher for the field
+    """
+    regex = re.compile(pattern)
+
+    def match(line, pos):
+        result = regex.match(line, pos)
+
+        if result is None:
+            return None
+
+        if convert is None:
+            value = result.group()
+        else:
+            value = convert(result.group())
+            if value is None:
+                return None
+
+        return value, result.end()
+
+    return match
+
+
+def _text_converter(allowed):
+    def convert(text):
+        if allowed.fullmatch(text) is None:
+            return None
+
+        text = text.strip()
+        if len(text) == 0:
+            return None
+
+        return text
+
+    return convert
+
+
+def _to_int(text):
+    if _digits.match(text):
+        return int(text)
+
+    return None
+
+
+def _float_converter(nums_int, maximum=None):
+    def convert(text):
+        if not _digits.match(text):
+            return None
+
+        # As in the grammar, all the digits are decimals if there are no
+        # columns left for them
+        index_end = len(text) - nums_int
+        value = float(text[:nums_int] + '.' + text[-index_end:])
+
+        if maximum is not None and value > maximum:
+            return None
+
+        return value
+
+    return convert
+
+
+def _to_date(text):
+    if not _digits.match(text):
+        return None
+
+    try:
+        return datetime.date(int(text[:4]), int(text[4:6]), int(text[6:8]))
+    except ValueError:
+        return None
+
+
+def _to_time(text):
+    if not _digits.match(text):
+        return None
+
+    try:
+        return datetime.time(int(text[:2]), int(text[2:4]), int(text[4:6]))
+    except ValueError:
+        return None
+
+
+def _alphanum_matcher(columns, values=None):
+    return _slice_matcher(columns, _text_converter(_alphanum))
+
+
+def _alphanum_ext_matcher(columns, values=None):
+    return _slice_matcher(columns, _text_converter(_alphanum_ext))
+
+
+def _alphanum_end_matcher(columns, values=None):
+    return _pattern_matcher(_alphanum_ext_chars + '{1,%s}' % columns,
+                            lambda text: text.strip() or None)
+
+
+def _numeric_matcher(columns, values=None):
+    return _slice_matcher(columns, _to_int)
+
+
+def _numeric_float_matcher(columns, values=None):
+    if values:
+        nums_int = int(values[0])
+    else:
+        nums_int = columns
+
+    return _slice_matcher(columns, _float_converter(nums_int))
+
+
+def _percentage_matcher(columns, values=None):
+    if values:
+        maximum = int(values[0])
+    else:
+        maximum = 100
+
+    return _slice_matcher(columns, _float_converter(3, maximum))
+
+
+def _boolean_matcher(columns=1, values=None):
+    return _slice_matcher(1, {'Y': True, 'N': False}.get)
+
+
+def _flag_matcher(columns=1, values=None):
+    return _slice_matcher(1, {'Y': 'Y', 'N': 'N', 'U': 'U'}.get)
+
+
+def _date_matcher(columns=8, values=None):
+    return _slice_matcher(8, _to_date)
+
+
+def _time_matcher(columns=6, values=None):
+    return _slice_matcher(6, _to_time)
+
+
+def _date_time_matcher(columns=14, values=None):
+    def convert(text):
+        date = _to_date(text[:8])
+        time = _to_time(text[8:])
+
+        if date is None or time is None:
+            return None
+
+        return datetime.datetime.combine(date, time)
+
+    return _slice_matcher(14, convert)
+
+
+def _blank_matcher(columns, values=None):
+    blank = ' ' * columns
+
+    return _slice_matcher(columns,
+                          lambda text: text if text == blank else None)
+
+
+def _lookup_matcher(columns, values=None):
+    """
+    Creates a matcher for a Lookup field.
+
+    Like the grammar rule, this accepts the longest of the values found at the
+    start of the field. For this the values are stored in a set for each
+    length.
+
+    :param columns: number of columns of the field
+    :param values: values accepted
+    :return: a matcher for the field
+    """
+    if values is None:
+        raise ValueError('The values can no be None')
+
+    sizes = lookup_table(values)
+
+    def match(line, pos):
+        for size, accepted in sizes:
+            text = line[pos:pos + size]
+            if text in accepted:
+                return text.strip(), pos + size
+
+        return None
+
+    return match
+
+
+def _lookup_int_matcher(columns, values=None):
+    lookup = _lookup_matcher(columns, values)
+
+    def match(line, pos):
+        result = lookup(line, pos)
+
+        if result is None:
+            return None
+
+        try:
+            return int(result[0]), result[1]
+        except ValueError:
+            return None
+
+    return match
+
+
+def _iswc_matcher(columns=11, values=None):
+    return _pattern_matcher('T[0-9]{10}')
+
+
+def _ipi_base_matcher(columns=13, values=None):
+    code = _pattern_matcher('I-[0-9]{9}-[0-9]')
+    number = _numeric_matcher(13)
+
+    def match(line, pos):
+        return code(line, pos) or number(line, pos)
+
+    return match
+
+
+def _ipi_name_matcher(columns=11, values=None):
+    return _numeric_matcher(11)
+
+
+def _ean13_matcher(columns=13, values=None):
+    return _numeric_matcher(13)
+
+
+def _isrc_matcher(columns=12, values=None):
+    return _pattern_matcher('[A-Z]{2}-.{3}-[0-9]{2}-[0-9]{2}|'
+                            '[A-Z]{2}.{3}[0-9]{2}[0-9]{5}')
+
+
+def _visan_matcher(columns=25, values=None):
+    return _pattern_matcher('[0-9]{25}')
+
+
+def _avi_matcher(columns=18, values=None):
+    society_code = _numeric_matcher(3)
+    av_number = _alphanum_end_matcher(15)
+    blank = ' ' * 15
+
+    def match(line, pos):
+        result = society_code(line, pos)
+
+        if result is None:
+            return None
+
+        code, pos = result
+
+        result = av_number(line, pos)
+        if result is not None:
+            number, pos = result
+        elif line[pos:pos + 15] == blank:
+            number = ''
+            pos += 15
+        else:
+            number = ''
+
+        return AVIKey(code, number), pos
+
+    return match
+
+
+def _charset_matcher(columns, values):
+    from data_cwr.accessor import CWRTables
+
+    char_sets = '|'.join('[ ]{%s}%s' % (15 - len(char_set), char_set)
+                         for char_set in CWRTables().get_data('character_set'))
+
+    return _pattern_matcher('(?:%s)|U\\+0[0-8,A-F]{3}[ ]{%s}|'
+                            'U\\+0[0-8,A-F]{4}[ ]{%s}' %
+                            (char_sets, columns - 6, columns - 7),
+                            lambda text: text.strip())
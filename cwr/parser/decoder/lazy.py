@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+import os
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
+
+import pyparsing as pp
+
+from cwr.file import CWRFile
+from cwr.group import Group
+from cwr.parser.decoder.common import Decoder
+from cwr.parser.decoder.reader import MappedFileReader
+from cwr.transmission import Transmission
+
+"""
+Classes for reading CWR files lazily.
+
+The LazyFileDecoder scans a file once, creating an index with the position of
+each group and transaction on it. Only the transmission and group headers and
+trailers are parsed while scanning. The transactions are parsed when they are
+accessed, so the cost of reading a file depends on how much of it is used,
+and not on its size.
+
+The file is kept mapped into memory with a MappedFileReader until the
+LazyCWRFile is closed.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class LazyTransactions(Sequence):
+    """
+    Sequence of the transactions in a group, parsed when they are accessed.
+
+    Each transaction is stored as the offsets of its first and last bytes on
+    the file. When a transaction is read its lines are parsed into a list of
+    records, and the most recently read transactions are kept in a cache, so
+    reading them again does not parse them again.
+    """
+
+    def __init__(self, reader, record_decoder, starts, ends, cache_size=128):
+        """
+        Constructs a LazyTransactions.
+
+        :param reader: MappedFileReader for the file
+        :param record_decoder: decoder for a single record line
+        :param starts: offset of the first byte of each transaction
+        :param ends: offset after the last byte of each transaction
+        :param cache_size: number of parsed transactions kept in the cache
+        """
+        self._reader = reader
+        self._record_decoder = record_decoder
+        self._starts = starts
+        self._ends = ends
+        self._cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Transaction index out of range')
+
+        transaction = self._cache.get(index)
+        if transaction is None:
+            transaction = self._parse(index)
+            self._cache[index] = transaction
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(index)
+
+        return transaction
+
+    def _parse(self, index):
+        decode = self._record_decoder.decode
+        return [decode(line)
+                for line in self._reader.lines(self._starts[index],
+                                               self._ends[index])]
+
+    def offsets(self, index):
+        """
+        Returns the offsets of a transaction on the file.
+
+        :param index: position of the transaction on the group
+        :return: a tuple with the offset of the transaction first byte and the
+        offset after its last byte
+        """
+        return self._starts[index], self._ends[index]
+
+
+class LazyCWRFile(CWRFile):
+    """
+    CWRFile read with a LazyFileDecoder.
+
+    The transactions of its groups are parsed when they are accessed, reading
+    them from the mapped file, which stays open until the file is closed.
+    """
+
+    def __init__(self, tag, transmission, reader):
+        super(LazyCWRFile, self).__init__(tag, transmission)
+        self._reader = reader
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Closes the mapped file. The transactions can't be read after this.
+        """
+        self._reader.close()
+
+
+class LazyFileDecoder(Decoder):
+    """
+    Decodes the file on a path into a LazyCWRFile.
+
+    The file is scanned once, parsing the control records, which are the
+    transmission and group headers and trailers, and storing the offsets of
+    the transactions. These are parsed only when they are accessed.
+
+    As with the StreamFileDecoder, a transaction begins on each record with
+    the transaction type of its group.
+    """
+
+    def __init__(self, record_decoder, filename_decoder, cache_size=128):
+        """
+        Constructs a LazyFileDecoder.
+
+        :param record_decoder: decoder for a single record line
+        :param filename_decoder: decoder for the file name
+        :param cache_size: number of parsed transactions kept in the cache of
+        each group
+        """
+        super(LazyFileDecoder, self).__init__()
+
+        self._record_decoder = record_decoder
+        self._filename_decoder = filename_decoder
+        self._cache_size = cache_size
+
+    def decode(self, path):
+        """
+        Scans the file on the path, creating a LazyCWRFile from it.
+
+        :param path: path to the file
+        :return: a LazyCWRFile instance
+        """
+        tag = self._filename_decoder.decode(os.path.basename(path))
+
+        reader = MappedFileReader(path)
+        try:
+            transmission = self._scan(reader)
+        except Exception:
+            reader.close()
+            raise
+
+        return LazyCWRFile(tag, transmission, reader)
+
+    def _scan(self, reader):
+        decode = self._record_decoder.decode
+
+        header = None
+        trailer = None
+        groups = []
+
+        group_header = None
+        transaction_type = None
+        starts = None
+        ends = None
+
+        for start, end in reader.offsets():
+            record_type = reader.record_type(start)
+
+            if record_type == 'HDR':
+                header = decode(reader.line(start, end))
+            elif record_type == 'GRH':
+                group_header = decode(reader.line(start, end))
+                transaction_type = group_header.transaction_type
+                starts = array('q')
+                ends = array('q')
+            elif record_type == 'GRT':
+                if group_header is None:
+                    raise pp.ParseException(reader.line(start, end), 0,
+                                            'Group trailer out of a group')
+                group_trailer = decode(reader.line(start, end))
+                transactions = LazyTransactions(reader, self._record_decoder,
+                                                starts, ends,
+                                                self._cache_size)
+                groups.append(Group(group_header, group_trailer,
+                                    transactions))
+                group_header = None
+            elif record_type == 'TRL':
+                trailer = decode(reader.line(start, end))
+            elif group_header is None:
+                raise pp.ParseException(reader.line(start, end), 0,
+                                        'Record %s out of a group' %
+                                        record_type)
+            elif record_type == transaction_type or not starts:
+                starts.append(start)
+                ends.append(end)
+            else:
+                ends[-1] = end
+
+        if header is None or trailer is None or group_header is not None:
+            raise pp.ParseException('', 0, 'Expected a valid CWR transmission')
+
+        return Transmission(header, trailer, groups)
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+
+import codecs
+import mmap
+import os
+
+"""
+Memory mapped reader for CWR files.
+
+The MappedFileReader maps a CWR file into memory, instead of reading it into
+a string, and finds the lines on the mapped bytes. Each line is decoded only
+when it is requested, and single fields can be decoded straight from the
+bytes without decoding the rest of the line.
+
+This avoids keeping copies of the whole contents of big files in memory, and
+lets the file be scanned, for example to find the record types, without
+decoding it.
+
+The encoding comes from the character set field of the transmission header.
+Files with the default character set are read as Latin-1, as the rest of the
+library does.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Position of the character set field on the transmission header
+_CHARSET_START = 86
+_CHARSET_END = 101
+
+# Encoding used when the header indicates no character set
+DEFAULT_ENCODING = 'latin-1'
+
+# Python codecs for the CWR character sets
+_CHARSET_ENCODINGS = {
+    '': DEFAULT_ENCODING,
+    'ASCII': DEFAULT_ENCODING,
+    'BIG5': 'big5',
+    'GB': 'gb2312',
+    'UTF-8': 'utf-8'
+}
+
+# Encodings where each character takes a single byte
+_SINGLE_BYTE_ENCODINGS = ('ascii', 'iso8859-1', 'latin-1', 'cp1252')
+
+
+def charset_encoding(character_set):
+    """
+    Returns the Python codec for a CWR character set.
+
+    The Unicode character sets, indicated by a code such as U+0400, are read
+    as UTF-8. Unknown character sets are read with the default encoding.
+
+    :param character_set: the character set from the transmission header
+    :return: the name of the codec for the character set
+    """
+    character_set = character_set.strip().upper()
+
+    if character_set in _CHARSET_ENCODINGS:
+        return _CHARSET_ENCODINGS[character_set]
+    elif character_set.startswith('U+'):
+        return 'utf-8'
+
+    try:
+        return codecs.lookup(character_set).name
+    except LookupError:
+        return DEFAULT_ENCODING
+
+
+class MappedFileReader(object):
+    """
+    Reads a CWR file from a memory map.
+
+    The lines are found on the mapped bytes, and are identified by the offset
+    of their first byte. Blank lines, and anything before the transmission
+    header, such as a BOM, are skipped.
+
+    The reader should be closed after using it, which can be done with a with
+    statement:
+
+        with MappedFileReader(path) as reader:
+            for line in reader:
+                ...
+    """
+
+    def __init__(self, path, encoding=None):
+        """
+        Constructs a MappedFileReader.
+
+        If the encoding is not set, then it is taken from the character set on
+        the transmission header.
+
+        :param path: path to the file
+        :param encoding: encoding of the file
+        """
+        self._path = path
+
+        self._file = open(path, 'rb')
+        if os.fstat(self._file.fileno()).st_size > 0:
+            self._buffer = mmap.mmap(self._file.fileno(), 0,
+                                     access=mmap.ACCESS_READ)
+        else:
+            # Empty files can't be mapped
+            self._buffer = b''
+
+        self._start = self._buffer.find(b'H')
+        if self._start < 0:
+            self._start = len(self._buffer)
+
+        if encoding is None:
+            encoding = charset_encoding(
+                self._read(self._start + _CHARSET_START,
+                           self._start + _CHARSET_END).decode('ascii',
+                                                              'replace'))
+        self._encoding = encoding
+        self._single_byte = codecs.lookup(encoding).name in \
+                            _SINGLE_BYTE_ENCODINGS
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        return self.lines()
+
+    def _read(self, start, end):
+        line_end = self._buffer.find(b'\n', start, end)
+        if line_end >= 0:
+            end = line_end
+        return self._buffer[start:end].rstrip(b'\r\n')
+
+    def close(self):
+        """
+        Closes the memory map and the file.
+        """
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._file.close()
+
+    @property
+    def buffer(self):
+        """
+        Bytes of the file, as a memory map.
+
+        :return: the mapped file
+        """
+        return self._buffer
+
+    @property
+    def encoding(self):
+        """
+        Encoding used to decode the lines.
+
+        :return: the codec name
+        """
+        return self._encoding
+
+    @property
+    def path(self):
+        """
+        Path to the file.
+
+        :return: the file path
+        """
+        return self._path
+
+    def offsets(self, start=None, end=None):
+        """
+        Returns the offsets of the lines in a part of the file.
+
+        Each line is returned as a tuple with the offset of its first byte and
+        the offset just after its last one, without the line break. Blank
+        lines are skipped.
+
+        :param start: offset where the part begins, by default the
+        transmission header
+        :param end: offset where the part ends, by default the end of the file
+        :return: a generator for the line offsets
+        """
+        buffer = self._buffer
+        if start is None:
+            start = self._start
+        if end is None:
+            end = len(buffer)
+
+        position = start
+        while position < end:
+            line_end = buffer.find(b'\n', position, end)
+            if line_end < 0:
+                line_end = end
+            next_line = line_end + 1
+
+            if line_end > position and buffer[line_end - 1:line_end] == b'\r':
+                line_end -= 1
+
+            if buffer[position:line_end].strip():
+                yield position, line_end
+
+            position = next_line
+
+    def line(self, start, end):
+        """
+        Decodes a line.
+
+        :param start: offset of the first byte of the line
+        :param end: offset after the last byte of the line
+        :return: the decoded line
+        """
+        return self._buffer[start:end].decode(self._encoding)
+
+    def lines(self, start=None, end=None):
+        """
+        Returns the decoded lines in a part of the file.
+
+        The result can be given to a StreamFileDecoder.
+
+        :param start: offset where the part begins, by default the
+        transmission header
+        :param end: offset where the part ends, by default the end of the file
+        :return: a generator for the decoded lines
+        """
+        buffer = self._buffer
+        encoding = self._encoding
+        for line_start, line_end in self.offsets(start, end):
+            yield buffer[line_start:line_end].decode(encoding)
+
+    def text(self):
+        """
+        Decodes the whole file, from the transmission header.
+
+        :return: the decoded contents
+        """
+        return self._buffer[self._start:].decode(self._encoding)
+
+    def record_type(self, start):
+        """
+        Returns the record type of the line beginning at an offset.
+
+        :param start: offset of the first byte of the line
+        :return: the record type
+        """
+        return self._buffer[start:start + 3].decode('ascii', 'replace')
+
+    def field(self, start, end, column, size):
+        """
+        Decodes a single field from a line.
+
+        On single byte encodings only the bytes of the field are decoded. On
+        other encodings the columns don't match the bytes, so the line is
+        decoded up to the end of the field.
+
+        :param start: offset of the first byte of the line
+        :param end: offset after the last byte of the line
+        :param column: position of the field on the line
+        :param size: size of the field
+        :return: the field value, without the padding spaces
+        """
+        if self._single_byte:
+            value = self._buffer[min(start + column, end):
+                                 min(start + column + size, end)]
+            return value.decode(self._encoding).strip()
+
+        text = self._buffer[start:end].decode(self._encoding)
+        return text[column:column + size].strip()
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+
+import pyparsing as pp
+
+from cwr.grammar.factory.config import rule_at_least
+
+"""
+State machines for checking the structure of CWR transactions.
+
+When the records are parsed one by one, instead of with the grammar for the
+whole file, the order of the records inside each transaction is not checked
+by the grammar. The classes in this module take care of this, using state
+machines created from the same transaction configuration as the grammar.
+
+Each machine is built by joining the states for each record and group in the
+configuration, and so a record can lead to several states at once. These sets
+of states are stored as they are found, so after the first few transactions
+checking a record only requires a dictionary lookup, and there is no
+backtracking, unlike with the grammar.
+
+The main classes are:
+- TransactionStructureFactory, which creates the machine for each transaction
+rule.
+- TransactionStructure, the state machine for a transaction.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TransactionStructure(object):
+    """
+    State machine accepting the sequences of record type codes which form a
+    valid transaction.
+
+    The states returned are opaque values, which should only be used with the
+    methods of the same machine.
+    """
+
+    def __init__(self, rule_id, transitions, empty_transitions, start, end):
+        """
+        Constructs a TransactionStructure.
+
+        The transitions should be a list with, for each state, a dict mapping
+        record type codes to the states they lead to. The empty transitions
+        are a list with, for each state, the states reached without reading any
+        record.
+
+        :param rule_id: id of the transaction rule
+        :param transitions: transitions for each record type code
+        :param empty_transitions: transitions without records
+        :param start: the initial state
+        :param end: the final state
+        """
+        self._rule_id = rule_id
+        self._transitions = transitions
+        self._empty_transitions = empty_transitions
+        self._end = end
+
+        # Transitions between sets of states already computed
+        self._cache = {}
+
+        self._start = self._closure([start])
+
+    @property
+    def rule_id(self):
+        """
+        Id of the transaction rule this machine was created from.
+
+        :return: the rule id
+        """
+        return self._rule_id
+
+    @property
+    def record_types(self):
+        """
+        Record type codes which can begin the transaction.
+
+        :return: the codes starting the transaction
+        """
+        return frozenset(self._step_codes(self._start))
+
+    def start(self):
+        """
+        Returns the state before reading any record.
+
+        :return: the initial state
+        """
+        return self._start
+
+    def next_state(self, state, record_type):
+        """
+        Returns the state after reading a record.
+
+        If the record can't appear at that point of the transaction None is
+        returned.
+
+        :param state: the current state
+        :param record_type: the record type code read
+        :return: the next state, or None if the record is not valid
+        """
+        key = (state, record_type)
+
+        if key in self._cache:
+            result = self._cache[key]
+        else:
+            reached = []
+            for current in state:
+                reached.extend(self._transitions[current].get(record_type, ()))
+
+            if reached:
+                result = self._closure(reached)
+            else:
+                result = None
+
+            self._cache[key] = result
+
+        return result
+
+    def is_complete(self, state):
+        """
+        Indicates if the transaction can end at this state.
+
+        :param state: the current state
+        :return: True if the transaction is complete, False otherwise
+        """
+        return self._end in state
+
+    def validate(self, record_types):
+        """
+        Checks a full transaction.
+
+        If the record types do not follow the structure of the transaction a
+        ParseException is raised.
+
+        :param record_types: the record type codes of the transaction
+        """
+        state = self.start()
+
+        for record_type in record_types:
+            next_state = self.next_state(state, record_type)
+            if next_state is None:
+                raise pp.ParseException(record_type, 0,
+                                        'Unexpected record %s in %s' %
+                                        (record_type, self._rule_id))
+            state = next_state
+
+        if not self.is_complete(state):
+            raise pp.ParseException('', 0, 'Incomplete %s' % self._rule_id)
+
+    def _closure(self, states):
+        closure = set(states)
+        pending = list(states)
+
+        while pending:
+            for state in self._empty_transitions[pending.pop()]:
+                if state not in closure:
+                    closure.add(state)
+                    pending.append(state)
+
+        return frozenset(closure)
+
+    def _step_codes(self, state):
+        codes = set()
+        for current in state:
+            codes.update(self._transitions[current])
+
+        return codes
+
+
+class TransactionStructureFactory(object):
+    """
+    Factory for acquiring transaction state machines.
+
+    These are created from the same configuration as the grammar rules, where
+    each record is identified by the record type codes of its rule.
+    """
+
+    def __init__(self, record_configs, transaction_configs):
+        """
+        Constructs a TransactionStructureFactory.
+
+        Both the record and the transaction configurations should be dicts
+        mapping the rule ids to their configuration.
+
+        :param record_configs: configuration for the records
+        :param transaction_configs: configuration for the transactions
+        """
+        super(TransactionStructureFactory, self).__init__()
+        # Machines already created
+        self._structures = {}
+
+        self._record_configs = record_configs
+        self._transaction_configs = transaction_configs
+
+        # Machine being built
+        self._transitions = None
+        self._empty_transitions = None
+
+    def get_structure(self, rule_id):
+        """
+        Returns the state machine for the transaction rule identified by the
+        id.
+
+        :param rule_id: id of the transaction rule
+        :return: the state machine for the transaction
+        """
+        if rule_id in self._structures:
+            structure = self._structures[rule_id]
+        else:
+            structure = self._build_structure(rule_id)
+            self._structures[rule_id] = structure
+
+        return structure
+
+    def _build_structure(self, rule_id):
+        self._transitions = []
+        self._empty_transitions = []
+
+        start = self._new_state()
+        end = self._process_rules(
+            self._transaction_configs[rule_id].rules, start)
+
+        return TransactionStructure(rule_id, self._transitions,
+                                    self._empty_transitions, start, end)
+
+    def _new_state(self):
+        self._transitions.append({})
+        self._empty_transitions.append([])
+
+        return len(self._transitions) - 1
+
+    def _process_rules(self, rules, state):
+        for rule in rules:
+            if rule.rules:
+                state = self._process_rules_group(rule, state)
+            else:
+                state = self._build_terminal_states(rule, state)
+
+        return state
+
+    def _process_rules_group(self, rules, state):
+        group_type = rules.list_type
+
+        if group_type == 'sequence':
+            end = self._process_rules(rules.rules, state)
+        elif group_type == 'option':
+            end = self._new_state()
+            for rule in rules.rules:
+                option_end = self._process_rules([rule], state)
+                self._empty_transitions[option_end].append(end)
+        elif group_type == 'optional':
+            end = self._process_rules(rules.rules, state)
+            self._empty_transitions[state].append(end)
+        else:
+            raise ValueError('Unknown rules group %s' % group_type)
+
+        return end
+
+    def _build_terminal_states(self, rule, state):
+        rule_id = rule.rule_name
+        modifiers = rule.rule_options
+
+        try:
+            modifiers = modifiers.asList()
+        except AttributeError:
+            modifiers = []
+
+        if 'optional' in modifiers:
+            end = self._build_rule_states(rule_id, state)
+            self._empty_transitions[state].append(end)
+        else:
+            times = None
+            for modifier in modifiers:
+                if modifier.startswith('at_least'):
+                    times = rule_at_least.parseString(modifier)[0]
+
+            if times is None:
+                end = self._build_rule_states(rule_id, state)
+            else:
+                for _ in range(times):
+                    state = self._build_rule_states(rule_id, state)
+
+                # Repetition
+                end = self._new_state()
+                self._empty_transitions[state].append(end)
+                repeated = self._build_rule_states(rule_id, end)
+                self._empty_transitions[repeated].append(end)
+
+        return end
+
+    def _build_rule_states(self, rule_id, state):
+        if rule_id in self._transaction_configs:
+            end = self._process_rules(
+                self._transaction_configs[rule_id].rules, state)
+        else:
+            end = self._new_state()
+            for head in self._record_configs[rule_id].head:
+                self._transitions[state].setdefault(head, []).append(end)
+
+        return end
@@ -0,0 +1,487 @@
+# -*- coding: utf-8 -*-
+
+from abc import ABCMeta, abstractmethod
+from array import array
+from collections import OrderedDict
+
+from cwr.file import CWRFile
+from cwr.group import Group
+from cwr.parser.decoder.file import default_configs
+from cwr.parser.encoder.common import Encoder
+from cwr.parser.encoder.dictionary import TransactionRecordDictionaryEncoder
+from cwr.parser.encoder.standart.accessor import get_accessor
+from cwr.transmission import Transmission
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+"""
+Classes for encoding CWR model instances into columns.
+
+The ColumnarEncoder receives a transmission, or a full CWR file, and returns
+a table for each record type, such as SWR, SPU or SPT. Each table stores its
+fields as columns, so the values of a field for all the records are kept
+together:
+
+- Numeric fields, such as shares and sequence numbers, are stored on arrays
+  from the array module, which can be used as NumPy arrays without copying
+  them.
+- Lookup fields, such as society or TIS codes, are dictionary encoded. The
+  column stores the index of each value on a list of the distinct values.
+- Any other field is stored on a list.
+
+This way checks such as the share totals of each transaction can work over
+whole columns, instead of going through the records one by one.
+
+NumPy is not required, but the to_numpy methods need it.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Field types stored as floating point numbers
+_FLOAT_TYPES = ('numeric_float', 'percentage')
+
+# Field types stored as integer numbers
+_INTEGER_TYPES = ('numeric', 'ipi_name_n', 'year')
+
+# Field types stored dictionary encoded
+_DICTIONARY_TYPES = ('lookup', 'lookup_int', 'flag', 'boolean')
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError('NumPy is required for creating NumPy arrays')
+
+
+class Column(object, metaclass=ABCMeta):
+    """
+    Values of a single field for all the records in a table.
+
+    Missing values are stored as None, or as a null value on the columns
+    which can't store None.
+    """
+
+    def __init__(self, name):
+        self._name = name
+
+    @abstractmethod
+    def __len__(self):
+        raise NotImplementedError('The __len__ method must be implemented')
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @abstractmethod
+    def __getitem__(self, index):
+        raise NotImplementedError('The __getitem__ method must be implemented')
+
+    @abstractmethod
+    def append(self, value):
+        """
+        Adds a value at the end of the column.
+
+        :param value: the value to add
+        """
+        raise NotImplementedError('The append method must be implemented')
+
+    @property
+    def name(self):
+        """
+        Name of the field stored on the column.
+
+        :return: the field name
+        """
+        return self._name
+
+    def to_list(self):
+        """
+        Returns the values of the column, with None for the missing values.
+
+        :return: a list with the values of the column
+        """
+        return list(self)
+
+
+class NumericColumn(Column):
+    """
+    Column for numeric values, stored on an array.
+
+    The missing values are stored as zero on the values array, and marked on
+    the mask array, which holds a 1 for each value which is set.
+    """
+
+    def __init__(self, name, typecode='d'):
+        super(NumericColumn, self).__init__(name)
+        self._values = array(typecode)
+        self._mask = array('B')
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, index):
+        if self._mask[index]:
+            return self._values[index]
+        else:
+            return None
+
+    def append(self, value):
+        if value is None:
+            self._values.append(0)
+            self._mask.append(0)
+        else:
+            self._values.append(value)
+            self._mask.append(1)
+
+    @property
+    def mask(self):
+        """
+        Array indicating which values are set.
+
+        :return: an array with a 1 for each value set, and a 0 for each
+        missing value
+        """
+        return self._mask
+
+    @property
+    def values(self):
+        """
+        Array with the values. The missing values are stored as zero.
+
+        :return: the values array
+        """
+        return self._values
+
+    def sum(self):
+        """
+        Sums all the values on the column.
+
+        :return: the sum of the values
+        """
+        return sum(self._values)
+
+    def to_numpy(self):
+        """
+        Returns the column as a NumPy array.
+
+        The array shares the memory of the column. If there are missing
+        values then a masked array is returned.
+
+        :return: a NumPy array with the column values
+        """
+        _require_numpy()
+
+        values = numpy.frombuffer(self._values, dtype=self._values.typecode)
+        if all(self._mask):
+            return values
+
+        mask = numpy.frombuffer(self._mask, dtype=numpy.uint8) == 0
+        return numpy.ma.masked_array(values, mask=mask)
+
+
+class DictionaryColumn(Column):
+    """
+    Column for dictionary encoded values.
+
+    Each distinct value is stored once on the dictionary, and the column
+    keeps the index of each value on the dictionary. Missing values have the
+    index -1.
+    """
+
+    def __init__(self, name):
+        super(DictionaryColumn, self).__init__(name)
+        self._indexes = array('i')
+        self._dictionary = []
+        self._positions = {}
+
+    def __len__(self):
+        return len(self._indexes)
+
+    def __getitem__(self, index):
+        position = self._indexes[index]
+        if position < 0:
+            return None
+        else:
+            return self._dictionary[position]
+
+    def append(self, value):
+        if value is None:
+            self._indexes.append(-1)
+        else:
+            position = self._positions.get(value)
+            if position is None:
+                position = len(self._dictionary)
+                self._positions[value] = position
+                self._dictionary.append(value)
+            self._indexes.append(position)
+
+    @property
+    def dictionary(self):
+        """
+        Distinct values on the column, in the order they were found.
+
+        :return: a list with the distinct values
+        """
+        return self._dictionary
+
+    @property
+    def indexes(self):
+        """
+        Array with the position on the dictionary of each value, or -1 for
+        the missing values.
+
+        :return: the indexes array
+        """
+        return self._indexes
+
+    def to_numpy(self):
+        """
+        Returns the indexes of the column as a NumPy array.
+
+        The array shares the memory of the column.
+
+        :return: a NumPy array with the indexes of the column values
+        """
+        _require_numpy()
+
+        return numpy.frombuffer(self._indexes, dtype=self._indexes.typecode)
+
+
+class ObjectColumn(Column):
+    """
+    Column for any other value, stored on a list.
+    """
+
+    def __init__(self, name):
+        super(ObjectColumn, self).__init__(name)
+        self._values = []
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, index):
+        return self._values[index]
+
+    def append(self, value):
+        self._values.append(value)
+
+    def to_numpy(self):
+        """
+        Returns the column as a NumPy array of objects.
+
+        :return: a NumPy array with the column values
+        """
+        _require_numpy()
+
+        values = numpy.empty(len(self._values), dtype=object)
+        values[:] = self._values
+        return values
+
+
+class RecordTable(object):
+    """
+    Table with the fields of all the records of a single type.
+
+    Each field is stored on a column, and all the columns have one value for
+    each record. When a record lacks a field then the value is missing on
+    that column.
+    """
+
+    def __init__(self, record_type, column_factory):
+        """
+        Constructs a RecordTable.
+
+        :param record_type: record type of the records on the table
+        :param column_factory: function creating the column for a field name
+        """
+        self._record_type = record_type
+        self._column_factory = column_factory
+        self._columns = OrderedDict()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, name):
+        return self._columns[name]
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def add_row(self, values):
+        """
+        Adds a row to the table.
+
+        :param values: iterable with the names and values of the fields
+        """
+        for name, value in values:
+            column = self._columns.get(name)
+            if column is None:
+                column = self._column_factory(name)
+                for _ in range(self._size):
+                    column.append(None)
+                self._columns[name] = column
+            column.append(value)
+
+        self._size += 1
+        for column in self._columns.values():
+            if len(column) < self._size:
+                column.append(None)
+
+    @property
+    def columns(self):
+        """
+        Columns of the table, mapped to the names of their fields.
+
+        :return: the table columns
+        """
+        return self._columns
+
+    @property
+    def record_type(self):
+        """
+        Record type of the records on the table.
+
+        :return: the record type
+        """
+        return self._record_type
+
+    def sum_by(self, key, value):
+        """
+        Sums the values of a numeric column, grouping them by the values of
+        another column.
+
+        For example, sum_by('transaction_sequence_n', 'pr_ownership_share')
+        returns the performing rights share total of each transaction.
+
+        Missing values are not added.
+
+        :param key: name of the column to group by
+        :param value: name of the numeric column to sum
+        :return: a dict mapping each key to the sum of its values
+        """
+        keys = self._columns[key]
+        values = self._columns[value]
+
+        if isinstance(keys, DictionaryColumn):
+            codes = keys.indexes
+        else:
+            codes = keys
+
+        totals = {}
+        for code, number, is_set in zip(codes, values.values, values.mask):
+            if is_set:
+                totals[code] = totals.get(code, 0) + number
+
+        if isinstance(keys, DictionaryColumn):
+            totals = {(keys.dictionary[code] if code >= 0 else None): total
+                      for code, total in totals.items()}
+
+        return totals
+
+
+class ColumnarEncoder(Encoder):
+    """
+    Encodes a CWR file, a transmission or a group into tables of columns,
+    one for each record type.
+
+    The type of each column comes from the field configuration, so the shares
+    and numbers are stored on arrays, and the lookup fields are dictionary
+    encoded.
+    """
+
+    def __init__(self, field_configs=None):
+        """
+        Constructs a ColumnarEncoder.
+
+        :param field_configs: field configurations, by default those used by
+        the decoders
+        """
+        super(ColumnarEncoder, self).__init__()
+        if field_configs is None:
+            field_configs = default_configs()['fields']
+        self._field_configs = field_configs
+        self._dictionary_encoder = TransactionRecordDictionaryEncoder()
+
+    def create_column(self, name):
+        """
+        Creates the column for a field, according to its type.
+
+        :param name: name of the field
+        :return: an empty column for the field
+        """
+        field_type = self._field_configs.get(name, {}).get('type')
+
+        if field_type in _FLOAT_TYPES:
+            return NumericColumn(name, 'd')
+        elif field_type in _INTEGER_TYPES:
+            return NumericColumn(name, 'q')
+        elif field_type in _DICTIONARY_TYPES:
+            return DictionaryColumn(name)
+        else:
+            return ObjectColumn(name)
+
+    def encode(self, entity):
+        """
+        Encodes a CWRFile, a Transmission or a Group into tables.
+
+        Any other iterable is taken as a sequence of records.
+
+        :param entity: the instance to encode
+        :return: a dict mapping each record type to its RecordTable
+        """
+        tables = OrderedDict()
+        self.add_records(tables, _records(entity))
+        return tables
+
+    def add_records(self, tables, records):
+        """
+        Adds records to the tables, creating the tables which don't exist
+        yet.
+
+        This allows building the tables incrementally, for example while
+        decoding a file.
+
+        :param tables: dict mapping each record type to its RecordTable
+        :param records: the records to add
+        """
+        for record in records:
+            table = tables.get(record.record_type)
+            if table is None:
+                table = RecordTable(record.record_type, self.create_column)
+                tables[record.record_type] = table
+
+            table.add_row(self._values(record))
+
+    def _values(self, record):
+        accessor = get_accessor(type(record))
+        if accessor is None:
+            return self._dictionary_encoder.encode(record).items()
+
+        return [(name, accessor.get_getter(name)(record))
+                for name in sorted(accessor.get_names(record))]
+
+
+def _records(entity):
+    if isinstance(entity, CWRFile):
+        entity = entity.transmission
+
+    if isinstance(entity, Transmission):
+        yield entity.header
+        for group in entity.groups:
+            for record in _records(group):
+                yield record
+        yield entity.trailer
+    elif isinstance(entity, Group):
+        yield entity.group_header
+        for transaction in entity.transactions:
+            for record in transaction:
+                yield record
+        yield entity.group_trailer
+    else:
+        for record in entity:
+            yield record
@@ -3,14 +3,24 @@
 import json
 import sys
 
-from cwr.parser.encoder.dictionary import FileDictionaryEncoder
+from cwr.file import CWRFile
+from cwr.group import GroupHeader, GroupTrailer
+from cwr.parser.encoder.dictionary import FileDictionaryEncoder, \
+    FileTagDictionaryEncoder, GroupHeaderDictionaryEncoder, \
+    GroupTrailerDictionaryEncoder, TransactionRecordDictionaryEncoder, \
+    TransmissionHeaderDictionaryEncoder, TransmissionTrailerDictionaryEncoder
 from cwr.parser.encoder.common import Encoder
+from cwr.transmission import TransmissionHeader, TransmissionTrailer
 
 """
 Classes for encoding CWR classes into JSON dictionaries.
 
-It just consists of a single parser, the JSONEncoder, which delegates most of
-the work to an instance of the CWRDictionaryEncoder.
+The JSONEncoder creates a single JSON document for a whole file, delegating
+most of the work to an instance of the CWRDictionaryEncoder.
+
+The NDJSONEncoder instead creates a JSON document for each part of the
+transmission, one per line, so each part can be written as soon as it is
+read, for example by a StreamFileDecoder.
 """
 
 __author__ = 'Bernardo Martínez Garrido'
@@ -54,6 +64,114 @@ class JSONEncoder(Encoder):
         return result
 
 
+class NDJSONEncoder(Encoder):
+    """
+    Encodes a CWR file into newline delimited JSON.
+
+    Each line is a JSON object for a part of the transmission, with a single
+    key indicating the part:
+    - header, the transmission header. This line also has the file tag, in
+    the tag key, which may be null.
+    - group_header
+    - transaction, a list with the transaction records
+    - group_trailer
+    - trailer, the transmission trailer
+
+    The values are the same dictionaries the JSONEncoder creates for those
+    parts, as the same dictionary encoders are used.
+
+    The lines are in the same order as the parts in the file, which is the
+    order they are returned by a StreamFileDecoder, so a file can be converted
+    while it is read, without keeping it in memory.
+    """
+
+    def __init__(self):
+        super(NDJSONEncoder, self).__init__()
+        self._encoder_tag = FileTagDictionaryEncoder()
+        self._encoder_header = TransmissionHeaderDictionaryEncoder()
+        self._encoder_trailer = TransmissionTrailerDictionaryEncoder()
+        self._encoder_group_header = GroupHeaderDictionaryEncoder()
+        self._encoder_group_trailer = GroupTrailerDictionaryEncoder()
+        self._encoder_record = TransactionRecordDictionaryEncoder()
+
+    def encode(self, entity):
+        """
+        Encodes a CWRFile or a Transmission into newline delimited JSON.
+
+        :param entity: the instance to encode
+        :return: the JSON lines, each of them ended by a line break
+        """
+        if isinstance(entity, CWRFile):
+            tag = entity.tag
+            entity = entity.transmission
+        else:
+            tag = None
+
+        return ''.join(line + '\n'
+                       for line in self.encode_parts(entity.parts(), tag))
+
+    def encode_part(self, part, tag=None):
+        """
+        Encodes a part of the transmission into a JSON line.
+
+        :param part: the part to encode
+        :param tag: the FileTag, used only with the transmission header
+        :return: the JSON line, without a line break
+        """
+        if isinstance(part, TransmissionHeader):
+            if tag is None:
+                encoded_tag = None
+            else:
+                encoded_tag = self._encoder_tag.encode(tag)
+            encoded = {'tag': encoded_tag,
+                       'header': self._encoder_header.encode(part)}
+        elif isinstance(part, GroupHeader):
+            encoded = {'group_header': self._encoder_group_header.encode(part)}
+        elif isinstance(part, GroupTrailer):
+            encoded = {
+                'group_trailer': self._encoder_group_trailer.encode(part)}
+        elif isinstance(part, TransmissionTrailer):
+            encoded = {'trailer': self._encoder_trailer.encode(part)}
+        else:
+            encoded = {'transaction': [self._encoder_record.encode(record)
+                                       for record in part]}
+
+        return json.dumps(encoded, ensure_ascii=False, default=_iso_handler)
+
+    def encode_parts(self, parts, tag=None):
+        """
+        Encodes the parts of a transmission into JSON lines, as they are
+        received.
+
+        :param parts: iterable with the transmission parts
+        :param tag: the FileTag, included with the transmission header
+        :return: a generator for the JSON lines, without line breaks
+        """
+        for part in parts:
+            yield self.encode_part(part, tag)
+
+    def write(self, handle, parts, tag=None):
+        """
+        Writes the parts of a transmission into a text file handle, one JSON
+        line for each part.
+
+        The parts can come from a StreamFileDecoder, so the file is converted
+        without keeping it in memory.
+
+        :param handle: the text file handle to write into
+        :param parts: iterable with the transmission parts
+        :param tag: the FileTag, included with the transmission header
+        :return: the number of lines written
+        """
+        count = 0
+        for line in self.encode_parts(parts, tag):
+            handle.write(line)
+            handle.write('\n')
+            count += 1
+
+        return count
+
+
 def _unicode_handler(obj):
     """
     Transforms an unicode string into a UTF-8 equivalent.
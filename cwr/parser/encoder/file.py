@@ -1,9 +1,13 @@
 # -*- coding: utf-8 -*-
+import io
+
 from config_cwr.accessor import CWRConfiguration
 
 from cwr.parser.encoder.common import Encoder
 from cwr.parser.encoder.standart.record import CwrRecordEncoderFactory
 from data_cwr.accessor import CWRTables
+from cwr.group import GroupHeader, GroupTrailer
+from cwr.transmission import TransmissionHeader, TransmissionTrailer
 import difflib
 
 """
@@ -25,6 +29,10 @@ transformed into the resulting string.
 
 These encoders are created from BaseCWRFileNameEncoder, just setting the
 correct sequence number length.
+
+For writing big files the default_file_writer() method returns a
+CwrFileWriter, which writes each record to a file as soon as it is encoded,
+instead of creating the whole file contents in memory.
 """
 
 __author__ = 'Bernardo Martínez Garrido'
@@ -172,16 +180,272 @@ class CwrFileEncoder(Encoder):
         :param entity: the instance to encode
         :return: a cwr string structure created from the received data
         """
-        data = ''
-        data += self._record_encode(transmission.header)
+        data = [self._record_encode(transmission.header)]
         for group in transmission.groups:
-            data += self._record_encode(group.group_header)
+            data.append(self._record_encode(group.group_header))
             for transaction in group.transactions:
                 for record in transaction:
-                    data += self._record_encode(record)
-            data += self._record_encode(group.group_trailer)
-        data += self._record_encode(transmission.trailer)
-        return data
+                    data.append(self._record_encode(record))
+            data.append(self._record_encode(group.group_trailer))
+        data.append(self._record_encode(transmission.trailer))
+        return ''.join(data)
+
+
+class CwrFileWriter(object):
+    """
+    Writes a CWR file into a file handle, encoding each record as it is
+    received.
+
+    The records are kept in a small buffer, which is written with writelines
+    when it is full, so the memory used does not depend on the size of the
+    file.
+
+    The group and transmission trailers are created by the writer, with the
+    number of transactions and records written. These counts include the
+    header and trailer records, as required by the standard.
+
+    The file can be written in parts, calling write_header, then for each
+    group start_group, write_transaction for each transaction and end_group,
+    and finally write_trailer. Or at once with write_transmission or
+    write_parts.
+
+    If the handle is a binary file the records are encoded with the received
+    encoding.
+    """
+
+    def __init__(self, handle, record_encoder_factory, encoding='latin-1',
+                 buffer_size=1000):
+        """
+        Constructs a CwrFileWriter.
+
+        :param handle: the file handle to write into
+        :param record_encoder_factory: factory for the record encoders
+        :param encoding: encoding for binary handles
+        :param buffer_size: number of records kept before writing them
+        """
+        super(CwrFileWriter, self).__init__()
+
+        self._handle = handle
+        self._record_encoder_factory = record_encoder_factory
+        self._buffer_size = buffer_size
+
+        if _is_binary(handle):
+            self._encoding = encoding
+        else:
+            self._encoding = None
+
+        self._buffer = []
+
+        # Transmission counters
+        self._group_count = 0
+        self._transaction_count = 0
+        self._record_count = 0
+
+        # Current group
+        self._group_header = None
+        self._group_transaction_count = 0
+        self._group_record_count = 0
+
+    @property
+    def group_count(self):
+        """
+        Number of groups written.
+
+        :return: the number of groups
+        """
+        return self._group_count
+
+    @property
+    def transaction_count(self):
+        """
+        Number of transactions written.
+
+        :return: the number of transactions
+        """
+        return self._transaction_count
+
+    @property
+    def record_count(self):
+        """
+        Number of records written, including control records.
+
+        :return: the number of records
+        """
+        return self._record_count
+
+    def write_header(self, header):
+        """
+        Writes the transmission header.
+
+        :param header: the TransmissionHeader
+        """
+        self._write(header)
+
+    def start_group(self, group_header):
+        """
+        Writes a group header, beginning a new group.
+
+        :param group_header: the GroupHeader
+        """
+        if self._group_header is not None:
+            raise ValueError('The group %s has not been ended' %
+                             self._group_header.group_id)
+
+        self._group_header = group_header
+        self._group_transaction_count = 0
+        self._group_record_count = 1
+
+        self._write(group_header)
+
+    def write_transaction(self, transaction):
+        """
+        Writes all the records of a transaction into the current group.
+
+        :param transaction: the transaction records
+        """
+        if self._group_header is None:
+            raise ValueError('Transactions can only be written inside a group')
+
+        for record in transaction:
+            self._write(record)
+            self._group_record_count += 1
+
+        self._group_transaction_count += 1
+        self._transaction_count += 1
+
+    def end_group(self, group_trailer=None):
+        """
+        Writes the trailer for the current group.
+
+        The counts are set from the transactions written. Other values, such
+        as the monetary value, are taken from the received trailer, if any.
+
+        :param group_trailer: the GroupTrailer with the additional values
+        :return: the GroupTrailer written
+        """
+        if self._group_header is None:
+            raise ValueError('There is no group to end')
+
+        if group_trailer is None:
+            group_trailer = GroupTrailer(record_type='GRT')
+
+        trailer = GroupTrailer(
+            record_type='GRT',
+            group_id=self._group_header.group_id,
+            transaction_count=self._group_transaction_count,
+            record_count=self._group_record_count + 1,
+            currency_indicator=group_trailer.currency_indicator,
+            total_monetary_value=group_trailer.total_monetary_value)
+
+        self._write(trailer)
+
+        self._group_header = None
+        self._group_count += 1
+
+        return trailer
+
+    def write_trailer(self):
+        """
+        Writes the transmission trailer, with the counts of the groups,
+        transactions and records written, and flushes the buffer.
+
+        :return: the TransmissionTrailer written
+        """
+        if self._group_header is not None:
+            raise ValueError('The group %s has not been ended' %
+                             self._group_header.group_id)
+
+        trailer = TransmissionTrailer(
+            record_type='TRL',
+            group_count=self._group_count,
+            transaction_count=self._transaction_count,
+            record_count=self._record_count + 1)
+
+        self._write(trailer)
+        self.flush()
+
+        return trailer
+
+    def write_transmission(self, header, groups):
+        """
+        Writes a full transmission.
+
+        The groups should be an iterable of Group instances, or any object
+        with a group_header, transactions and group_trailer attributes. The
+        groups and their transactions can be generators, so they are created
+        only when written.
+
+        :param header: the TransmissionHeader
+        :param groups: the groups to write
+        :return: the TransmissionTrailer written
+        """
+        self.write_header(header)
+
+        for group in groups:
+            self.start_group(group.group_header)
+            for transaction in group.transactions:
+                self.write_transaction(transaction)
+            self.end_group(group.group_trailer)
+
+        return self.write_trailer()
+
+    def write_parts(self, parts):
+        """
+        Writes the transmission parts, in the same order as they are returned
+        by a StreamFileDecoder.
+
+        The trailers received are only used for their additional values, the
+        counts are those of the parts written.
+
+        :param parts: iterable with the transmission parts
+        """
+        for part in parts:
+            if isinstance(part, TransmissionHeader):
+                self.write_header(part)
+            elif isinstance(part, GroupHeader):
+                self.start_group(part)
+            elif isinstance(part, GroupTrailer):
+                self.end_group(part)
+            elif isinstance(part, TransmissionTrailer):
+                self.write_trailer()
+            else:
+                self.write_transaction(part)
+
+    def flush(self):
+        """
+        Writes the buffered records into the file handle.
+        """
+        if self._buffer:
+            self._handle.writelines(self._buffer)
+            self._buffer = []
+
+    def _write(self, record):
+        encoder = self._record_encoder_factory.get_encoder(record)
+        line = encoder.encode(record)
+
+        if self._encoding:
+            line = line.encode(self._encoding)
+
+        self._buffer.append(line)
+        self._record_count += 1
+
+        if len(self._buffer) >= self._buffer_size:
+            self.flush()
+
+
+def _is_binary(handle):
+    """
+    Indicates if the file handle expects bytes.
+
+    :param handle: the file handle
+    :return: True if it expects bytes, False if it expects strings
+    """
+    if isinstance(handle, io.TextIOBase):
+        return False
+    elif isinstance(handle, (io.RawIOBase, io.BufferedIOBase)):
+        return True
+
+    return 'b' in getattr(handle, 'mode', '')
 
 
 def default_file_encoder():
@@ -189,6 +453,28 @@ def default_file_encoder():
     Get default encoder cwr file
     :return:
     """
+    record_configs, field_configs = _default_encoder_configs()
+    return CwrFileEncoder(record_configs, field_configs)
+
+
+def default_file_writer(handle, encoding='latin-1', buffer_size=1000):
+    """
+    Creates a writer for the file handle, which encodes the records with the
+    default configuration.
+
+    :param handle: the file handle to write into
+    :param encoding: encoding for binary handles
+    :param buffer_size: number of records kept before writing them
+    :return: a CwrFileWriter for the handle
+    """
+    record_configs, field_configs = _default_encoder_configs()
+    return CwrFileWriter(handle,
+                         CwrRecordEncoderFactory(record_configs,
+                                                 field_configs),
+                         encoding=encoding, buffer_size=buffer_size)
+
+
+def _default_encoder_configs():
     config = CWRConfiguration()
     field_configs = config.load_field_config('table')
     field_configs.update(config.load_field_config('common'))
@@ -201,4 +487,4 @@ def default_file_encoder():
             entry['values'] = field_values.get_data(values_id)
 
     record_configs = config.load_record_config('common')
-    return CwrFileEncoder(record_configs, field_configs)
+    return record_configs, field_configs
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+
+from operator import attrgetter
+
+from cwr.acknowledgement import AcknowledgementRecord, MessageRecord
+from cwr.cross_reference import XrfRecord
+from cwr.agreement import AgreementRecord, AgreementTerritoryRecord, \
+    InterestedPartyForAgreementRecord
+from cwr.info import AdditionalRelatedInfoRecord
+from cwr.interested_party import IPTerritoryOfControlRecord, \
+    PublisherForWriterRecord, PublisherRecord, WriterRecord
+from cwr.non_roman_alphabet import NonRomanAlphabetAgreementPartyRecord, \
+    NonRomanAlphabetOtherWriterRecord, NonRomanAlphabetPerformanceDataRecord, \
+    NonRomanAlphabetPublisherNameRecord, NonRomanAlphabetTitleRecord, \
+    NonRomanAlphabetWorkRecord, NonRomanAlphabetWriterNameRecord
+from cwr.work import RecordingDetailRecord, ComponentRecord, \
+    AlternateTitleRecord, AuthoredWorkRecord, InstrumentationDetailRecord, \
+    InstrumentationSummaryRecord, PerformingArtistRecord, WorkOriginRecord, \
+    WorkRecord
+from cwr.group import GroupHeader, GroupTrailer
+from cwr.transmission import TransmissionHeader, TransmissionTrailer
+
+"""
+Accessor tables for reading the values of the fields directly from the model
+classes, without transforming them into a dictionary first.
+
+Each table holds, for a record class, the same fields and values the
+dictionary encoders from cwr.parser.encoder.dictionary create, including the
+fields from the publisher and writer of the interested party records. So
+encoding from a table gives the same result as encoding the dictionary.
+"""
+
+__author__ = 'Yaroslav O. Golub'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _or_none(getter):
+    """
+    Changes empty values into None, as the ISWC, IPI base, AVI and VISAN
+    dictionary encoders do.
+    """
+    def get(entity):
+        return getter(entity) or None
+
+    return get
+
+
+def _or_blank(name):
+    """
+    Reads an attribute which may be missing, returning an empty string then.
+    """
+    def get(entity):
+        return getattr(entity, name, '')
+
+    return get
+
+
+class EntityAccessor(object):
+    """
+    Accessor table for one record class. Maps each field name to a function
+    reading its value from the entity. The fields of a nested entity, such as
+    the writer of a writer record, are only available when that entity is
+    set.
+    """
+
+    def __init__(self, names, nested=None, nested_names=(), empty=(),
+                 defaults=()):
+        self._getters = {}
+        for name in names:
+            if name in defaults:
+                getter = _or_blank(name)
+            else:
+                getter = attrgetter(name)
+            if name in empty:
+                getter = _or_none(getter)
+            self._getters[name] = getter
+
+        self._names = frozenset(names)
+        self._all_names = self._names
+        self._nested = None
+        if nested:
+            self._nested = attrgetter(nested)
+            self._all_names = self._names.union(nested_names)
+            for name in nested_names:
+                # As on the dictionaries, fields of the record are found
+                # before those of the nested entity
+                if name not in self._getters:
+                    getter = attrgetter('%s.%s' % (nested, name))
+                    if name in empty:
+                        getter = _or_none(getter)
+                    self._getters[name] = getter
+
+    def get_names(self, entity):
+        """
+        Names of the fields available for the entity
+        """
+        if self._nested is not None and self._nested(entity):
+            return self._all_names
+        return self._names
+
+    def get_getter(self, name):
+        """
+        Function reading the field value from an entity, or None if the field
+        does not exist
+        """
+        return self._getters.get(name)
+
+
+_TRANSACTION_HEADER = ('record_type', 'transaction_sequence_n',
+                       'record_sequence_n')
+
+_INTERESTED_PARTY_RECORD = _TRANSACTION_HEADER + \
+    ('first_recording_refusal', 'pr_society', 'pr_ownership_share',
+     'mr_society', 'mr_ownership_share', 'sr_society', 'sr_ownership_share',
+     'usa_license')
+
+_INTERESTED_PARTY = ('ip_n', 'ipi_base_n', 'ipi_name_n', 'tax_id')
+
+_ACCESSORS = {
+    AcknowledgementRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('creation_date_time', 'creation_title', 'original_group_id',
+         'original_transaction_sequence_n', 'original_transaction_type',
+         'processing_date', 'recipient_creation_n', 'submitter_creation_n',
+         'transaction_status')),
+    AdditionalRelatedInfoRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('note', 'society_n', 'subject_code', 'type_of_right', 'work_n')),
+    AgreementRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('advance_given', 'agreement_end_date', 'date_of_signature',
+         'agreement_start_date', 'agreement_type',
+         'international_standard_code', 'number_of_works',
+         'post_term_collection_end_date', 'post_term_collection_status',
+         'prior_royalty_start_date', 'prior_royalty_status',
+         'retention_end_date', 'sales_manufacture_clause', 'shares_change',
+         'society_assigned_agreement_n', 'submitter_agreement_n')),
+    AgreementTerritoryRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('inclusion_exclusion_indicator', 'tis_numeric_code')),
+    AlternateTitleRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('alternate_title', 'title_type', 'language_code')),
+    AuthoredWorkRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('iswc', 'language_code', 'source', 'submitter_work_n', 'title',
+         'writer_1_first_name', 'writer_2_first_name', 'writer_1_ipi_base_n',
+         'writer_2_ipi_base_n', 'writer_1_ipi_name_n', 'writer_2_ipi_name_n',
+         'writer_1_last_name', 'writer_2_last_name'),
+        empty=('iswc', 'writer_1_ipi_base_n', 'writer_2_ipi_base_n')),
+    ComponentRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('duration', 'iswc', 'submitter_work_n', 'title',
+         'writer_1_first_name', 'writer_2_first_name', 'writer_2_ipi_base_n',
+         'writer_2_ipi_name_n', 'writer_1_ipi_base_n', 'writer_1_ipi_name_n',
+         'writer_1_last_name', 'writer_2_last_name'),
+        empty=('iswc', 'writer_1_ipi_base_n', 'writer_2_ipi_base_n')),
+    InstrumentationDetailRecord: EntityAccessor(
+        _TRANSACTION_HEADER + ('instrument_code', 'number_players')),
+    InstrumentationSummaryRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('instrumentation_description', 'number_voices',
+         'standard_instrumentation_type')),
+    InterestedPartyForAgreementRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('agreement_role_code', 'ip_last_name', 'ip_n',
+         'ip_writer_first_name', 'ipi_name_n', 'ipi_base_n', 'mr_society',
+         'mr_share', 'pr_society', 'pr_share', 'sr_society', 'sr_share'),
+        empty=('ipi_base_n',)),
+    IPTerritoryOfControlRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('ip_n', 'inclusion_exclusion_indicator', 'tis_numeric_code',
+         'sequence_n', 'pr_collection_share', 'mr_collection_share',
+         'sr_collection_share', 'shares_change')),
+    MessageRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('message_level', 'message_record_type', 'message_text',
+         'message_type', 'original_record_sequence_n', 'validation_n')),
+    NonRomanAlphabetTitleRecord: EntityAccessor(
+        _TRANSACTION_HEADER + ('language_code', 'title', 'title_type')),
+    NonRomanAlphabetOtherWriterRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('language_code', 'position', 'writer_first_name', 'writer_name')),
+    NonRomanAlphabetAgreementPartyRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('language_code', 'ip_name', 'ip_writer_name', 'ip_n')),
+    NonRomanAlphabetPublisherNameRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('language_code', 'ip_n', 'publisher_name', 'publisher_sequence_n')),
+    NonRomanAlphabetPerformanceDataRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('language_code', 'performance_dialect', 'performance_language',
+         'performing_artist_first_name', 'performing_artist_ipi_base_n',
+         'performing_artist_ipi_name_n', 'performing_artist_name'),
+        empty=('performing_artist_ipi_base_n',)),
+    NonRomanAlphabetWorkRecord: EntityAccessor(
+        _TRANSACTION_HEADER + ('language_code', 'title')),
+    NonRomanAlphabetWriterNameRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('language_code', 'writer_first_name', 'writer_last_name', 'ip_n')),
+    PerformingArtistRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('performing_artist_first_name', 'performing_artist_ipi_base_n',
+         'performing_artist_ipi_name_n', 'performing_artist_last_name'),
+        empty=('performing_artist_ipi_base_n',)),
+    PublisherForWriterRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('publisher_ip_n', 'publisher_name', 'society_assigned_agreement_n',
+         'submitter_agreement_n', 'writer_ip_n', 'publisher_sequence_n')),
+    PublisherRecord: EntityAccessor(
+        _INTERESTED_PARTY_RECORD +
+        ('agreement_type', 'international_standard_code',
+         'publisher_sequence_n', 'publisher_type', 'publisher_unknown',
+         'society_assigned_agreement_n', 'special_agreements',
+         'submitter_agreement_n'),
+        nested='publisher',
+        nested_names=_INTERESTED_PARTY + ('publisher_name',),
+        empty=('ipi_base_n',)),
+    RecordingDetailRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('ean', 'first_album_label', 'first_album_title',
+         'first_release_catalog_n', 'first_release_date',
+         'first_release_duration', 'isrc', 'media_type', 'recording_format',
+         'recording_technique', 'recording_title', 'version_title',
+         'display_artist', 'record_label', 'isrc_validity',
+         'submitter_recording_identifier'),
+        defaults=('recording_title', 'version_title', 'display_artist',
+                  'record_label', 'isrc_validity',
+                  'submitter_recording_identifier')),
+    WorkRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('iswc', 'language_code', 'title', 'catalogue_number',
+         'composite_component_count', 'composite_type', 'contact_id',
+         'contact_name', 'copyright_date', 'copyright_number', 'work_type',
+         'date_publication_printed_edition', 'duration',
+         'exceptional_clause', 'excerpt_type', 'grand_rights_indicator',
+         'lyric_adaptation', 'music_arrangement',
+         'musical_work_distribution_category', 'opus_number',
+         'priority_flag', 'recorded_indicator', 'submitter_work_n',
+         'text_music_relationship', 'version_type'),
+        empty=('iswc',)),
+    WorkOriginRecord: EntityAccessor(
+        _TRANSACTION_HEADER +
+        ('bltvr', 'cd_identifier', 'cut_number', 'episode_n',
+         'episode_title', 'intended_purpose', 'library', 'production_n',
+         'production_title', 'year_production', 'audio_visual_key',
+         'visan'),
+        nested='audio_visual_key', nested_names=('society_code', 'av_number'),
+        empty=('audio_visual_key', 'visan')),
+    WriterRecord: EntityAccessor(
+        _INTERESTED_PARTY_RECORD +
+        ('reversionary', 'writer_designation', 'writer_unknown',
+         'work_for_hire'),
+        nested='writer',
+        nested_names=_INTERESTED_PARTY + ('personal_number',
+                                          'writer_first_name',
+                                          'writer_last_name'),
+        empty=('ipi_base_n',)),
+    XrfRecord: EntityAccessor(
+        ('organisation_code', 'identifier', 'identifier_type', 'validity')),
+    GroupHeader: EntityAccessor(
+        ('batch_request_id', 'group_id', 'record_type', 'transaction_type',
+         'version_number')),
+    GroupTrailer: EntityAccessor(
+        ('group_id', 'record_count', 'record_type', 'transaction_count',
+         'currency_indicator', 'total_monetary_value')),
+    TransmissionHeader: EntityAccessor(
+        ('record_type', 'sender_id', 'sender_name', 'sender_type',
+         'creation_date_time', 'transmission_date', 'edi_standard',
+         'character_set', 'version_type')),
+    TransmissionTrailer: EntityAccessor(
+        ('record_type', 'group_count', 'transaction_count', 'record_count')),
+}
+
+
+def get_accessor(entity_class):
+    """
+    Returns the accessor table for a record class, or None if there is no
+    table for it, and so the entity should be encoded through its dictionary
+    """
+    for cls in entity_class.__mro__:
+        if cls in _ACCESSORS:
+            return _ACCESSORS[cls]
+    return None
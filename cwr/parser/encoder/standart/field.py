@@ -66,6 +66,14 @@ class CwrFieldEncoder(Encoder):
         result = self.format(value)
         return result
 
+    def encode_value(self, value):
+        """
+        Encode the value of this field, read directly from the model
+        :param value:
+        :return: cwr string
+        """
+        return self.format(value)
+
     def __repr__(self):
         return "Field %s, size: %d, type: %s, req: %s" % \
             (self.name, self._rule['size'], self._rule['type'], self._required)
@@ -185,6 +193,9 @@ class BlankCwrFieldEncoder(DefaultCwrFieldEncoder):
     def encode(self, entity):
         return "".center(self._rule['size'], ' ')
 
+    def encode_value(self, value):
+        return "".center(self._rule['size'], ' ')
+
 
 class PercentageCwrFieldEncoder(NumericCwrFieldEncoder):
     """
@@ -210,6 +221,10 @@ class AviCwrFieldEncoder(CwrFieldEncoder):
     """
     def format(self, value):
         tpl = "{av_number!s:0>2}{society_code!s:<15}"
+        if hasattr(value, 'av_number'):
+            # AVIKey read directly from the model
+            return tpl.format(av_number=value.av_number,
+                              society_code=value.society_code)
         return tpl.format(**value)
 
 
@@ -3,7 +3,9 @@
 from abc import ABCMeta, abstractmethod
 from abc import ABCMeta, abstractmethod
 
-from cwr.parser.encoder.standart.field import CwrFieldEncoderFactory
+from cwr.parser.encoder.standart.accessor import get_accessor
+from cwr.parser.encoder.standart.field import BlankCwrFieldEncoder, \
+    CwrFieldEncoderFactory
 from cwr.parser.encoder.dictionary import FileDictionaryEncoder, TransactionRecordDictionaryEncoder, \
     TransmissionDictionaryEncoder, GroupDictionaryEncoder, TransmissionHeaderDictionaryEncoder, \
     GroupHeaderDictionaryEncoder, GroupTrailerDictionaryEncoder, TransmissionTrailerDictionaryEncoder
@@ -49,6 +51,12 @@ class CwrRecordEncoder(Encoder):
          super(CwrRecordEncoder, self).__init__()
          self._record_configs = record_configs
          self._field_encoder_factory = CwrFieldEncoderFactory(field_configs)
+         # Precomputed field encoders permutations, longest first
+         self._layouts = None
+         self._dictionary_encoder = None
+         # Field encoders permutations joined to the accessors of their
+         # fields, by accessor table
+         self._accessor_layouts = {}
 
     @abstractmethod
     def get_record_dictionary_encoder(self, entity):
@@ -63,14 +71,6 @@ class CwrRecordEncoder(Encoder):
         """
         return entity.record_type
 
-    @staticmethod
-    def _get_best_result(possible_list):
-        if len(possible_list) < 1:
-            raise CwrRecordEncoderException()
-        else:
-            possible_list = sorted(possible_list, key=lambda item: -item['len'])
-            return possible_list[0]['result']
-
     def build_field_encoders(self, rules, field_encoders=[[]], optional=False):
         for field in rules:
             if field.rule_type == 'field':
@@ -121,25 +121,116 @@ class CwrRecordEncoder(Encoder):
         return result
 
     def get_entity_dict(self, entity):
-        dict_encoder = self.get_record_dictionary_encoder(entity)
-        return dict_encoder.encode(entity)
+        if self._dictionary_encoder is None:
+            self._dictionary_encoder = \
+                self.get_record_dictionary_encoder(entity)
+        return self._dictionary_encoder.encode(entity)
+
+    def get_layouts(self):
+        """
+        Returns all the field encoders permutations, built only once, with the
+        names of the fields each of them requires.
+        Longest permutations come first, keeping the config order between
+        those with the same length.
+        :return: list of tuples (required field names, field encoders)
+        """
+        if self._layouts is None:
+            layouts = []
+            for field_encoders in self.get_record_fields_encoders():
+                names = frozenset(
+                    encoder.name for encoder in field_encoders
+                    if not isinstance(encoder, BlankCwrFieldEncoder))
+                layouts.append((names, field_encoders))
+            self._layouts = sorted(layouts, key=lambda item: -len(item[1]))
+        return self._layouts
+
+    @staticmethod
+    def _get_entity_names(entity_dict):
+        """
+        Names of all the fields in the entity dictionary, including those in
+        sub entities, the same ones CwrFieldEncoder.expand_entity looks for
+        """
+        names = set(entity_dict)
+        for value in entity_dict.values():
+            if isinstance(value, dict):
+                names.update(value)
+        return names
+
+    def get_accessor_layouts(self, accessor):
+        """
+        Returns the field encoders permutations, as get_layouts, but with
+        each field encoder paired to the function reading its value from the
+        entity. Blank fields have no value, and so no function.
+        :param accessor: accessor table for the entities
+        :return: list of tuples (required field names, list of tuples (field
+        encoder, getter))
+        """
+        layouts = self._accessor_layouts.get(accessor)
+        if layouts is None:
+            layouts = []
+            for names, field_encoders in self.get_layouts():
+                fields = []
+                for encoder in field_encoders:
+                    if isinstance(encoder, BlankCwrFieldEncoder):
+                        fields.append((encoder, None))
+                    else:
+                        fields.append(
+                            (encoder, accessor.get_getter(encoder.name)))
+                layouts.append((names, fields))
+            self._accessor_layouts[accessor] = layouts
+        return layouts
+
+    @staticmethod
+    def try_encode_entity(fields, entity):
+        """
+        Inner encoding reading the values directly from the entity
+        :param fields: field encoders with their getters
+        :param entity:
+        :return: cwr string
+        """
+        result = ''
+        for field_encoder, getter in fields:
+            if getter is None:
+                result += field_encoder.encode_value(None)
+            else:
+                result += field_encoder.encode_value(getter(entity))
+        return result
 
     def encode(self, entity):
         """
-        Generate string of cwr format for all possible combinations of fields,
-        accumulate and then elect the best. The best string it is who used most of all fields
+        Generate string of cwr format for the best combination of fields. The
+        best string it is who used most of all fields, so the longest
+        permutation which the entity has all the fields for is used.
+        The values are read through the accessor table of the entity class,
+        if there is one, and otherwise from the entity dictionary
+        :param entity:
+        :return:
+        """
+        accessor = get_accessor(entity.__class__)
+        if accessor is None:
+            return self.encode_dictionary(entity)
+        names = accessor.get_names(entity)
+        for required, fields in self.get_accessor_layouts(accessor):
+            if required <= names:
+                result = self.try_encode_entity(fields, entity)
+                if result:
+                    return self.head(entity) + result + "\r\n"
+        raise CwrRecordEncoderException()
+
+    def encode_dictionary(self, entity):
+        """
+        Generate string of cwr format from the entity dictionary
         :param entity:
         :return:
         """
-        possible_results = []
         entity_dict = self.get_entity_dict(entity)
-        record_field_encoders = self.get_record_fields_encoders()
-        for field_encoders in record_field_encoders:
-            result = self.try_encode(field_encoders, entity_dict)
-            if result:
-                possible_results.append({'result': result, 'len': len(field_encoders)})
-        cwr = self.head(entity) + self._get_best_result(possible_results) + "\r\n"
-        return cwr
+        names = self._get_entity_names(entity_dict)
+        for required, field_encoders in self.get_layouts():
+            if required <= names:
+                result = self.try_encode(field_encoders, entity_dict)
+                if result:
+                    return self.head(entity) + result + "\r\n"
+        raise CwrRecordEncoderException()
 
 
 class TransactionCwrRecordEncoder(CwrRecordEncoder):
@@ -182,6 +273,8 @@ class CwrRecordEncoderFactory(object):
         super(CwrRecordEncoderFactory, self).__init__()
         self._record_configs = self._process_record(record_configs)
         self._field_configs = field_configs
+        # Encoders already created, by record type
+        self._encoders = {}
 
     @staticmethod
     def _process_record(rules):
@@ -207,6 +300,17 @@ class CwrRecordEncoderFactory(object):
         return templates
 
     def get_encoder(self, entity):
+        """
+        Returns the encoder for the entity record type. Each encoder is
+        created only once, so its field encoders permutations are reused for
+        all the records of the same type
+        """
+        key = (entity.record_type, entity.__class__)
+        if key not in self._encoders:
+            self._encoders[key] = self._build_encoder(entity)
+        return self._encoders[key]
+
+    def _build_encoder(self, entity):
         if entity.record_type not in self._record_configs:
             raise NameError('The record type %s not found in config %s' % (entity.record_type, list(self._record_configs.keys())))
         record_configs = self._record_configs[entity.record_type]
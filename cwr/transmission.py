@@ -26,6 +26,10 @@ class TransmissionHeader(Record):
     information as well as the name of the sender.
     """
 
+    __slots__ = ('_sender_id', '_sender_name', '_sender_type',
+                 '_creation_date_time', '_transmission_date', '_edi_standard',
+                 '_character_set', '_version_type')
+
     def __init__(self,
                  record_type='',
                  sender_id=0,
@@ -233,6 +237,8 @@ class TransmissionTrailer(Record):
     within the file are included on this record.
     """
 
+    __slots__ = ('_group_count', '_transaction_count', '_record_count')
+
     def __init__(self,
                  record_type='',
                  group_count=0,
@@ -356,6 +362,23 @@ class Transmission(object):
             self._trailer,
             self._groups)
 
+    def parts(self):
+        """
+        Returns the parts of the transmission, in the same order they appear
+        on a file, which is the same order a StreamFileDecoder returns them:
+        the header, then the header, transactions and trailer of each group,
+        and finally the trailer.
+
+        :return: a generator for the transmission parts
+        """
+        yield self._header
+        for group in self._groups:
+            yield group.group_header
+            for transaction in group.transactions:
+                yield transaction
+            yield group.group_trailer
+        yield self._trailer
+
     @property
     def groups(self):
         """
@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+from collections import OrderedDict, namedtuple
+from difflib import SequenceMatcher
+
+from cwr.file import CWRFile
+from cwr.parser.decoder.file import default_record_decoder
+from cwr.parser.decoder.reader import MappedFileReader
+from cwr.parser.encoder.dictionary import TransactionRecordDictionaryEncoder
+
+"""
+Differences between two CWR transmissions, such as a file and its corrected
+version.
+
+Transactions are matched by their identifier: the submitter work number for
+works, and the submitter agreement number for agreements. Transactions
+without one are matched by their position on their group. If the same
+identifier appears several times, each occurrence is matched in order.
+
+Each transaction is reduced to a hash of its normalized records, which do not
+include the sequence numbers, so renumbered transactions are not changes.
+Only the transactions whose hashes differ are compared record by record,
+aligning their records and returning the fields which changed.
+
+The diff is computed in linear time: the first transmission is stored as a
+dict from identifiers to hashes, and the second one is compared against it
+as it is read. When comparing two files, only the hash and offsets of each
+transaction of the first file are kept, and the records are parsed only for
+the transactions which changed.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+
+# Transactions identified by the submitter work number
+_WORK_TRANSACTIONS = frozenset(('NWR', 'REV', 'ISW', 'EXC'))
+
+# Records which are not part of a transaction
+_CONTROL_RECORDS = frozenset(('HDR', 'GRH', 'GRT', 'TRL'))
+
+# Fields which are not compared
+_SEQUENCE_FIELDS = frozenset(('transaction_sequence_n', 'record_sequence_n'))
+
+# Columns of the identifiers on the record lines
+_WORK_KEY_COLUMNS = (81, 14)
+_AGREEMENT_KEY_COLUMNS = (19, 14)
+
+# Columns of the sequence numbers on the record lines
+_SEQUENCE_START = 3
+_SEQUENCE_END = 19
+
+TransactionDiff = namedtuple('TransactionDiff', [
+    'status', 'key', 'old', 'new', 'records'])
+TransactionDiff.__doc__ = """
+A transaction which was added, removed or changed.
+
+The key is the identifier used to match the transaction, and old and new are
+the transaction on each transmission, which is None if it is missing from
+it. For changed transactions, the records are a list with the RecordDiff of
+each record which changed.
+"""
+
+RecordDiff = namedtuple('RecordDiff', [
+    'status', 'record_type', 'old', 'new', 'fields'])
+RecordDiff.__doc__ = """
+A record which was added, removed or changed.
+
+For changed records, the fields are a dict mapping each field which changed
+to a tuple with its old and new values.
+"""
+
+
+def _key(transaction_type, value, position):
+    value = (value or '').strip()
+    if value:
+        return transaction_type, value
+
+    return transaction_type, '#%d' % position
+
+
+class _Keys(object):
+    """
+    Creates the keys for the transactions, telling apart repeated
+    identifiers by the number of times they have appeared.
+    """
+
+    def __init__(self):
+        self._seen = {}
+
+    def key(self, transaction_type, value, position):
+        key = _key(transaction_type, value, position)
+
+        count = self._seen.get(key, 0)
+        self._seen[key] = count + 1
+        if count:
+            return key + (count,)
+
+        return key
+
+
+class TransmissionDiff(object):
+    """
+    Computes the differences between transmissions, or between files.
+    """
+
+    def __init__(self, record_decoder=None):
+        """
+        Constructs a TransmissionDiff.
+
+        :param record_decoder: decoder for single record lines, used when
+        comparing files, by default one using the layouts
+        """
+        self._encoder = TransactionRecordDictionaryEncoder()
+        self._record_decoder = record_decoder
+
+    def _values(self, record):
+        encoded = self._encoder.encode(record)
+        for field in _SEQUENCE_FIELDS:
+            encoded.pop(field, None)
+
+        return encoded
+
+    def _transaction_hash(self, transaction):
+        digest = hashlib.sha1()
+        for record in transaction:
+            digest.update(repr(sorted(self._values(record).items(),
+                                      key=lambda item: item[0])).encode(
+                'utf-8'))
+
+        return digest.digest()
+
+    @staticmethod
+    def _transaction_id(transaction):
+        first = transaction[0]
+        if first.record_type in _WORK_TRANSACTIONS:
+            return first.submitter_work_n
+        elif first.record_type == 'AGR':
+            return first.submitter_agreement_n
+
+        return None
+
+    def _index(self, transmission):
+        keys = _Keys()
+        index = OrderedDict()
+
+        for group in transmission.groups:
+            for position, transaction in enumerate(group.transactions):
+                if not transaction:
+                    continue
+                key = keys.key(group.group_header.transaction_type,
+                               self._transaction_id(transaction), position)
+                index[key] = transaction
+
+        return index
+
+    def diff(self, old, new):
+        """
+        Computes the differences between two transmissions.
+
+        :param old: the original Transmission or CWRFile
+        :param new: the new Transmission or CWRFile
+        :return: a generator for the TransactionDiff of the added and
+        changed transactions, in the order of the new transmission, and then
+        of the removed ones
+        """
+        if isinstance(old, CWRFile):
+            old = old.transmission
+        if isinstance(new, CWRFile):
+            new = new.transmission
+
+        hashes = OrderedDict(
+            (key, (self._transaction_hash(transaction), transaction))
+            for key, transaction in self._index(old).items())
+
+        for key, transaction in self._index(new).items():
+            previous = hashes.pop(key, None)
+            if previous is None:
+                yield TransactionDiff(ADDED, key, None, transaction, [])
+            elif previous[0] != self._transaction_hash(transaction):
+                yield TransactionDiff(
+                    CHANGED, key, previous[1], transaction,
+                    self.diff_transactions(previous[1], transaction))
+
+        for key, (digest, transaction) in hashes.items():
+            yield TransactionDiff(REMOVED, key, transaction, None, [])
+
+    def diff_transactions(self, old, new):
+        """
+        Computes the differences between the records of two transactions.
+
+        The records are aligned, so added or removed records do not make the
+        ones after them appear as changed.
+
+        :param old: the original transaction, as a list of records
+        :param new: the new transaction, as a list of records
+        :return: a list with the RecordDiff of each record which changed
+        """
+        old_values = [self._values(record) for record in old]
+        new_values = [self._values(record) for record in new]
+
+        old_hashes = [repr(sorted(values.items(), key=lambda item: item[0]))
+                      for values in old_values]
+        new_hashes = [repr(sorted(values.items(), key=lambda item: item[0]))
+                      for values in new_values]
+
+        records = []
+        matcher = SequenceMatcher(None, old_hashes, new_hashes,
+                                  autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                continue
+
+            paired = 0
+            if tag == 'replace':
+                for i, j in zip(range(i1, i2), range(j1, j2)):
+                    if old[i].record_type != new[j].record_type:
+                        break
+                    records.append(RecordDiff(
+                        CHANGED, new[j].record_type, old[i], new[j],
+                        _field_diff(old_values[i], new_values[j])))
+                    paired += 1
+
+            for i in range(i1 + paired, i2):
+                records.append(RecordDiff(REMOVED, old[i].record_type,
+                                          old[i], None, {}))
+            for j in range(j1 + paired, j2):
+                records.append(RecordDiff(ADDED, new[j].record_type,
+                                          None, new[j], {}))
+
+        return records
+
+    def diff_files(self, old_path, new_path):
+        """
+        Computes the differences between two CWR files.
+
+        The first file is scanned, keeping only the hash and offsets of each
+        transaction, and then the second one is compared against it as it is
+        scanned. Only the changed transactions are parsed.
+
+        The hashes are those of the record lines, without the sequence
+        numbers and the padding at the end, so changes in the padding of the
+        records are ignored.
+
+        :param old_path: path to the original file
+        :param new_path: path to the new file
+        :return: a generator for the TransactionDiff of the added and
+        changed transactions, in the order of the new transmission, and then
+        of the removed ones
+        """
+        if self._record_decoder is None:
+            self._record_decoder = default_record_decoder('layout')
+
+        with MappedFileReader(old_path) as old_reader, \
+                MappedFileReader(new_path) as new_reader:
+            hashes = OrderedDict(
+                (key, (digest, start, end))
+                for key, digest, start, end in _scan(old_reader))
+
+            for key, digest, start, end in _scan(new_reader):
+                previous = hashes.pop(key, None)
+                if previous is None:
+                    yield TransactionDiff(
+                        ADDED, key, None,
+                        self._decode(new_reader, start, end), [])
+                elif previous[0] != digest:
+                    old = self._decode(old_reader, previous[1], previous[2])
+                    new = self._decode(new_reader, start, end)
+                    yield TransactionDiff(CHANGED, key, old, new,
+                                          self.diff_transactions(old, new))
+
+            for key, (digest, start, end) in hashes.items():
+                yield TransactionDiff(REMOVED, key,
+                                      self._decode(old_reader, start, end),
+                                      None, [])
+
+    def _decode(self, reader, start, end):
+        return [self._record_decoder.decode(line)
+                for line in reader.lines(start, end)]
+
+
+def _field_diff(old_values, new_values):
+    fields = OrderedDict()
+    for field, value in new_values.items():
+        previous = old_values.get(field)
+        if previous != value:
+            fields[field] = (previous, value)
+
+    for field, value in old_values.items():
+        if field not in new_values:
+            fields[field] = (value, None)
+
+    return fields
+
+
+def _scan(reader):
+    """
+    Scans the transactions of a file.
+
+    :param reader: the MappedFileReader for the file
+    :return: a generator for the key, hash, start offset and end offset of
+    each transaction
+    """
+    buffer = reader.buffer
+    keys = _Keys()
+
+    transaction_type = None
+    position = 0
+    digest = None
+    key_value = None
+    start = None
+    end = None
+
+    for line_start, line_end in reader.offsets():
+        record_type = reader.record_type(line_start)
+
+        if record_type in _CONTROL_RECORDS or \
+                record_type == transaction_type:
+            if start is not None:
+                yield (keys.key(transaction_type, key_value, position),
+                       digest.digest(), start, end)
+                position += 1
+                start = None
+
+        if record_type in _CONTROL_RECORDS:
+            if record_type == 'GRH':
+                transaction_type = reader.field(line_start, line_end, 3, 3)
+                position = 0
+            continue
+
+        if start is None:
+            start = line_start
+            digest = hashlib.sha1()
+            if record_type in _WORK_TRANSACTIONS:
+                column, size = _WORK_KEY_COLUMNS
+            elif record_type == 'AGR':
+                column, size = _AGREEMENT_KEY_COLUMNS
+            else:
+                column = None
+            if column is None:
+                key_value = None
+            else:
+                key_value = reader.field(line_start, line_end, column, size)
+        end = line_end
+
+        digest.update(buffer[line_start:line_start + _SEQUENCE_START])
+        digest.update(buffer[line_start + _SEQUENCE_END:line_end].rstrip())
+        digest.update(b'\n')
+
+    if start is not None:
+        yield (keys.key(transaction_type, key_value, position),
+               digest.digest(), start, end)
+
+
+def diff_transmissions(old, new):
+    """
+    Computes the differences between two transmissions.
+
+    :param old: the original Transmission or CWRFile
+    :param new: the new Transmission or CWRFile
+    :return: a generator for the TransactionDiff of each difference
+    """
+    return TransmissionDiff().diff(old, new)
+
+
+def diff_files(old_path, new_path, mode='layout'):
+    """
+    Computes the differences between two CWR files.
+
+    :param old_path: path to the original file
+    :param new_path: path to the new file
+    :param mode: the parsing mode for the changed records, 'grammar' or
+    'layout'
+    :return: a generator for the TransactionDiff of each difference
+    """
+    return TransmissionDiff(default_record_decoder(mode)).diff_files(
+        old_path, new_path)
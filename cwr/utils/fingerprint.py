@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import itertools
+import os
+import re
+import unicodedata
+from collections import defaultdict, namedtuple
+
+from cwr.parser.decoder.file import default_stream_decoder
+from cwr.parser.decoder.reader import MappedFileReader
+from cwr.utils.index import FileDatabase, normalize_key
+
+"""
+Fingerprints for work transactions, and a persistent index for finding
+duplicated works across CWR files.
+
+A work fingerprint is computed from the normalized values identifying the
+work:
+- the work title, and the titles from its alternate title (ALT) records
+- the IPI name numbers of its writers (SWR and OWR), or their names when
+  they have no IPI name number
+- the ISWC
+
+Titles are normalized by removing accents, punctuation and repeated spaces,
+so 'Canción de Amor!' and 'CANCION DE AMOR' are the same title. Then each
+work receives several keys:
+- digest, a hash of all the values, which is the same for duplicated works
+- iswc, the normalized ISWC, if the work has it
+- title_writers, a hash of each title together with the writers
+
+Works sharing an ISWC, or a title and its writers, but with a different
+digest, are the same work with conflicting data.
+
+The FingerprintIndex stores these keys on a SQLite database, so checking a
+new file only requires looking up the keys of each of its works, instead of
+comparing them against the whole catalogue. The keys of a batch of works are
+looked up together, with a single query for each kind of key.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Transactions which are works
+WORK_TRANSACTIONS = frozenset(('NWR', 'REV', 'ISW', 'EXC'))
+
+_WRITER_RECORDS = frozenset(('SWR', 'OWR'))
+
+_NOT_ALPHANUMERIC = re.compile(r'[^A-Z0-9]+')
+
+# Works whose keys are looked up together
+_BATCH_SIZE = 200
+
+# Maximum number of keys on a single query, below the SQLite limit of
+# parameters
+_MAX_KEYS = 500
+
+_SELECT_WORKS = ('SELECT works.id, files.path, works.transaction_sequence_n, '
+                 'works.submitter_work_n, works.title, works.digest')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS works (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    transaction_sequence_n INTEGER,
+    submitter_work_n TEXT,
+    title TEXT,
+    digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS work_keys (
+    work_id INTEGER NOT NULL REFERENCES works(id),
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS works_digest ON works (digest);
+CREATE INDEX IF NOT EXISTS works_file ON works (file_id);
+CREATE INDEX IF NOT EXISTS work_keys_key ON work_keys (kind, key);
+CREATE INDEX IF NOT EXISTS work_keys_work ON work_keys (work_id);
+"""
+
+WorkFingerprint = namedtuple('WorkFingerprint', [
+    'transaction_sequence_n', 'submitter_work_n', 'title', 'digest', 'keys'])
+WorkFingerprint.__doc__ = """
+Fingerprint of a work transaction.
+
+The keys are a list of tuples with the kind and value of each key, other than
+the digest.
+"""
+
+WorkMatch = namedtuple('WorkMatch', [
+    'fingerprint', 'path', 'transaction_sequence_n', 'submitter_work_n',
+    'title', 'duplicate'])
+WorkMatch.__doc__ = """
+An indexed work matching a fingerprint.
+
+The duplicate flag is True when both have the same digest, and False when
+they only share a key, which means they conflict.
+"""
+
+
+def normalize_title(title):
+    """
+    Normalizes a title, removing accents, punctuation and repeated spaces.
+
+    :param title: the title to normalize
+    :return: the normalized title, in upper case
+    """
+    if not title:
+        return ''
+
+    decomposed = unicodedata.normalize('NFKD', title.upper())
+    ascii_title = decomposed.encode('ascii', 'ignore').decode('ascii')
+
+    return _NOT_ALPHANUMERIC.sub(' ', ascii_title).strip()
+
+
+def _writer_key(record):
+    writer = record.writer
+    if writer is None:
+        return None
+
+    ipi_name_n = normalize_key('ipi_name_n', writer.ipi_name_n or '')
+    if ipi_name_n:
+        return ipi_name_n
+
+    name = normalize_title('%s %s' % (writer.writer_last_name or '',
+                                      writer.writer_first_name or ''))
+    if name:
+        return 'NAME:' + name
+
+    return None
+
+
+def _hash(*values):
+    return hashlib.sha1('\x1f'.join(values).encode('utf-8')).hexdigest()
+
+
+def fingerprint(transaction):
+    """
+    Computes the fingerprint of a work transaction.
+
+    :param transaction: the transaction, as a list of records
+    :return: the WorkFingerprint, or None if the transaction is not a work
+    """
+    if not transaction or transaction[0].record_type not in WORK_TRANSACTIONS:
+        return None
+
+    work = transaction[0]
+    title = normalize_title(work.title)
+    titles = set()
+    writers = set()
+
+    for record in transaction:
+        record_type = record.record_type
+        if record_type == 'ALT':
+            alternate = normalize_title(record.alternate_title)
+            if alternate:
+                titles.add(alternate)
+        elif record_type in _WRITER_RECORDS:
+            writer = _writer_key(record)
+            if writer:
+                writers.add(writer)
+
+    iswc = normalize_key('iswc', work.iswc or '')
+    writers = '\x1e'.join(sorted(writers))
+
+    keys = []
+    if iswc:
+        keys.append(('iswc', iswc))
+    for key_title in sorted(titles | set([title])):
+        if key_title:
+            keys.append(('title_writers', _hash(key_title, writers)))
+
+    digest = _hash(title, '\x1e'.join(sorted(titles)), writers, iswc)
+
+    return WorkFingerprint(work.transaction_sequence_n, work.submitter_work_n,
+                           work.title, digest, keys)
+
+
+def fingerprints(transactions):
+    """
+    Computes the fingerprints of the work transactions.
+
+    Transactions which are not works are ignored.
+
+    :param transactions: iterable with the transactions
+    :return: a generator for the WorkFingerprint of each work
+    """
+    for transaction in transactions:
+        result = fingerprint(transaction)
+        if result is not None:
+            yield result
+
+
+def file_fingerprints(path, mode='layout', stream_decoder=None):
+    """
+    Computes the fingerprints of the works on a CWR file.
+
+    The file is read as a stream, so it is not kept in memory.
+
+    :param path: path to the file
+    :param mode: the parsing mode, 'grammar' or 'layout'
+    :param stream_decoder: decoder for the file lines, by default the stream
+    decoder for the mode
+    :return: a generator for the WorkFingerprint of each work
+    """
+    if stream_decoder is None:
+        stream_decoder = default_stream_decoder(mode)
+
+    with MappedFileReader(path) as reader:
+        for part in stream_decoder.decode(reader.lines()):
+            if isinstance(part, list):
+                result = fingerprint(part)
+                if result is not None:
+                    yield result
+
+
+def _chunks(values, size):
+    values = iter(values)
+    chunk = list(itertools.islice(values, size))
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(values, size))
+
+
+class FingerprintIndex(FileDatabase):
+    """
+    Index of the work fingerprints on a set of CWR files, stored on a SQLite
+    database.
+
+    The database should be closed after using it, which can be done with a
+    with statement.
+    """
+
+    def __init__(self, path):
+        """
+        Constructs a FingerprintIndex, creating the database if it does not
+        exist.
+
+        :param path: path to the database file
+        """
+        super(FingerprintIndex, self).__init__(path, _SCHEMA)
+        self._stream_decoders = {}
+
+    def _stream_decoder(self, mode):
+        if mode not in self._stream_decoders:
+            self._stream_decoders[mode] = default_stream_decoder(mode)
+
+        return self._stream_decoders[mode]
+
+    def _file_fingerprints(self, path, mode):
+        return file_fingerprints(path, mode, self._stream_decoder(mode))
+
+    def add_file(self, path, mode='layout'):
+        """
+        Adds the works on a file to the index.
+
+        If the file was already indexed, it is read again only if its
+        contents changed.
+
+        :param path: path to the file
+        :param mode: the parsing mode, 'grammar' or 'layout'
+        :return: True if the file was read, False otherwise
+        """
+        return self._add_file(
+            path, lambda path, file_id: self._add_works(path, file_id, mode))
+
+    def _add_works(self, path, file_id, mode):
+        for work in self._file_fingerprints(path, mode):
+            work_id = self._connection.execute(
+                'INSERT INTO works (file_id, transaction_sequence_n, '
+                'submitter_work_n, title, digest) VALUES (?, ?, ?, ?, ?)',
+                (file_id, work.transaction_sequence_n,
+                 work.submitter_work_n, work.title, work.digest)).lastrowid
+            self._connection.executemany(
+                'INSERT INTO work_keys (work_id, kind, key) '
+                'VALUES (?, ?, ?)',
+                ((work_id, kind, key) for kind, key in work.keys))
+
+    def _delete_entries(self, file_id):
+        self._connection.execute(
+            'DELETE FROM work_keys WHERE work_id IN '
+            '(SELECT id FROM works WHERE file_id = ?)', (file_id,))
+        self._connection.execute('DELETE FROM works WHERE file_id = ?',
+                                 (file_id,))
+
+    def matches(self, work, exclude=None):
+        """
+        Finds the indexed works matching a fingerprint.
+
+        :param work: the WorkFingerprint to find
+        :param exclude: path of a file whose works are ignored
+        :return: a list with a WorkMatch for each matching work
+        """
+        return self._matches([work], exclude)[0]
+
+    def _matches(self, works, exclude):
+        """
+        Finds the indexed works matching a batch of fingerprints.
+
+        The digests, and each kind of key, are looked up with a single query
+        for all the works.
+
+        :param works: list with the WorkFingerprint instances
+        :param exclude: path of a file whose works are ignored
+        :return: a list with the WorkMatch list for each fingerprint
+        """
+        if exclude is not None:
+            exclude = os.path.abspath(exclude)
+
+        wanted = defaultdict(list)
+        for position, work in enumerate(works):
+            wanted[('digest', work.digest)].append(position)
+            for kind, key in work.keys:
+                wanted[(kind, key)].append(position)
+
+        keys = defaultdict(set)
+        for kind, key in wanted:
+            keys[kind].add(key)
+
+        found = [{} for _ in works]
+        for kind in sorted(keys):
+            for chunk in _chunks(sorted(keys[kind]), _MAX_KEYS):
+                marks = ', '.join('?' * len(chunk))
+                if kind == 'digest':
+                    rows = self._connection.execute(
+                        _SELECT_WORKS + ', works.digest FROM works '
+                        'JOIN files ON files.id = works.file_id '
+                        'WHERE works.digest IN (%s)' % marks, chunk)
+                else:
+                    rows = self._connection.execute(
+                        _SELECT_WORKS + ', work_keys.key FROM work_keys '
+                        'JOIN works ON works.id = work_keys.work_id '
+                        'JOIN files ON files.id = works.file_id '
+                        'WHERE work_keys.kind = ? AND work_keys.key IN (%s)'
+                        % marks, [kind] + chunk)
+
+                for row in rows:
+                    if row[1] == exclude:
+                        continue
+                    for position in wanted[(kind, row[6])]:
+                        if row[0] not in found[position]:
+                            work = works[position]
+                            found[position][row[0]] = WorkMatch(
+                                work, row[1], row[2], row[3], row[4],
+                                row[5] == work.digest)
+
+        return [sorted(matches.values(),
+                       key=lambda match: (match.path,
+                                          match.transaction_sequence_n))
+                for matches in found]
+
+    def check(self, works, exclude=None):
+        """
+        Finds the indexed works matching each of the fingerprints.
+
+        The fingerprints are looked up on batches, so the index is queried
+        a few times for each batch, instead of once for each key.
+
+        :param works: iterable with the WorkFingerprint instances
+        :param exclude: path of a file whose works are ignored
+        :return: a generator for the WorkMatch of each match
+        """
+        for batch in _chunks(works, _BATCH_SIZE):
+            for matches in self._matches(batch, exclude):
+                for match in matches:
+                    yield match
+
+    def check_file(self, path, mode='layout'):
+        """
+        Finds the indexed works matching the works on a file.
+
+        The works of the file itself, if it is indexed, are ignored.
+
+        :param path: path to the file
+        :param mode: the parsing mode, 'grammar' or 'layout'
+        :return: a list with the WorkMatch of each match
+        """
+        return list(self.check(self._file_fingerprints(path, mode), path))
+
+    def duplicates(self):
+        """
+        Finds the groups of indexed works with the same digest.
+
+        :return: a list with a list of (path, transaction sequence number)
+        tuples for each group of duplicated works
+        """
+        rows = self._connection.execute(
+            'SELECT works.digest, files.path, works.transaction_sequence_n '
+            'FROM works JOIN files ON files.id = works.file_id '
+            'WHERE works.digest IN (SELECT digest FROM works '
+            'GROUP BY digest HAVING COUNT(*) > 1) '
+            'ORDER BY works.digest, files.path, works.transaction_sequence_n')
+
+        groups = []
+        digest = None
+        for row in rows:
+            if row[0] != digest:
+                digest = row[0]
+                groups.append([])
+            groups[-1].append((row[1], row[2]))
+
+        return groups
@@ -0,0 +1,515 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import random
+
+from cwr.agreement import AgreementRecord, AgreementTerritoryRecord, \
+    InterestedPartyForAgreementRecord
+from cwr.file import FileTag
+from cwr.group import GroupHeader
+from cwr.interested_party import IPTerritoryOfControlRecord, Publisher, \
+    PublisherForWriterRecord, PublisherRecord, Writer, WriterRecord
+from cwr.parser.encoder.file import default_file_writer, \
+    default_filename_encoder
+from cwr.transmission import TransmissionHeader
+from cwr.utils.territory import TerritoryEngine
+from cwr.work import AlternateTitleRecord, PerformingArtistRecord, \
+    RecordingDetailRecord, WorkRecord
+from data_cwr.accessor import CWRTables
+
+"""
+Generator of synthetic CWR files.
+
+These are valid CWR files of any size, meant for load testing the parsers and
+encoders. The records are created with the model classes, taking the codes
+from the CWR tables, and written to disk as soon as each transaction is
+created, so the files can be as big as needed without keeping them in memory.
+
+The transactions on the file are set by a mix, which maps each transaction
+type to its weight. There will be a group for each type, with a number of
+transactions proportional to that weight.
+
+The size of each transaction is set by the number of parties and the
+nesting depth:
+
+- Each work has a publisher chain for each party, made of an original
+  publisher and as many sub-publishers as the depth minus one, and a writer
+  for each party. Each interested party has as many territories as the depth.
+- Each agreement has a territory block for each party, with as many
+  territories as the depth, an assignor and an acquirer.
+
+Territories are single countries, never groups such as the World, so the
+territories of a party do not overlap and the files pass the collection share
+rules.
+
+The values are taken from a random generator, which can receive a seed so the
+same file is generated each time.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Transaction types which can be generated
+TRANSACTION_TYPES = ('AGR', 'NWR', 'REV', 'ISW')
+
+# CWR versions which can be generated
+VERSIONS = ('2.1', '2.2')
+
+_WORDS = ['LOVE', 'NIGHT', 'SONG', 'BLUE', 'HEART', 'MOON', 'RIVER', 'DANCE',
+          'FIRE', 'RAIN', 'DREAM', 'ROAD', 'STAR', 'SUMMER', 'CITY', 'LIGHT',
+          'SHADOW', 'OCEAN', 'GOLD', 'WIND']
+
+_NAMES = ['SMITH', 'GARCIA', 'MULLER', 'ROSSI', 'DUBOIS', 'SILVA', 'NOVAK',
+          'JANSEN', 'KOWALSKI', 'HANSEN', 'LOPEZ', 'MARTIN']
+
+_FIRST_NAMES = ['ANNA', 'JOHN', 'MARIA', 'PETER', 'LUCIA', 'DAVID', 'ELENA',
+                'PAUL', 'SARA', 'MARCO']
+
+
+def _split(total, parts):
+    """
+    Splits an amount in hundredths into the received number of parts.
+
+    The first part receives any remainder, so the parts always add up to the
+    total.
+
+    :param total: the amount to split, in hundredths
+    :param parts: number of parts
+    :return: list with the parts, as percentages
+    """
+    share = total // parts
+    shares = [share] * parts
+    shares[0] += total - share * parts
+    return [value / 100.0 for value in shares]
+
+
+def _distribute(total, transaction_mix):
+    """
+    Distributes the transactions between the types in the mix.
+
+    :param total: total number of transactions
+    :param transaction_mix: weight of each transaction type
+    :return: list of tuples (transaction type, number of transactions)
+    """
+    weights = sum(transaction_mix.values())
+
+    counts = []
+    remainders = []
+    for transaction_type, weight in transaction_mix.items():
+        exact = total * weight / weights
+        counts.append([transaction_type, int(exact)])
+        remainders.append(exact - int(exact))
+
+    missing = total - sum(count for _, count in counts)
+    by_remainder = sorted(range(len(counts)), key=lambda i: -remainders[i])
+    for i in by_remainder[:missing]:
+        counts[i][1] += 1
+
+    return [(transaction_type, count) for transaction_type, count in counts
+            if count > 0]
+
+
+class CWRFileGenerator(object):
+    """
+    Creates synthetic CWR files.
+
+    The transmission header values, and the codes used on the records, are
+    set when the generator is created, and so all the files it creates will
+    share them.
+    """
+
+    def __init__(self, version='2.1', transaction_mix=None, parties=2,
+                 depth=1, seed=None, sender_id=1, sender_name='SYNTHETIC',
+                 creation_date_time=None):
+        """
+        Constructs a CWRFileGenerator.
+
+        The default mix creates only NWR transactions.
+
+        :param version: CWR version of the files
+        :param transaction_mix: weight of each transaction type
+        :param parties: number of writers and publisher chains on the works,
+        and of territory blocks on the agreements
+        :param depth: length of the publisher chains, and number of
+        territories for each party
+        :param seed: seed for the random values
+        :param sender_id: id of the sender on the header
+        :param sender_name: name of the sender on the header
+        :param creation_date_time: creation date for the header
+        """
+        if version not in VERSIONS:
+            raise ValueError('Unsupported CWR version: %s' % version)
+
+        if transaction_mix:
+            self._transaction_mix = transaction_mix
+        else:
+            self._transaction_mix = {'NWR': 1}
+
+        for transaction_type, weight in self._transaction_mix.items():
+            if transaction_type not in TRANSACTION_TYPES:
+                raise ValueError('Unsupported transaction type: %s' %
+                                 transaction_type)
+            if weight < 0:
+                raise ValueError('Negative weight for %s' % transaction_type)
+
+        if parties < 1 or depth < 1:
+            raise ValueError('The parties and depth should be at least 1')
+
+        self._version = version
+        self._parties = parties
+        self._depth = depth
+        self._random = random.Random(seed)
+        self._sender_id = sender_id
+        self._sender_name = sender_name
+
+        if creation_date_time:
+            self._creation_date_time = creation_date_time
+        else:
+            self._creation_date_time = datetime.datetime.now().replace(
+                microsecond=0)
+
+        tables = CWRTables()
+        self._languages = self._codes(tables, 'language_code')
+        self._societies = [int(code) for code in
+                           self._codes(tables, 'society_code')
+                           if code.isdigit() and int(code) > 0]
+        # Only countries, as groups would overlap the other territories of
+        # the same party, adding up their collection shares
+        self._territories = TerritoryEngine().countries
+        self._agreement_types = self._codes(tables, 'agreement_type')
+        self._title_types = [code for code in
+                             self._codes(tables, 'title_type')
+                             if code != 'OT']
+        self._distribution_categories = [
+            code for code in
+            self._codes(tables, 'musical_work_distribution_category')
+            if code != 'SER']
+        self._relationships = self._codes(tables, 'text_music_relationship')
+        self._writer_designations = [
+            code for code in self._codes(tables, 'writer_designation_code')
+            if code in ('A', 'C', 'CA')]
+        self._recording_techniques = self._codes(tables, 'recording_technique')
+
+    @staticmethod
+    def _codes(tables, table_id):
+        """
+        Returns the codes from a table, without the padding some of them
+        have, nor repeated values.
+
+        :param tables: the CWR tables
+        :param table_id: id of the table
+        :return: list with the codes
+        """
+        codes = []
+        for code in tables.get_data(table_id):
+            code = code.strip()
+            if code and code not in codes:
+                codes.append(code)
+        return codes
+
+    @property
+    def version(self):
+        """
+        CWR version of the files.
+
+        :return: the CWR version
+        """
+        return self._version
+
+    def filename(self, sequence_n=1, receiver='000'):
+        """
+        Creates a valid file name for the files.
+
+        :param sequence_n: sequence number of the file
+        :param receiver: receiver of the file
+        :return: a file name for the files
+        """
+        tag = FileTag(self._creation_date_time.year, sequence_n,
+                      self._sender_name[:3], receiver, self._version)
+        return default_filename_encoder().encode(tag)
+
+    def write(self, handle, transactions):
+        """
+        Writes a file with the received number of transactions.
+
+        The handle can be a text or binary file, as accepted by the
+        CwrFileWriter.
+
+        :param handle: file where the records are written
+        :param transactions: number of transactions on the file
+        :return: the transmission trailer written
+        """
+        writer = default_file_writer(handle)
+
+        writer.write_header(self.header())
+        group_id = 1
+        for transaction_type, count in _distribute(transactions,
+                                                   self._transaction_mix):
+            writer.start_group(self.group_header(group_id, transaction_type))
+            for transaction in self.transactions(transaction_type, count):
+                writer.write_transaction(transaction)
+            writer.end_group()
+            group_id += 1
+
+        return writer.write_trailer()
+
+    def write_file(self, path, transactions):
+        """
+        Writes a file with the received number of transactions on the path.
+
+        :param path: path for the file
+        :param transactions: number of transactions on the file
+        :return: the transmission trailer written
+        """
+        with open(path, 'wb') as handle:
+            return self.write(handle, transactions)
+
+    def header(self):
+        """
+        Creates the transmission header.
+
+        :return: the transmission header
+        """
+        if self._version == '2.2':
+            version_type = '2.2'
+        else:
+            version_type = None
+
+        return TransmissionHeader(
+            record_type='HDR',
+            sender_id=self._sender_id,
+            sender_name=self._sender_name,
+            sender_type='PB',
+            creation_date_time=self._creation_date_time,
+            transmission_date=self._creation_date_time.date(),
+            edi_standard='01.10',
+            character_set=None,
+            version_type=version_type)
+
+    def group_header(self, group_id, transaction_type):
+        """
+        Creates a group header.
+
+        :param group_id: id of the group
+        :param transaction_type: type of the transactions on the group
+        :return: the group header
+        """
+        return GroupHeader(record_type='GRH',
+                           group_id=group_id,
+                           transaction_type=transaction_type,
+                           version_number='0%s0' % self._version,
+                           batch_request_id=group_id)
+
+    def transactions(self, transaction_type, count):
+        """
+        Generates transactions of the received type.
+
+        :param transaction_type: type of the transactions
+        :param count: number of transactions
+        :return: generator for the transactions, as lists of records
+        """
+        for transaction_sequence_n in range(count):
+            if transaction_type == 'AGR':
+                records = self._agreement(transaction_sequence_n)
+            else:
+                records = self._work(transaction_type, transaction_sequence_n)
+
+            for record_sequence_n, record in enumerate(records):
+                record.transaction_sequence_n = transaction_sequence_n
+                record.record_sequence_n = record_sequence_n
+
+            yield records
+
+    def _title(self, words=3):
+        return ' '.join(self._random.choice(_WORDS) for _ in range(words))
+
+    def _ip_n(self, prefix, transaction_sequence_n, index):
+        return '%s%05d%03d' % (prefix, transaction_sequence_n % 100000,
+                               index)
+
+    def _work(self, transaction_type, transaction_sequence_n):
+        """
+        Creates the records for a work transaction.
+        """
+        duration = datetime.time(0, self._random.randint(1, 9),
+                                       self._random.randint(0, 59))
+        records = [WorkRecord(
+            record_type=transaction_type,
+            submitter_work_n='%014d' % transaction_sequence_n,
+            title=self._title(),
+            language_code=self._random.choice(self._languages),
+            musical_work_distribution_category=self._random.choice(
+                self._distribution_categories),
+            text_music_relationship=self._random.choice(self._relationships),
+            version_type='ORI',
+            duration=duration,
+            recorded_indicator='Y',
+            priority_flag='N',
+            exceptional_clause='U',
+            grand_rights_indicator=False)]
+
+        society = self._random.choice(self._societies)
+        territories = self._random.sample(self._territories, self._depth)
+
+        # Publishers own 50% of the performing rights, and all the others
+        pr_shares = _split(5000, self._parties)
+        mr_shares = _split(10000, self._parties)
+
+        original_publishers = []
+        for party in range(self._parties):
+            for link in range(self._depth):
+                publisher = Publisher(
+                    ip_n=self._ip_n('P', transaction_sequence_n,
+                                    party * self._depth + link),
+                    publisher_name='%s PUBLISHING' % self._random.choice(
+                        _NAMES))
+                if link == 0:
+                    original_publishers.append(publisher)
+                    publisher_type = 'E'
+                    pr_share = pr_shares[party]
+                    mr_share = mr_shares[party]
+                else:
+                    publisher_type = 'SE'
+                    pr_share = mr_share = 0
+
+                records.append(PublisherRecord(
+                    record_type='SPU',
+                    publisher=publisher,
+                    publisher_sequence_n=party + 1,
+                    publisher_type=publisher_type,
+                    publisher_unknown=None,
+                    pr_society=society,
+                    pr_ownership_share=pr_share,
+                    mr_society=society,
+                    mr_ownership_share=mr_share,
+                    sr_society=society,
+                    sr_ownership_share=mr_share))
+
+                # The last publisher of the chain collects the shares
+                if link == self._depth - 1:
+                    collection = (pr_shares[party], mr_shares[party])
+                else:
+                    collection = (0, 0)
+                records.extend(self._territory_control(
+                    'SPT', publisher.ip_n, territories, collection))
+
+        pr_shares = _split(5000, self._parties)
+        for party in range(self._parties):
+            writer = Writer(
+                ip_n=self._ip_n('W', transaction_sequence_n, party),
+                writer_first_name=self._random.choice(_FIRST_NAMES),
+                writer_last_name=self._random.choice(_NAMES))
+            records.append(WriterRecord(
+                record_type='SWR',
+                writer=writer,
+                writer_designation=self._random.choice(
+                    self._writer_designations),
+                work_for_hire=None,
+                pr_society=society,
+                pr_ownership_share=pr_shares[party],
+                mr_society=society,
+                sr_society=society))
+            records.extend(self._territory_control(
+                'SWT', writer.ip_n, territories, (pr_shares[party], 0)))
+
+            publisher = original_publishers[party]
+            records.append(PublisherForWriterRecord(
+                record_type='PWR',
+                publisher_ip_n=publisher.ip_n,
+                publisher_name=publisher.publisher_name,
+                writer_ip_n=writer.ip_n,
+                publisher_sequence_n=party + 1))
+
+        records.append(AlternateTitleRecord(
+            record_type='ALT',
+            alternate_title=self._title(),
+            title_type=self._random.choice(self._title_types),
+            language_code=self._random.choice(self._languages)))
+        records.append(PerformingArtistRecord(
+            record_type='PER',
+            performing_artist_last_name=self._random.choice(_NAMES),
+            performing_artist_first_name=self._random.choice(_FIRST_NAMES)))
+        records.append(RecordingDetailRecord(
+            record_type='REC',
+            first_release_date=datetime.date(
+                self._random.randint(1960, 2020), 1, 1),
+            first_release_duration=duration,
+            first_album_title=self._title(2),
+            first_album_label='%s RECORDS' % self._random.choice(_NAMES),
+            recording_technique=self._random.choice(
+                self._recording_techniques)))
+
+        return records
+
+    def _territory_control(self, record_type, ip_n, territories, collection):
+        """
+        Creates the territory of control records for an interested party.
+        """
+        records = []
+        for sequence_n, territory in enumerate(territories):
+            records.append(IPTerritoryOfControlRecord(
+                record_type=record_type,
+                ip_n=ip_n,
+                inclusion_exclusion_indicator='I',
+                tis_numeric_code=territory,
+                sequence_n=sequence_n + 1,
+                pr_collection_share=collection[0],
+                mr_collection_share=collection[1],
+                sr_collection_share=collection[1]))
+        return records
+
+    def _agreement(self, transaction_sequence_n):
+        """
+        Creates the records for an agreement transaction.
+        """
+        start = datetime.date(self._random.randint(1990, 2020), 1, 1)
+        records = [AgreementRecord(
+            record_type='AGR',
+            submitter_agreement_n='%014d' % transaction_sequence_n,
+            agreement_type=self._random.choice(self._agreement_types),
+            agreement_start_date=start,
+            prior_royalty_status='N',
+            post_term_collection_status='N',
+            number_of_works=self._random.randint(1, 99),
+            sales_manufacture_clause='S')]
+
+        society = self._random.choice(self._societies)
+        territories = self._random.sample(self._territories,
+                                          self._parties * self._depth)
+
+        for party in range(self._parties):
+            for territory in territories[party * self._depth:
+                                         (party + 1) * self._depth]:
+                records.append(AgreementTerritoryRecord(
+                    record_type='TER',
+                    inclusion_exclusion_indicator='I',
+                    tis_numeric_code=territory))
+
+            assignor = self._ip_n('A', transaction_sequence_n, party)
+            acquirer = self._ip_n('Q', transaction_sequence_n, party)
+            records.append(InterestedPartyForAgreementRecord(
+                record_type='IPA',
+                ip_n=assignor,
+                ip_last_name=self._random.choice(_NAMES),
+                ip_writer_first_name=self._random.choice(_FIRST_NAMES),
+                agreement_role_code='AS',
+                pr_society=society,
+                pr_share=50,
+                mr_society=society,
+                mr_share=0,
+                sr_society=society,
+                sr_share=0))
+            records.append(InterestedPartyForAgreementRecord(
+                record_type='IPA',
+                ip_n=acquirer,
+                ip_last_name='%s PUBLISHING' % self._random.choice(_NAMES),
+                agreement_role_code='AC',
+                pr_society=society,
+                pr_share=50,
+                mr_society=society,
+                mr_share=100,
+                sr_society=society,
+                sr_share=100))
+
+        return records
@@ -0,0 +1,423 @@
+# -*- coding: utf-8 -*-
+
+import fnmatch
+import hashlib
+import os
+import sqlite3
+from collections import namedtuple
+
+from cwr.parser.decoder.file import default_record_decoder
+from cwr.parser.decoder.reader import MappedFileReader
+
+"""
+Persistent index for finding transactions across CWR files.
+
+The CWRIndex stores, on a SQLite database, the position of each transaction
+on a set of CWR files, keyed by:
+
+- iswc, the ISWC of the work records (NWR, REV, ISW and EXC)
+- submitter_work_n, the submitter work number of the work records
+- ipi_name_n, the IPI name number of the publisher and writer records (SPU,
+  OPU, SWR and OWR)
+- xrf_identifier, the identifier of the work cross references (XRF)
+
+Files are indexed by scanning their bytes, reading only the fields above, so
+indexing does not parse the records. Then a query returns the file, byte
+offsets and transaction sequence number of each matching transaction, and
+only those transactions need to be parsed.
+
+Each file is stored with its modification time, size and hash, so indexing a
+file again only scans it if its contents changed. This way a whole folder can
+be indexed again after adding files to it, and only the new ones are read.
+This bookkeeping is done by the FileDatabase base class, which is shared with
+other indexes over CWR files.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Indexes which can be queried
+INDEXES = ('iswc', 'submitter_work_n', 'ipi_name_n', 'xrf_identifier')
+
+_WORK_FIELDS = (('submitter_work_n', 81, 14), ('iswc', 95, 11))
+
+_PUBLISHER_FIELDS = (('ipi_name_n', 87, 11),)
+
+_WRITER_FIELDS = (('ipi_name_n', 115, 11),)
+
+# Index, column and size of the indexed fields for each record type
+_INDEXED_FIELDS = {
+    'NWR': _WORK_FIELDS,
+    'REV': _WORK_FIELDS,
+    'ISW': _WORK_FIELDS,
+    'EXC': _WORK_FIELDS,
+    'SPU': _PUBLISHER_FIELDS,
+    'OPU': _PUBLISHER_FIELDS,
+    'SWR': _WRITER_FIELDS,
+    'OWR': _WRITER_FIELDS,
+    'XRF': (('xrf_identifier', 22, 14),)
+}
+
+# Records which are not part of a transaction
+_CONTROL_RECORDS = ('HDR', 'GRH', 'GRT', 'TRL')
+
+_FILES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    start_offset INTEGER NOT NULL,
+    end_offset INTEGER NOT NULL,
+    transaction_sequence_n INTEGER
+);
+CREATE INDEX IF NOT EXISTS entries_key ON entries (kind, key);
+CREATE INDEX IF NOT EXISTS entries_file ON entries (file_id);
+"""
+
+IndexEntry = namedtuple('IndexEntry', ['path', 'start', 'end',
+                                       'transaction_sequence_n'])
+IndexEntry.__doc__ = """
+Position of a transaction on a CWR file.
+
+The offsets are those of the first byte of the transaction, and just after its
+last byte.
+"""
+
+
+def normalize_key(index, value):
+    """
+    Returns the value of a key as it is stored on the index.
+
+    ISWCs are stored without separators, so 'T-034.524.680-1' and the ISWCCode
+    for it are the same key as 'T0345246801'. IPI name numbers are stored
+    without leading zeros.
+
+    :param index: the index of the key
+    :param value: the key value
+    :return: the key as stored on the index, which may be empty
+    """
+    key = str(value).strip().upper()
+
+    if index == 'iswc':
+        if key.startswith('ISWC'):
+            key = key[4:]
+        key = key.replace('-', '').replace('.', '').strip()
+    elif index == 'ipi_name_n':
+        key = key.lstrip('0')
+
+    return key
+
+
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1048576), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def _scan(path):
+    """
+    Reads the indexed keys from a file.
+
+    :param path: path to the file
+    :return: a generator for the index, key, start offset, end offset and
+    transaction sequence number of each transaction key
+    """
+    with MappedFileReader(path) as reader:
+        transaction_type = None
+        start = None
+        end = None
+        sequence_n = None
+        keys = set()
+
+        for line_start, line_end in reader.offsets():
+            record_type = reader.record_type(line_start)
+
+            if record_type in _CONTROL_RECORDS or \
+                    record_type == transaction_type:
+                for index, key in keys:
+                    yield index, key, start, end, sequence_n
+                keys = set()
+                start = None
+
+            if record_type in _CONTROL_RECORDS:
+                if record_type == 'GRH':
+                    transaction_type = reader.field(line_start, line_end,
+                                                    3, 3)
+                continue
+
+            if start is None:
+                start = line_start
+                try:
+                    sequence_n = int(reader.field(line_start, line_end,
+                                                  3, 8))
+                except ValueError:
+                    sequence_n = None
+            end = line_end
+
+            for index, column, size in _INDEXED_FIELDS.get(record_type, ()):
+                key = normalize_key(index, reader.field(line_start, line_end,
+                                                        column, size))
+                if key:
+                    keys.add((index, key))
+
+        for index, key in keys:
+            yield index, key, start, end, sequence_n
+
+
+class FileDatabase(object):
+    """
+    Base for the indexes storing data about a set of files on a SQLite
+    database.
+
+    This keeps the files table, with the path, modification time, size and
+    hash of each file, so files are read again only when their contents
+    change. Subclasses create their own tables, referencing the file ids, and
+    delete their rows for a file on _delete_entries.
+
+    The database should be closed after using it, which can be done with a
+    with statement.
+    """
+
+    def __init__(self, path, schema):
+        """
+        Constructs a FileDatabase, creating the database if it does not
+        exist.
+
+        :param path: path to the database file
+        :param schema: SQL script creating the tables of the subclass
+        """
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_FILES_SCHEMA + schema)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Closes the database.
+        """
+        self._connection.close()
+
+    def _add_file(self, path, add_entries):
+        """
+        Adds a file to the database, if it is new or its contents changed.
+
+        The entries for the file are stored by a function receiving the path
+        and id of the file, which is called inside the same transaction that
+        stores the file.
+
+        :param path: path to the file
+        :param add_entries: function storing the entries for the file
+        :return: True if the file was read, False otherwise
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+
+        row = self._connection.execute(
+            'SELECT id, mtime, size, hash FROM files WHERE path = ?',
+            (path,)).fetchone()
+
+        if row is not None and row[1] == stat.st_mtime_ns and \
+                row[2] == stat.st_size:
+            return False
+
+        digest = _file_hash(path)
+
+        with self._connection:
+            if row is not None and row[3] == digest:
+                self._connection.execute(
+                    'UPDATE files SET mtime = ?, size = ? WHERE id = ?',
+                    (stat.st_mtime_ns, stat.st_size, row[0]))
+                return False
+
+            if row is not None:
+                self._delete(row[0])
+
+            file_id = self._connection.execute(
+                'INSERT INTO files (path, mtime, size, hash) '
+                'VALUES (?, ?, ?, ?)',
+                (path, stat.st_mtime_ns, stat.st_size, digest)).lastrowid
+
+            add_entries(path, file_id)
+
+        return True
+
+    def remove_file(self, path):
+        """
+        Removes a file from the database.
+
+        :param path: path to the file
+        """
+        path = os.path.abspath(path)
+
+        with self._connection:
+            row = self._connection.execute(
+                'SELECT id FROM files WHERE path = ?', (path,)).fetchone()
+            if row is not None:
+                self._delete(row[0])
+
+    def _delete(self, file_id):
+        self._delete_entries(file_id)
+        self._connection.execute('DELETE FROM files WHERE id = ?',
+                                 (file_id,))
+
+    def _delete_entries(self, file_id):
+        """
+        Deletes the rows of the subclass tables for a file.
+
+        :param file_id: id of the file
+        """
+        raise NotImplementedError('The _delete_entries method must be '
+                                  'implemented')
+
+    def paths(self):
+        """
+        Returns the paths of the stored files.
+
+        :return: a list with the paths of the stored files
+        """
+        return [row[0] for row in self._connection.execute(
+            'SELECT path FROM files ORDER BY path')]
+
+
+class CWRIndex(FileDatabase):
+    """
+    Index of the transactions on a set of CWR files, stored on a SQLite
+    database.
+
+    The database may be kept anywhere, for example a single one for an
+    archive, or one for each folder. It should be closed after using it,
+    which can be done with a with statement.
+    """
+
+    def __init__(self, path):
+        """
+        Constructs a CWRIndex, creating the database if it does not exist.
+
+        :param path: path to the database file
+        """
+        super(CWRIndex, self).__init__(path, _SCHEMA)
+        self._record_decoder = None
+
+    def add_file(self, path):
+        """
+        Indexes a file.
+
+        If the file was already indexed, it is scanned again only if its
+        contents changed.
+
+        :param path: path to the file
+        :return: True if the file was scanned, False otherwise
+        """
+        return self._add_file(path, self._add_entries)
+
+    def _add_entries(self, path, file_id):
+        self._connection.executemany(
+            'INSERT INTO entries (file_id, kind, key, start_offset, '
+            'end_offset, transaction_sequence_n) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            ((file_id,) + entry for entry in _scan(path)))
+
+    def add_directory(self, directory, pattern='CW*'):
+        """
+        Indexes the files on a folder which match a pattern.
+
+        Files on the folder which were indexed before, and do not exist
+        anymore, are removed from the index.
+
+        :param directory: path to the folder
+        :param pattern: pattern for the names of the files to index
+        :return: the number of files scanned
+        """
+        directory = os.path.abspath(directory)
+
+        paths = set()
+        scanned = 0
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if fnmatch.fnmatch(name, pattern) and os.path.isfile(path):
+                paths.add(path)
+                if self.add_file(path):
+                    scanned += 1
+
+        for path in self.paths():
+            if os.path.dirname(path) == directory and path not in paths:
+                self.remove_file(path)
+
+        return scanned
+
+    def _delete_entries(self, file_id):
+        self._connection.execute('DELETE FROM entries WHERE file_id = ?',
+                                 (file_id,))
+
+    def find(self, index, key):
+        """
+        Finds the transactions with a key.
+
+        :param index: the index to search, one of INDEXES
+        :param key: the key to find
+        :return: a list with the IndexEntry of each matching transaction
+        """
+        if index not in INDEXES:
+            raise ValueError('Unknown index %s' % index)
+
+        rows = self._connection.execute(
+            'SELECT files.path, entries.start_offset, entries.end_offset, '
+            'entries.transaction_sequence_n FROM entries '
+            'JOIN files ON files.id = entries.file_id '
+            'WHERE entries.kind = ? AND entries.key = ? '
+            'ORDER BY files.path, entries.start_offset',
+            (index, normalize_key(index, key)))
+
+        return [IndexEntry(*row) for row in rows]
+
+    def read(self, entry, record_decoder=None):
+        """
+        Parses the transaction for an entry.
+
+        Only the lines of the transaction are read from the file.
+
+        :param entry: the IndexEntry of the transaction
+        :param record_decoder: decoder for a single record line, by default
+        one using the layouts
+        :return: the transaction, as a list of records
+        """
+        if record_decoder is None:
+            if self._record_decoder is None:
+                self._record_decoder = default_record_decoder('layout')
+            record_decoder = self._record_decoder
+
+        with MappedFileReader(entry.path) as reader:
+            return [record_decoder.decode(line)
+                    for line in reader.lines(entry.start, entry.end)]
+
+    def transactions(self, index, key, record_decoder=None):
+        """
+        Finds and parses the transactions with a key.
+
+        :param index: the index to search, one of INDEXES
+        :param key: the key to find
+        :param record_decoder: decoder for a single record line, by default
+        one using the layouts
+        :return: a list with a tuple for each matching transaction, holding
+        its IndexEntry and the transaction records
+        """
+        return [(entry, self.read(entry, record_decoder))
+                for entry in self.find(index, key)]
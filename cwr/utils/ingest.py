@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import fnmatch
+import glob
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from cwr.parser.decoder.file import default_file_decoder
+from cwr.parser.encoder.cwrjson import JSONEncoder
+from cwr.parser.encoder.file import default_file_writer
+from cwr.utils.pool import default_window, imap_unordered
+from cwr.validation.engine import MESSAGE_FILE, MESSAGE_GROUP, \
+    MESSAGE_TRANSACTION, ValidationEngine, is_rejected
+
+"""
+Concurrent ingestion of folders of CWR files.
+
+The ingest function parses a set of CWR files in a pool of processes, each of
+them creating its file decoder only once, and sends each parsed file to a
+sink. Results are returned as soon as each file is done, with the time it
+took and the error found, if any. A file failing does not stop the others.
+
+The sinks included are:
+- JSONSink, storing each file as JSON on a folder
+- CWRSink, encoding each file again as CWR on a folder
+- CallbackSink, calling a function with each parsed file
+- ValidationSink, validating each file before sending it to another sink
+
+The JSON and CWR sinks write the files from the worker processes, while the
+callback is called on the calling process, which receives the parsed files.
+
+This can be run from the console with the cwr-ingest command, or with:
+
+``$ python -m cwr.utils.ingest drop_folder --json output_folder``
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Pattern for the names of the CWR files
+DEFAULT_PATTERN = 'CW*.V2[12]'
+
+IngestResult = namedtuple('IngestResult', ['path', 'seconds', 'error',
+                                           'output'])
+IngestResult.__doc__ = """
+Result of ingesting a single file.
+
+The error is None if the file was ingested. The output is what the sink
+returned for the file, such as the path written.
+"""
+
+
+def find_files(paths, pattern=DEFAULT_PATTERN):
+    """
+    Finds the files to ingest.
+
+    Each path can be a folder, in which case the files on it with names
+    matching the pattern are used, a glob, or a file.
+
+    :param paths: folders, globs or files
+    :param pattern: pattern for the names of the files on the folders
+    :return: a sorted list with the paths of the files
+    """
+    found = set()
+    pattern = pattern.upper()
+
+    for path in paths:
+        if os.path.isdir(path):
+            for name in os.listdir(path):
+                file_path = os.path.join(path, name)
+                if fnmatch.fnmatchcase(name.upper(), pattern) and \
+                        os.path.isfile(file_path):
+                    found.add(file_path)
+        elif os.path.isfile(path):
+            found.add(path)
+        else:
+            found.update(file_path for file_path in glob.glob(path)
+                         if os.path.isfile(file_path))
+
+    return sorted(found)
+
+
+class Sink(object):
+    """
+    Receives each file parsed by the ingestion.
+
+    Sinks running on the workers are sent to each worker process, so they
+    should not hold resources such as open files.
+    """
+
+    # Indicates if the sink runs on the worker processes
+    in_worker = True
+
+    def write(self, cwr_file, path):
+        """
+        Receives a parsed file.
+
+        :param cwr_file: the CWRFile parsed
+        :param path: path to the file parsed
+        :return: a value describing the output, such as the path written
+        """
+        raise NotImplementedError('The write method must be implemented')
+
+
+class JSONSink(Sink):
+    """
+    Stores each file as JSON, on a folder, with the name of the original file
+    followed by .json.
+    """
+
+    def __init__(self, directory):
+        self._directory = directory
+        self._encoder = None
+
+    def write(self, cwr_file, path):
+        if self._encoder is None:
+            self._encoder = JSONEncoder()
+
+        # Encoded before opening the output, so failed files leave nothing
+        data = self._encoder.encode(cwr_file)
+
+        output = os.path.join(self._directory,
+                              os.path.basename(path) + '.json')
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(data)
+
+        return output
+
+
+class CWRSink(Sink):
+    """
+    Encodes each file again as CWR, on a folder, with the same name as the
+    original file.
+    """
+
+    def __init__(self, directory):
+        self._directory = directory
+
+    def write(self, cwr_file, path):
+        output = os.path.join(self._directory, os.path.basename(path))
+        transmission = cwr_file.transmission
+        with open(output, 'wb') as f:
+            writer = default_file_writer(f)
+            writer.write_transmission(transmission.header,
+                                      transmission.groups)
+
+        return output
+
+
+class CallbackSink(Sink):
+    """
+    Calls a function with each parsed file and its path, on the calling
+    process.
+    """
+
+    in_worker = False
+
+    def __init__(self, callback):
+        self._callback = callback
+
+    def write(self, cwr_file, path):
+        return self._callback(cwr_file, path)
+
+
+class ValidationSink(Sink):
+    """
+    Validates each file with a ValidationEngine, and then sends it to another
+    sink, if any.
+
+    The output is a dict with the number of transactions rejected, if any
+    group or the entire file is rejected, the number of validation messages,
+    and the output of the other sink.
+    """
+
+    def __init__(self, sink=None):
+        self._sink = sink
+        self._engine = None
+        if sink is not None:
+            self.in_worker = sink.in_worker
+
+    def write(self, cwr_file, path):
+        if self._engine is None:
+            self._engine = ValidationEngine()
+
+        rejected_transactions = 0
+        rejected_groups = 0
+        rejected_file = False
+        count = 0
+        for part, messages in self._engine.validate_file(cwr_file):
+            count += len(messages)
+            if is_rejected(messages, MESSAGE_TRANSACTION):
+                rejected_transactions += 1
+            if is_rejected(messages, MESSAGE_GROUP):
+                rejected_groups += 1
+            if is_rejected(messages, MESSAGE_FILE):
+                rejected_file = True
+
+        if self._sink is None:
+            output = None
+        else:
+            output = self._sink.write(cwr_file, path)
+
+        return {'rejected_transactions': rejected_transactions,
+                'rejected_groups': rejected_groups,
+                'rejected_file': rejected_file,
+                'messages': count,
+                'output': output}
+
+
+class _NullSink(Sink):
+    """
+    Discards the parsed files, so they are only checked.
+    """
+
+    def write(self, cwr_file, path):
+        return None
+
+
+# Decoder and sink used by the processes of the ingestion
+_worker_decoder = None
+_worker_sink = None
+
+
+def _init_worker(mode, sink):
+    global _worker_decoder
+    global _worker_sink
+    _worker_decoder = default_file_decoder(mode)
+    _worker_sink = sink
+
+
+def _ingest_file(path):
+    start = time.perf_counter()
+    try:
+        cwr_file = _worker_decoder.decode_file(path)
+        if _worker_sink is None:
+            output = cwr_file
+        else:
+            output = _worker_sink.write(cwr_file, path)
+    except Exception as e:
+        return IngestResult(path, time.perf_counter() - start,
+                            '%s: %s' % (type(e).__name__, e), None)
+
+    return IngestResult(path, time.perf_counter() - start, None, output)
+
+
+def ingest(paths, sink=None, processes=None, mode='layout'):
+    """
+    Parses files in a pool of processes, sending each one to the sink.
+
+    The results are returned as each file is done, so not in the order of
+    the paths. If no sink is received, then the output of each result is the
+    CWRFile parsed.
+
+    Only a few files more than the processes are submitted at a time, so the
+    parsed files are not kept in memory waiting to be returned.
+
+    :param paths: paths to the files
+    :param sink: the Sink receiving the parsed files
+    :param processes: number of processes, by default the number of
+    processors
+    :param mode: the parsing mode, as for default_file_decoder
+    :return: a generator for the IngestResult of each file
+    """
+    if sink is not None and sink.in_worker:
+        worker_sink = sink
+    else:
+        worker_sink = None
+
+    with ProcessPoolExecutor(max_workers=processes,
+                             initializer=_init_worker,
+                             initargs=(mode, worker_sink)) as executor:
+        results = imap_unordered(executor, _ingest_file,
+                                 ((path,) for path in paths),
+                                 default_window(processes))
+
+        for result in results:
+            if result.error is None and sink is not None and \
+                    not sink.in_worker:
+                start = time.perf_counter()
+                try:
+                    output = sink.write(result.output, result.path)
+                except Exception as e:
+                    result = result._replace(
+                        error='%s: %s' % (type(e).__name__, e), output=None)
+                else:
+                    result = result._replace(
+                        seconds=result.seconds + time.perf_counter() - start,
+                        output=output)
+
+            yield result
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog='cwr-ingest',
+        description='Parses folders of CWR files concurrently.')
+    parser.add_argument('paths', nargs='+',
+                        help='folders, globs or files to ingest')
+    parser.add_argument('--pattern', default=DEFAULT_PATTERN,
+                        help='pattern for the file names on the folders '
+                             '(default %(default)s)')
+    parser.add_argument('--processes', type=int,
+                        help='number of processes (default one for each '
+                             'processor)')
+    parser.add_argument('--mode', default='layout',
+                        choices=['grammar', 'dispatch', 'layout'],
+                        help='parsing mode (default %(default)s)')
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--json', metavar='FOLDER',
+                        help='stores each file as JSON on the folder')
+    output.add_argument('--cwr', metavar='FOLDER',
+                        help='encodes each file again as CWR on the folder')
+    parser.add_argument('--validate', action='store_true',
+                        help='validates the shares, sequence numbers and '
+                             'counts of each file, storing the result on the '
+                             'report')
+    parser.add_argument('--report',
+                        help='file where the time and error for each file '
+                             'are stored, as JSON')
+    parser.add_argument('--quiet', action='store_true',
+                        help='does not show the progress')
+    return parser
+
+
+def main(args=None):
+    args = _parser().parse_args(args)
+
+    paths = find_files(args.paths, args.pattern)
+
+    if args.json:
+        os.makedirs(args.json, exist_ok=True)
+        sink = JSONSink(args.json)
+    elif args.cwr:
+        os.makedirs(args.cwr, exist_ok=True)
+        sink = CWRSink(args.cwr)
+    else:
+        sink = _NullSink()
+
+    if args.validate:
+        sink = ValidationSink(sink)
+
+    report = []
+    failed = 0
+    for count, result in enumerate(ingest(paths, sink, args.processes,
+                                          args.mode), 1):
+        if result.error is not None:
+            failed += 1
+        if not args.quiet:
+            print('[%d/%d] %s %.2fs %s' % (count, len(paths), result.path,
+                                           result.seconds,
+                                           result.error or 'OK'),
+                  file=sys.stderr)
+        report.append({'path': result.path, 'seconds': result.seconds,
+                       'error': result.error, 'output': result.output})
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if not args.quiet:
+        print('Ingested %d files, %d failed' % (len(paths), failed),
+              file=sys.stderr)
+
+    if failed:
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
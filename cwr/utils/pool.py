@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
+
+"""
+Helpers for running tasks on a pool of processes.
+
+Submitting a task for each file of a big batch at once queues all of them,
+and keeps each future, with its result, until the whole batch is done. The
+imap_unordered function instead keeps only a window of pending tasks,
+submitting a new one as each of them is done, so the memory used does not
+depend on the size of the batch.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def default_window(processes=None):
+    """
+    Returns the number of pending tasks kept for a pool, which is twice its
+    number of processes, so the processes do not wait for new tasks.
+
+    :param processes: number of processes, by default the number of
+    processors
+    :return: the number of pending tasks
+    """
+    return 2 * (processes or os.cpu_count() or 1)
+
+
+def imap_unordered(executor, function, arguments, window):
+    """
+    Runs a function on an executor for each tuple of arguments, keeping at
+    most a window of pending tasks.
+
+    The results are returned as each task is done, so not in the order of the
+    arguments, and each future is dropped once its result is returned.
+
+    :param executor: the executor running the tasks
+    :param function: the function to run
+    :param arguments: iterable with the tuple of arguments for each task
+    :param window: maximum number of pending tasks
+    :return: a generator for the result of each task
+    """
+    pending = set()
+    for args in arguments:
+        pending.add(executor.submit(function, *args))
+        while len(pending) >= window:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
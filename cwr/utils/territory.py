@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+
+from data_cwr.accessor import CWRTables
+
+"""
+Territory coverage of transactions, using the TIS territory codes.
+
+The TIS codes are those of single countries, and those of territory groups,
+such as 2136 for the World, which contain other territories. The
+TerritoryEngine expands each code, once, into a bitset over the countries,
+stored as an integer where each bit is a country. This way checking if a
+territory contains a country is a single bit test, and a group of
+territories is just the bitwise or of their bitsets.
+
+Territory records (SPT, SWT and TER) are applied in order, each inclusion
+adding its countries to the territory of its interested party, or of the
+agreement, and each exclusion removing them. The coverage of a transaction is
+then that of all its interested parties.
+
+The World contains all the countries. The countries of the other groups are
+taken from a hierarchy, mapping each group code to its member codes, which
+may be countries or other groups. By default this is the CISAC TIS hierarchy,
+from the tis_hierarchy table, with the current members of each group.
+
+Groups without members, which are listed by the unresolved property, receive
+their own bit, as if they were countries. This way they still match the same
+code, and are contained in the World, even if their countries are unknown.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# TIS code for the World
+WORLD = 2136
+
+# Codes from this one are territory groups
+_FIRST_GROUP = 2000
+
+# Territory records, which can include or exclude territories
+_TERRITORY_RECORDS = frozenset(('SPT', 'SWT', 'TER'))
+
+
+class TerritoryEngine(object):
+    """
+    Computes the territories covered by transactions, as bitsets over the
+    countries.
+    """
+
+    def __init__(self, codes=None, hierarchy=None):
+        """
+        Constructs a TerritoryEngine.
+
+        :param codes: the valid TIS codes, by default those of the TIS table
+        :param hierarchy: dict mapping group codes to their member codes, by
+        default the TIS hierarchy table
+        """
+        tables = None
+        if codes is None:
+            tables = CWRTables()
+            codes = tables.get_data('tis_code')
+        if hierarchy is None:
+            if tables is None:
+                tables = CWRTables()
+            hierarchy = dict((row[0], row[1:])
+                             for row in tables.get_rows('tis_hierarchy'))
+
+        codes = set(int(code) for code in codes)
+        hierarchy = dict((int(group), [int(member) for member in members])
+                         for group, members in hierarchy.items() if members)
+        codes.update(hierarchy)
+
+        groups = set(code for code in codes if code >= _FIRST_GROUP)
+        groups.update(hierarchy)
+
+        self._countries = sorted(codes - groups)
+        self._unresolved = sorted(group for group in groups
+                                  if group != WORLD and group not in hierarchy)
+
+        # Unresolved groups stand for themselves, after the countries
+        self._codes = self._countries + self._unresolved
+        self._bits = dict((code, 1 << index)
+                          for index, code in enumerate(self._codes))
+
+        self._masks = dict(self._bits)
+        self._masks[WORLD] = (1 << len(self._codes)) - 1
+        for group in groups:
+            self._expand(group, hierarchy, ())
+
+    def _expand(self, code, hierarchy, path):
+        if code in self._masks:
+            return self._masks[code]
+        if code in path:
+            raise ValueError('Territory %s contains itself' % code)
+
+        mask = 0
+        for member in hierarchy.get(code, ()):
+            mask |= self._expand(member, hierarchy, path + (code,))
+
+        self._masks[code] = mask
+        return mask
+
+    @property
+    def countries(self):
+        """
+        The country codes, in the order of their bits.
+
+        :return: a list with the country codes
+        """
+        return self._countries
+
+    @property
+    def unresolved(self):
+        """
+        The group codes without members, which only cover themselves.
+
+        :return: a list with the group codes
+        """
+        return self._unresolved
+
+    def mask(self, *codes):
+        """
+        Returns the bitset for the countries of one or more territories.
+
+        :param codes: TIS codes of the territories
+        :return: the bitset, as an integer
+        """
+        mask = 0
+        for code in codes:
+            try:
+                mask |= self._masks[int(code)]
+            except KeyError:
+                raise ValueError('Unknown TIS code %s' % code)
+
+        return mask
+
+    def codes(self, mask):
+        """
+        Returns the country codes on a bitset, followed by those of the
+        unresolved groups.
+
+        :param mask: the bitset
+        :return: a list with the codes
+        """
+        return [code for code in self._codes if mask & self._bits[code]]
+
+    def contains(self, territory, code):
+        """
+        Indicates if a territory contains another one.
+
+        :param territory: TIS code of the containing territory
+        :param code: TIS code of the contained territory
+        :return: True if all the countries of the second territory are on the
+        first one
+        """
+        mask = self.mask(code)
+        return self.mask(territory) & mask == mask
+
+    def transaction_mask(self, transaction):
+        """
+        Returns the bitset for the countries covered by a transaction.
+
+        The territory records are applied in order, for each interested party
+        and for the agreement, and the result is the union of all of them.
+        Codes which are not valid are ignored.
+
+        :param transaction: the transaction, as a list of records
+        :return: the bitset, as an integer
+        """
+        masks = self._masks
+        parties = {}
+
+        for record in transaction:
+            record_type = record.record_type
+            if record_type not in _TERRITORY_RECORDS:
+                continue
+
+            if record_type == 'TER':
+                party = None
+            else:
+                party = (record_type, record.ip_n)
+
+            mask = masks.get(record.tis_numeric_code, 0)
+            if record.inclusion_exclusion_indicator == 'E':
+                parties[party] = parties.get(party, 0) & ~mask
+            else:
+                parties[party] = parties.get(party, 0) | mask
+
+        covered = 0
+        for mask in parties.values():
+            covered |= mask
+
+        return covered
+
+    def covers(self, transaction, mask):
+        """
+        Indicates if a transaction covers any country of a bitset.
+
+        :param transaction: the transaction, as a list of records
+        :param mask: the bitset, as returned by mask()
+        :return: True if the transaction covers any of the countries
+        """
+        return self.transaction_mask(transaction) & mask != 0
+
+    def coverage(self, transactions):
+        """
+        Returns the bitset for the countries covered by any of the
+        transactions, for example those of a whole file.
+
+        :param transactions: iterable with the transactions
+        :return: the bitset, as an integer
+        """
+        covered = 0
+        transaction_mask = self.transaction_mask
+        for transaction in transactions:
+            covered |= transaction_mask(transaction)
+
+        return covered
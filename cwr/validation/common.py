@@ -26,14 +26,18 @@ class ValidationStatus(object):
 class ASValidationStatus(ValidationStatus):
 
     def __init__(self, message = None):
-        super().__init__()
-        self.code = 'AS'
+        super().__init__('AS', message)
 
 class NPValidationStatus(ValidationStatus):
 
     def __init__(self, message = None):
-        super().__init__()
-        self.code = 'NP'
+        super().__init__('NP', message)
+
+
+class RJValidationStatus(ValidationStatus):
+
+    def __init__(self, message = None):
+        super().__init__('RJ', message)
 
 
 class Validation(object):
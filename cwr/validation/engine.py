@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+
+from collections import namedtuple
+from operator import attrgetter
+
+from cwr.group import GroupHeader, GroupTrailer
+from cwr.transmission import TransmissionHeader, TransmissionTrailer
+from cwr.utils.territory import TerritoryEngine
+
+"""
+Validation engine for the transaction shares and the file structure.
+
+The ValidationEngine applies the following CISAC rules:
+- The PR, MR and SR ownership shares of all the publishers and writers (SPU,
+  OPU, SWR and OWR) on a transaction add up to 100%, or to 0%
+- The PR, MR and SR collection shares of all the publishers and writers
+  territories (SPT and SWT) on a transaction do not exceed 100% for any
+  country, adding up the shares of all the territories containing it
+- The transaction sequence numbers of a group start at 0 and increase by one,
+  and so do the record sequence numbers of a transaction, while all the
+  records of a transaction share its transaction sequence number
+- The group IDs start at 1 and increase by one
+- The counts on the group trailers (GRT) and the transmission trailer (TRL)
+  are those of the file
+
+The rules are prepared once, when creating the engine, as a table mapping
+each record type to the values it adds to the totals, and a transaction is
+validated with a single pass over its records.
+
+Territories are expanded into bitsets over the countries with a
+TerritoryEngine, so overlapping territories, such as the World and a single
+country, are added together. As with the coverage, exclusions remove their
+countries from the previous inclusions of the same interested party. The
+countries are then split into the groups covered by the same territories,
+and the totals are checked once for each group, instead of for each country.
+
+Each failed rule creates a ValidationMessage, with the same fields as a
+MessageRecord (MSG). The message type indicates what is rejected:
+- 'T' for the transaction, because of the shares or sequence numbers
+- 'G' for the group, because of the group trailer counts or IDs
+- 'E' for the entire file, because of the transmission trailer counts
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Message types, indicating what is rejected
+MESSAGE_TRANSACTION = 'T'
+MESSAGE_GROUP = 'G'
+MESSAGE_FILE = 'E'
+
+# Validation numbers for each rule
+VALIDATION_OWNERSHIP = '001'
+VALIDATION_COLLECTION = '002'
+VALIDATION_TRANSACTION_SEQUENCE = '003'
+VALIDATION_RECORD_SEQUENCE = '004'
+VALIDATION_GROUP_ID = '005'
+VALIDATION_GROUP_COUNT = '006'
+VALIDATION_TRANSMISSION_COUNT = '007'
+
+# Tolerance for the share totals
+DEFAULT_TOLERANCE = 0.06
+
+_RIGHTS = ('PR', 'MR', 'SR')
+
+# Kinds of records taking part on the share totals
+_OWNERSHIP = 1
+_COLLECTION = 2
+
+ValidationMessage = namedtuple('ValidationMessage', [
+    'message_type', 'message_level', 'validation_n', 'message_record_type',
+    'original_record_sequence_n', 'message_text'])
+ValidationMessage.__doc__ = """
+A failed validation rule.
+
+The fields are those of a MessageRecord, so it can be sent back on an
+acknowledgement file.
+"""
+
+
+class ValidationEngine(object):
+    """
+    Validates transactions and files with the CISAC share and structure
+    rules.
+
+    Transactions can be validated on their own, while the group and
+    transmission rules are applied to the parts of a transmission, in the
+    order returned by a StreamFileDecoder, so files can be validated as they
+    are read.
+    """
+
+    def __init__(self, tolerance=DEFAULT_TOLERANCE, territories=None):
+        """
+        Constructs a ValidationEngine.
+
+        :param tolerance: tolerance for the share totals, in percentage
+        points
+        :param territories: the TerritoryEngine expanding the territories, by
+        default one with the TIS tables
+        """
+        self._tolerance = tolerance
+
+        if territories is None:
+            territories = TerritoryEngine()
+        self._territories = territories
+        self._territory_masks = {}
+
+        self._kinds = {}
+        for record_type in ('SPU', 'OPU', 'SWR', 'OWR'):
+            self._kinds[record_type] = _OWNERSHIP
+        for record_type in ('SPT', 'SWT'):
+            self._kinds[record_type] = _COLLECTION
+
+        self._ownership_shares = attrgetter(
+            'pr_ownership_share', 'mr_ownership_share', 'sr_ownership_share')
+        self._collection_shares = attrgetter(
+            'tis_numeric_code', 'inclusion_exclusion_indicator',
+            'pr_collection_share', 'mr_collection_share',
+            'sr_collection_share')
+
+    def validate_transaction(self, transaction, transaction_sequence_n=None):
+        """
+        Validates the shares and sequence numbers of a transaction.
+
+        :param transaction: the transaction, as a list of records
+        :param transaction_sequence_n: the expected transaction sequence
+        number, if it is known
+        :return: a list with the ValidationMessage of each failed rule
+        """
+        messages = []
+        if not transaction:
+            return messages
+
+        first = transaction[0]
+        header_type = first.record_type
+        sequence_n = first.transaction_sequence_n
+
+        if transaction_sequence_n is not None and \
+                sequence_n != transaction_sequence_n:
+            messages.append(ValidationMessage(
+                MESSAGE_TRANSACTION, MESSAGE_TRANSACTION,
+                VALIDATION_TRANSACTION_SEQUENCE, header_type, 0,
+                'Transaction sequence number is %s, expected %s' %
+                (sequence_n, transaction_sequence_n)))
+
+        kinds = self._kinds
+        ownership_shares = self._ownership_shares
+        collection_shares = self._collection_shares
+
+        ownership = None
+        collection = []
+        record_sequence_n = 0
+        for record in transaction:
+            if record.record_sequence_n != record_sequence_n or \
+                    record.transaction_sequence_n != sequence_n:
+                messages.append(ValidationMessage(
+                    MESSAGE_TRANSACTION, MESSAGE_TRANSACTION,
+                    VALIDATION_RECORD_SEQUENCE, record.record_type,
+                    record.record_sequence_n,
+                    'Sequence numbers are %s/%s, expected %s/%s' %
+                    (record.transaction_sequence_n,
+                     record.record_sequence_n, sequence_n,
+                     record_sequence_n)))
+            record_sequence_n += 1
+
+            kind = kinds.get(record.record_type)
+            if kind == _OWNERSHIP:
+                pr, mr, sr = ownership_shares(record)
+                if ownership is None:
+                    ownership = [0.0, 0.0, 0.0]
+                ownership[0] += pr or 0
+                ownership[1] += mr or 0
+                ownership[2] += sr or 0
+            elif kind == _COLLECTION:
+                code, indicator, pr, mr, sr = collection_shares(record)
+                mask = self._territory_mask(code)
+                if not mask:
+                    continue
+                party = (record.record_type, record.ip_n)
+                if indicator == 'I':
+                    collection.append([party, mask, pr or 0, mr or 0,
+                                       sr or 0])
+                else:
+                    for entry in collection:
+                        if entry[0] == party:
+                            entry[1] &= ~mask
+
+        maximum = 100 + self._tolerance
+
+        if ownership is not None:
+            for right, total in zip(_RIGHTS, ownership):
+                if total > self._tolerance and \
+                        abs(total - 100) > self._tolerance:
+                    messages.append(ValidationMessage(
+                        MESSAGE_TRANSACTION, MESSAGE_TRANSACTION,
+                        VALIDATION_OWNERSHIP, header_type, 0,
+                        '%s ownership shares add up to %.2f' %
+                        (right, total)))
+
+        for mask, totals in _country_totals(collection):
+            for right, total in zip(_RIGHTS, totals):
+                if total > maximum:
+                    code = self._territories.codes(mask)[0]
+                    messages.append(ValidationMessage(
+                        MESSAGE_TRANSACTION, MESSAGE_TRANSACTION,
+                        VALIDATION_COLLECTION, header_type, 0,
+                        '%s collection shares for territory %s add up to '
+                        '%.2f' % (right, code, total)))
+
+        return messages
+
+    def _territory_mask(self, code):
+        mask = self._territory_masks.get(code)
+        if mask is None:
+            try:
+                mask = self._territories.mask(code)
+            except (TypeError, ValueError):
+                # Missing or unknown codes are left to the field validation
+                mask = 0
+            self._territory_masks[code] = mask
+
+        return mask
+
+    def validate_parts(self, parts):
+        """
+        Validates the parts of a transmission, returning each of them with
+        the messages for it.
+
+        Transactions receive the messages for their shares and sequence
+        numbers, group trailers those for the group counts and IDs, and the
+        transmission trailer those for the transmission counts.
+
+        :param parts: iterable with the transmission parts, in file order
+        :return: a generator for tuples with each part and a list with its
+        messages
+        """
+        expected_group_id = 1
+        group_count = 0
+        transaction_count = 0
+        record_count = 0
+
+        group_id = None
+        group_transactions = 0
+        group_records = 0
+
+        for part in parts:
+            messages = []
+
+            if isinstance(part, list):
+                messages = self.validate_transaction(part,
+                                                     group_transactions)
+                group_transactions += 1
+                group_records += len(part)
+            elif isinstance(part, GroupHeader):
+                group_id = part.group_id
+                group_transactions = 0
+                group_records = 0
+                if group_id != expected_group_id:
+                    messages.append(ValidationMessage(
+                        MESSAGE_GROUP, MESSAGE_GROUP, VALIDATION_GROUP_ID,
+                        'GRH', 0, 'Group ID is %s, expected %s' %
+                        (group_id, expected_group_id)))
+                expected_group_id += 1
+            elif isinstance(part, GroupTrailer):
+                # Group header and trailer are counted
+                group_records += 2
+                messages = self._check_counts(
+                    part, MESSAGE_GROUP, VALIDATION_GROUP_COUNT,
+                    (('group_id', group_id),
+                     ('transaction_count', group_transactions),
+                     ('record_count', group_records)))
+                group_count += 1
+                transaction_count += group_transactions
+                record_count += group_records
+            elif isinstance(part, TransmissionTrailer):
+                # Transmission header and trailer are counted
+                messages = self._check_counts(
+                    part, MESSAGE_FILE, VALIDATION_TRANSMISSION_COUNT,
+                    (('group_count', group_count),
+                     ('transaction_count', transaction_count),
+                     ('record_count', record_count + 2)))
+            elif not isinstance(part, TransmissionHeader):
+                raise ValueError('Unknown transmission part %r' % (part,))
+
+            yield part, messages
+
+    def validate_file(self, cwr_file):
+        """
+        Validates a whole CWRFile.
+
+        :param cwr_file: the CWRFile to validate
+        :return: a list with tuples for each part with messages, and a list
+        with those messages
+        """
+        return [(part, messages) for part, messages in
+                self.validate_parts(cwr_file.transmission.parts())
+                if messages]
+
+    @staticmethod
+    def _check_counts(trailer, message_type, validation_n, expected):
+        messages = []
+
+        for field, value in expected:
+            actual = getattr(trailer, field)
+            if actual != value:
+                messages.append(ValidationMessage(
+                    message_type, message_type, validation_n,
+                    trailer.record_type, 0, '%s is %s, expected %s' %
+                    (field, actual, value)))
+
+        return messages
+
+
+def _country_totals(collection):
+    """
+    Splits the countries into groups covered by the same territories, adding
+    up the shares of these territories.
+
+    :param collection: list with the party, bitset and shares of each
+    territory
+    :return: a list of tuples with the bitset and shares of each group
+    """
+    groups = []
+    for party, mask, pr, mr, sr in collection:
+        split = []
+        for group, totals in groups:
+            inside = group & mask
+            if inside:
+                split.append((inside, (totals[0] + pr, totals[1] + mr,
+                                       totals[2] + sr)))
+                if group != inside:
+                    split.append((group & ~mask, totals))
+                mask &= ~group
+            else:
+                split.append((group, totals))
+        if mask:
+            split.append((mask, (pr, mr, sr)))
+        groups = split
+
+    return groups
+
+
+def is_rejected(messages, message_type=MESSAGE_TRANSACTION):
+    """
+    Indicates if any of the messages rejects the part they are for.
+
+    :param messages: the validation messages
+    :param message_type: the type rejecting the part
+    :return: True if any message has that type, False otherwise
+    """
+    for message in messages:
+        if message.message_type == message_type:
+            return True
+
+    return False
@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
-from apt_pkg import __init__
 
-from cwr.validation.common import Validation, ValidationStatus, ASValidationStatus
+from cwr.validation.common import Validation, ValidationStatus, \
+    ASValidationStatus, RJValidationStatus
+from cwr.validation.engine import ValidationEngine, is_rejected
 
 """
 Base classes for implementing validation rules.
@@ -17,10 +18,24 @@ class ValidationTransaction(Validation):
 
     config = None
 
-    def __init__(self, config):
+    def __init__(self, config, engine=None):
         self.config = config
+        if engine is None:
+            engine = ValidationEngine()
+        self._engine = engine
 
     def validate(self, transaction):
-        return ASValidationStatus()
+        """
+        Validates the shares and sequence numbers of the transaction.
+
+        The transaction is rejected if any of the rules fails, in which case
+        the status message is the list of ValidationMessage for them.
 
+        :param transaction: the transaction, as a list of records
+        :return: the ValidationStatus for the transaction
+        """
+        messages = self._engine.validate_transaction(transaction)
+        if is_rejected(messages):
+            return RJValidationStatus(messages)
 
+        return ASValidationStatus()
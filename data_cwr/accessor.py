@@ -52,6 +52,18 @@ class _FileReader(object):
                     result.append(t)
         return result
 
+    def read_csv_rows(self, file_name):
+        """
+        Parses a CSV file into a list of rows.
+
+        :param file_name: name of the CSV file
+        :return: a list with a list for each row of the file
+        """
+        with open(os.path.join(self.__path(), os.path.basename(file_name)),
+                  'rt') as csvfile:
+            return [row for row in csv.reader(csvfile, delimiter=',',
+                                              quotechar='|') if row]
+
     def read_yaml_file(self, file_name):
         """
         Parses a YAML file into a matrix.
@@ -76,6 +88,7 @@ class CWRTables(object):
 
     def __init__(self):
         self._file_values = {}
+        self._file_rows = {}
         # Reader for the files
         self._reader = _FileReader()
 
@@ -95,3 +108,20 @@ class CWRTables(object):
                 file_contents)
 
         return self._file_values[file_id]
+
+    def get_rows(self, file_id):
+        """
+        Acquires the rows from the table identified by the id.
+
+        This is used for the tables relating values, where each row begins
+        with a value followed by those related to it.
+
+        :param file_id: identifier for the table
+        :return: a list with a list for each row of the table
+        """
+        if file_id not in self._file_rows:
+            file_contents = 'cwr_%s.csv' % file_id
+            self._file_rows[file_id] = self._reader.read_csv_rows(
+                file_contents)
+
+        return self._file_rows[file_id]
@@ -89,6 +89,9 @@ setup(
         'pyyaml>=5.4',
     ],
     tests_require=_tests_require,
-    extras_require={'test': _tests_require},
+    extras_require={'test': _tests_require, 'numpy': ['numpy']},
+    entry_points={
+        'console_scripts': ['cwr-ingest = cwr.utils.ingest:main'],
+    },
     cmdclass={'test': _ToxTester},
 )
@@ -1 +1,11 @@
+import atexit
+import os
+import shutil
+import tempfile
+
 __author__ = 'Bernardo'
+
+# The decoders cache is stored on a temporary folder, instead of the user one
+_cache_dir = tempfile.mkdtemp()
+os.environ['CWR_CACHE_DIR'] = _cache_dir
+atexit.register(shutil.rmtree, _cache_dir, True)
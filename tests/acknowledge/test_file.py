@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from config_cwr.accessor import CWRConfiguration
+from cwr.acknowledge.file import AcknowledgeFile, acknowledge_files
+from cwr.interested_party import IPTerritoryOfControlRecord
+from cwr.parser.decoder.file import StreamFileDecoder, \
+    default_file_decoder, default_record_decoder, default_stream_decoder
+from cwr.utils.generator import CWRFileGenerator
+from cwr.validation.engine import ValidationEngine
+
+"""
+Acknowledgement file tests.
+
+The following cases are tested:
+- Each acknowledgement keeps its own sequence numbers
+- The acknowledged records are not changed
+- Transactions are accepted if they cover a configured country, or a
+  configured group without a hierarchy
+- Configured groups with countries, such as the World, are not taken as
+  society territories
+- Streamed acknowledgements are valid files
+- Batches of files are acknowledged on a pool of processes
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestAcknowledgeFile(unittest.TestCase):
+    def setUp(self):
+        self._config = CWRConfiguration().load_acknowledge_config('example')
+
+        self._generator = CWRFileGenerator(
+            transaction_mix={'AGR': 1, 'NWR': 1}, seed=1,
+            creation_date_time=datetime.datetime(2016, 1, 2))
+
+        output = io.StringIO()
+        self._generator.write(output, 4)
+        self._contents = output.getvalue()
+
+    def _cwr_file(self):
+        return default_file_decoder('layout').decode(
+            {'filename': self._generator.filename(),
+             'contents': self._contents})
+
+    def _acknowledge(self):
+        acknowledge = AcknowledgeFile(self._config, 1, 'SYN')
+        acknowledge.acknowledge_cwr_file(self._cwr_file())
+        return acknowledge._acknowledge.transmission
+
+    def _tis_file(self, tis, hierarchy=None):
+        config = dict(self._config)
+        config['tis'] = tis
+        if hierarchy is not None:
+            config['tis_hierarchy'] = hierarchy
+
+        return AcknowledgeFile(config, 1, 'SYN')
+
+    @staticmethod
+    def _territories(*codes, **kwargs):
+        return [IPTerritoryOfControlRecord(
+            record_type='SPT', ip_n='A', tis_numeric_code=code,
+            inclusion_exclusion_indicator=kwargs.get('indicator', 'I'))
+            for code in codes]
+
+    def test_tis(self):
+        acknowledge = self._tis_file({'europe': 2120, 'spain': 724})
+
+        self.assertTrue(acknowledge.validate_tis(self._territories(2120)))
+        self.assertTrue(acknowledge.validate_tis(self._territories(724)))
+        self.assertFalse(acknowledge.validate_tis(self._territories(250)))
+        self.assertFalse(acknowledge.validate_tis(self._territories(840)))
+
+    def test_tis_example(self):
+        acknowledge = AcknowledgeFile(self._config, 1, 'SYN')
+        society = [code for code in self._config['tis'].values()
+                   if code != 2136]
+
+        self.assertEqual('NP', acknowledge.validate_transaction(
+            self._territories(250)).code)
+        self.assertTrue(acknowledge.validate_tis(self._territories(643)))
+        self.assertTrue(acknowledge.validate_tis(self._territories(2136)))
+        self.assertFalse(acknowledge.validate_tis(
+            self._territories(2136) +
+            self._territories(*society, indicator='E')))
+
+    def test_tis_unresolved(self):
+        acknowledge = self._tis_file({'europe': 2120}, {})
+
+        self.assertTrue(acknowledge.validate_tis(self._territories(2120)))
+        self.assertFalse(acknowledge.validate_tis(self._territories(724)))
+        self.assertEqual('NP', acknowledge.validate_transaction(
+            self._territories(2100)).code)
+
+    def test_original_records(self):
+        cwr_file = self._cwr_file()
+        expected = [[(record.transaction_sequence_n, record.record_sequence_n)
+                     for record in transaction]
+                    for group in cwr_file.transmission.groups
+                    for transaction in group.transactions]
+
+        AcknowledgeFile(self._config, 1, 'SYN').acknowledge_cwr_file(cwr_file)
+
+        self.assertEqual(expected,
+                         [[(record.transaction_sequence_n,
+                            record.record_sequence_n)
+                           for record in transaction]
+                          for group in cwr_file.transmission.groups
+                          for transaction in group.transactions])
+
+    def test_sequences(self):
+        first = self._acknowledge()
+        second = self._acknowledge()
+
+        for transmission in (first, second):
+            self.assertEqual([1, 2], [group.group_header.group_id
+                                      for group in transmission.groups])
+            self.assertEqual([1, 2], [group.group_trailer.group_id
+                                      for group in transmission.groups])
+            self.assertEqual(
+                [0, 1], [transaction[0].transaction_sequence_n
+                         for transaction in transmission.groups[1].transactions])
+
+    def test_valid(self):
+        transmission = self._acknowledge()
+
+        self.assertEqual([], [messages for part, messages in
+                              ValidationEngine().validate_parts(
+                                  transmission.parts()) if messages])
+
+    def test_write_parts(self):
+        output = io.BytesIO()
+        parts = default_stream_decoder('layout').decode(
+            io.StringIO(self._contents))
+
+        trailer = AcknowledgeFile(self._config, 1, 'SYN').write_parts(
+            parts, output)
+
+        self.assertEqual(2, trailer.group_count)
+        self.assertEqual(4, trailer.transaction_count)
+
+        # The acknowledged records are not checked against the structures
+        lines = io.StringIO(output.getvalue().decode('latin-1'))
+        parts = list(StreamFileDecoder(
+            default_record_decoder('layout')).decode(lines))
+        self.assertEqual(['ACK', 'ACK', 'ACK', 'ACK'],
+                         [part[0].record_type for part in parts
+                          if isinstance(part, list)])
+        self.assertEqual([], [messages for part, messages in
+                              ValidationEngine().validate_parts(parts)
+                              if messages])
+
+
+class TestAcknowledgeFiles(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        self._output = tempfile.mkdtemp()
+
+        self._paths = []
+        for sequence_n in (1, 2):
+            generator = CWRFileGenerator(
+                transaction_mix={'NWR': 1}, seed=sequence_n,
+                creation_date_time=datetime.datetime(2016, 1, 2))
+            path = os.path.join(self._directory,
+                                generator.filename(sequence_n))
+            generator.write_file(path, 3)
+            self._paths.append(path)
+
+        self._invalid = os.path.join(self._directory, 'CW160003SYN_000.V21')
+        with open(self._invalid, 'w') as f:
+            f.write('NOT A CWR FILE')
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+        shutil.rmtree(self._output)
+
+    def test_batch(self):
+        config = CWRConfiguration().load_acknowledge_config('example')
+
+        results = sorted(acknowledge_files(self._paths + [self._invalid],
+                                           config, self._output, 10, 1),
+                         key=lambda result: (result.error is not None,
+                                             result.path))
+
+        self.assertEqual([None, None], [result.error
+                                        for result in results[:2]])
+        self.assertTrue(results[2].error is not None)
+        self.assertEqual(sorted(os.path.basename(path) + '.ack'
+                                for path in self._paths),
+                         sorted(os.listdir(self._output)))
+
+        with open(results[0].output, 'rb') as f:
+            data = f.read().decode('latin-1')
+        self.assertEqual(3, data.count('\nACK'))
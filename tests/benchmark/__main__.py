@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import sys
+
+from tests.benchmark.suite import BENCHMARKS, find_regressions, \
+    run_benchmarks
+
+"""
+Command line entry point for the benchmarks.
+
+Usage, from the project root:
+
+``$ python -m tests.benchmark --save results.json``
+
+``$ python -m tests.benchmark --compare results.json``
+
+When comparing with a previous run the exit code is 1 if any regression is
+found.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m tests.benchmark',
+        description='Runs the CWR-API benchmarks.')
+    parser.add_argument('names', nargs='*', metavar='benchmark',
+                        help='benchmarks to run, from: %s (default all)' %
+                             ', '.join(sorted(BENCHMARKS)))
+    parser.add_argument('--sizes', nargs='+', type=int,
+                        default=[1000, 10000, 100000],
+                        help='transactions on each input file')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='times each operation is run, keeping the best')
+    parser.add_argument('--save', help='file where the results are stored')
+    parser.add_argument('--compare',
+                        help='results of a previous run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed difference with the previous run')
+    return parser
+
+
+def main(args=None):
+    args = _parser().parse_args(args)
+
+    names = args.names or sorted(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            sys.exit('Unknown benchmark: %s' % name)
+
+    results = []
+    for result in run_benchmarks(names, args.sizes, args.repeat):
+        if result['peak_memory'] is None:
+            memory = '-'
+        else:
+            memory = '%.1f MB' % (result['peak_memory'] / 1048576.0)
+        print('%-14s %7d transactions %12.0f records/s %12s' %
+              (result['name'], result['transactions'],
+               result['records_per_second'], memory))
+        results.append(result)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = find_regressions(results, json.load(f),
+                                           args.tolerance)
+        for regression in regressions:
+            print('Regression: %s' % regression)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
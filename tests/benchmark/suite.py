@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from cwr.acknowledge.file import example_acknowledge_file
+from cwr.parser.decoder.cwrjson import JSONDecoder
+from cwr.parser.decoder.file import default_file_decoder
+from cwr.parser.encoder.cwrjson import JSONEncoder
+from cwr.parser.encoder.file import default_file_encoder
+from tests.benchmark.synthetic import FILENAME, record_count, \
+    synthetic_contents
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+"""
+Benchmarks for the main operations of the library.
+
+Each benchmark processes a synthetic file with a number of transactions,
+measuring the throughput, in records per second, and the peak memory of the
+process.
+
+To keep the memory measures apart, each benchmark is run on its own process.
+The peak memory is the maximum resident set size of that process, so it
+includes the input of the benchmark. It is not available on platforms missing
+the resource module, such as Windows.
+
+The results can be compared with those from a previous run, to find
+regressions.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _file_data(transactions):
+    return {'filename': FILENAME,
+            'contents': synthetic_contents(transactions)}
+
+
+def _cwr_file(transactions):
+    return default_file_decoder('layout').decode(_file_data(transactions))
+
+
+def _json_file(transactions):
+    return JSONEncoder().encode(_cwr_file(transactions))
+
+
+def _decode(data):
+    default_file_decoder().decode(data)
+
+
+def _decode_layout(data):
+    default_file_decoder('layout').decode(data)
+
+
+def _encode(cwr_file):
+    default_file_encoder().encode(cwr_file.transmission)
+
+
+def _encode_json(cwr_file):
+    JSONEncoder().encode(cwr_file)
+
+
+def _decode_json(data):
+    JSONDecoder().decode(data)
+
+
+def _acknowledge(cwr_file):
+    example_acknowledge_file(1, 'REC').acknowledge_cwr_file(cwr_file)
+
+
+class Benchmark(object):
+    """
+    A benchmark, which runs an operation over the input created by its setup.
+
+    The setup receives the number of transactions and creates the input,
+    which is not measured.
+    """
+
+    def __init__(self, name, setup, operation):
+        self._name = name
+        self._setup = setup
+        self._operation = operation
+
+    @property
+    def name(self):
+        """
+        Name of the benchmark.
+
+        :return: the benchmark name
+        """
+        return self._name
+
+    def run(self, transactions, repeat=1):
+        """
+        Runs the benchmark on the current process.
+
+        The operation is run the received number of times, keeping the best
+        time.
+
+        :param transactions: number of transactions on the input file
+        :param repeat: number of times the operation is run
+        :return: dictionary with the results
+        """
+        data = self._setup(transactions)
+
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            self._operation(data)
+            elapsed = time.perf_counter() - start
+
+            if best is None or elapsed < best:
+                best = elapsed
+
+        records = record_count(transactions)
+
+        return {'name': self._name,
+                'transactions': transactions,
+                'records': records,
+                'seconds': best,
+                'records_per_second': records / best if best else None,
+                'peak_memory': _peak_memory()}
+
+
+# All the benchmarks, by name
+BENCHMARKS = {}
+
+for _benchmark in [Benchmark('decode', _file_data, _decode),
+                   Benchmark('decode_layout', _file_data, _decode_layout),
+                   Benchmark('encode', _cwr_file, _encode),
+                   Benchmark('json_encode', _cwr_file, _encode_json),
+                   Benchmark('json_decode', _json_file, _decode_json),
+                   Benchmark('acknowledge', _cwr_file, _acknowledge)]:
+    BENCHMARKS[_benchmark.name] = _benchmark
+
+
+def _peak_memory():
+    """
+    Returns the peak memory used by the current process, in bytes.
+
+    :return: the peak memory, or None if it can't be measured
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != 'darwin':
+        # Linux gives the size in kilobytes
+        peak *= 1024
+
+    return peak
+
+
+def _run_benchmark(name, transactions, repeat):
+    return BENCHMARKS[name].run(transactions, repeat)
+
+
+def run_benchmarks(names, sizes, repeat=1):
+    """
+    Runs the benchmarks, each of them on a new process.
+
+    :param names: names of the benchmarks to run
+    :param sizes: numbers of transactions for the input files
+    :param repeat: number of times each operation is run
+    :return: generator for the results of each benchmark and size
+    """
+    context = multiprocessing.get_context('spawn')
+
+    for name in names:
+        for transactions in sizes:
+            with ProcessPoolExecutor(1, mp_context=context) as executor:
+                yield executor.submit(_run_benchmark, name, transactions,
+                                      repeat).result()
+
+
+def find_regressions(results, baseline, tolerance=0.2):
+    """
+    Compares the results with those of a previous run.
+
+    A benchmark is a regression when its throughput is lower, or its peak
+    memory higher, than on the previous run by more than the tolerance.
+
+    Benchmarks which were not on the previous run are ignored.
+
+    :param results: results of the current run
+    :param baseline: results of the previous run
+    :param tolerance: allowed difference, as a fraction of the previous value
+    :return: list with a message for each regression
+    """
+    previous = {}
+    for result in baseline:
+        previous[(result['name'], result['transactions'])] = result
+
+    regressions = []
+    for result in results:
+        key = (result['name'], result['transactions'])
+        if key not in previous:
+            continue
+        old = previous[key]
+
+        if result['records_per_second'] and old['records_per_second'] and \
+                result['records_per_second'] < \
+                old['records_per_second'] * (1 - tolerance):
+            regressions.append(
+                '%s (%d transactions): %.0f records/s, was %.0f' %
+                (key + (result['records_per_second'],
+                        old['records_per_second'])))
+
+        if result['peak_memory'] and old['peak_memory'] and \
+                result['peak_memory'] > old['peak_memory'] * (1 + tolerance):
+            regressions.append(
+                '%s (%d transactions): %d bytes peak memory, was %d' %
+                (key + (result['peak_memory'], old['peak_memory'])))
+
+    return regressions
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import io
+
+from cwr.utils.generator import CWRFileGenerator
+
+"""
+Synthetic CWR files for the benchmarks.
+
+The files contain a single group of NWR transactions, created by the
+CWRFileGenerator with a fixed seed, so all the runs use the same files.
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _generator():
+    return CWRFileGenerator(transaction_mix={'NWR': 1}, seed=1,
+                            creation_date_time=datetime.datetime(2013, 8, 9))
+
+
+# File name for the synthetic files
+FILENAME = _generator().filename()
+
+# Records on each transaction
+TRANSACTION_RECORDS = len(next(_generator().transactions('NWR', 1)))
+
+
+def record_count(transactions):
+    """
+    Returns the number of records on a synthetic file.
+
+    This includes the transmission and group header and trailer.
+
+    :param transactions: number of transactions on the file
+    :return: the number of records on the file
+    """
+    return transactions * TRANSACTION_RECORDS + 4
+
+
+def synthetic_contents(transactions):
+    """
+    Creates the contents of a synthetic file.
+
+    :param transactions: number of transactions on the file
+    :return: the file contents
+    """
+    output = io.StringIO()
+    _generator().write(output, transactions)
+    return output.getvalue()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from cwr.parser.decoder.file import default_file_decoder
+from tests.benchmark.suite import BENCHMARKS, find_regressions
+from tests.benchmark.synthetic import FILENAME, record_count, \
+    synthetic_contents
+
+"""
+Benchmarks suite tests.
+
+The following cases are tested:
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestSyntheticFile(unittest.TestCase):
+    def test_valid(self):
+        data = {'filename': FILENAME, 'contents': synthetic_contents(3)}
+
+        transmission = default_file_decoder('layout').decode(data).transmission
+
+        self.assertEqual(3, len(transmission.groups[0].transactions))
+        self.assertEqual(2, transmission.groups[0].transactions[2][0]
+                         .transaction_sequence_n)
+        self.assertEqual(record_count(3), transmission.trailer.record_count)
+        self.assertEqual(record_count(3),
+                         len(synthetic_contents(3).splitlines()))
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_run(self):
+        for benchmark in BENCHMARKS.values():
+            result = benchmark.run(2)
+
+            self.assertEqual(benchmark.name, result['name'])
+            self.assertEqual(record_count(2), result['records'])
+            self.assertTrue(result['records_per_second'] > 0)
+
+
+class TestFindRegressions(unittest.TestCase):
+    def setUp(self):
+        self._baseline = [{'name': 'encode', 'transactions': 10,
+                           'records_per_second': 1000,
+                           'peak_memory': 1000}]
+
+    def _result(self, records_per_second, peak_memory):
+        return [{'name': 'encode', 'transactions': 10,
+                 'records_per_second': records_per_second,
+                 'peak_memory': peak_memory}]
+
+    def test_within_tolerance(self):
+        self.assertEqual([], find_regressions(self._result(900, 1100),
+                                              self._baseline))
+
+    def test_slower(self):
+        self.assertEqual(1, len(find_regressions(self._result(700, 1000),
+                                                 self._baseline)))
+
+    def test_more_memory(self):
+        self.assertEqual(1, len(find_regressions(self._result(1000, 1500),
+                                                 self._baseline)))
+
+    def test_not_in_baseline(self):
+        result = self._result(1, 1000000)
+        result[0]['transactions'] = 100
+
+        self.assertEqual([], find_regressions(result, self._baseline))
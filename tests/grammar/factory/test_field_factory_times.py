@@ -30,14 +30,14 @@ class TestFieldRuleFactory(unittest.TestCase):
         self._factory = _factory()
 
     def test_10000(self):
-        start = time.clock()
+        start = time.perf_counter()
         if sys.version_info[0] == 2:
             for x in range(10000):
                 self._factory.get_rule('test_field')
         else:
             for x in range(10000):
                 self._factory.get_rule('test_field')
-        end = time.clock()
+        end = time.perf_counter()
 
         time_parse = (end - start)
 
@@ -58,6 +58,47 @@ class TestLookupValid(unittest.TestCase):
         result = self.lookup.parseString('CD2')
         self.assertEqual('CD2', result[0])
 
+    def test_longest(self):
+        """
+        Tests that the longest value is accepted when several values begin the
+        same way
+        """
+        field = basic.lookup(['0', '00', '000'])
+
+        result = field.parseString('000')
+        self.assertEqual('000', result[0])
+
+    def test_string_values(self):
+        """
+        Tests that the values can be received as a string, separated by spaces
+        """
+        field = basic.lookup('HDR TRL')
+
+        result = field.parseString('TRL')
+        self.assertEqual('TRL', result[0])
+
+
+class TestLookupTable(unittest.TestCase):
+    """
+    Tests the tables used by the lookup fields.
+    """
+
+    def test_sizes(self):
+        """
+        Tests that the values are grouped by their size, longest first
+        """
+        table = basic.lookup_table(['A', 'BC', 'DE', '', 'F'])
+
+        self.assertEqual(((2, frozenset(['BC', 'DE'])),
+                          (1, frozenset(['A', 'F']))), table)
+
+    def test_shared(self):
+        """
+        Tests that fields with the same values share the same table
+        """
+        self.assertTrue(basic.lookup_table(['AB1', 'CD2']) is
+                        basic.lookup_table(['AB1', 'CD2']))
+
 
 class TestLookupExceptionCompulsory(unittest.TestCase):
     def setUp(self):
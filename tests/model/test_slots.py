@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+import pickle
+import unittest
+
+from cwr.agreement import AgreementRecord
+from cwr.group import GroupHeader
+from cwr.interested_party import PublisherRecord, Publisher
+from cwr.other import ISWCCode, VISAN
+from cwr.work import WorkRecord
+
+"""
+Tests for the slots on the model classes.
+
+The following cases are tested:
+- The model instances have no attributes dictionary
+- The properties can still be read and set
+- The model instances can be pickled
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestModelSlots(unittest.TestCase):
+    def test_no_dict(self):
+        instances = [AgreementRecord(), GroupHeader(), PublisherRecord(),
+                     Publisher(), ISWCCode(123, 1), VISAN(1, 2, 3, 4),
+                     WorkRecord()]
+
+        for instance in instances:
+            self.assertFalse(hasattr(instance, '__dict__'),
+                             type(instance).__name__)
+
+    def test_no_new_attributes(self):
+        record = WorkRecord()
+
+        self.assertRaises(AttributeError, setattr, record, 'unknown', 1)
+
+    def test_properties(self):
+        record = WorkRecord(record_type='NWR', title='TITLE',
+                            iswc=ISWCCode(123, 1))
+
+        record.transaction_sequence_n = 3
+        record.title = 'OTHER'
+
+        self.assertEqual('NWR', record.record_type)
+        self.assertEqual(3, record.transaction_sequence_n)
+        self.assertEqual('OTHER', record.title)
+        self.assertEqual('ISWC T-000.000.123-1', str(record.iswc))
+
+    def test_pickle(self):
+        record = PublisherRecord(record_type='SPU',
+                                 publisher=Publisher('A12', 'NAME'),
+                                 publisher_sequence_n=2)
+
+        result = pickle.loads(pickle.dumps(record))
+
+        self.assertEqual('SPU', result.record_type)
+        self.assertEqual(2, result.publisher_sequence_n)
+        self.assertEqual('A12', result.publisher.ip_n)
+        self.assertEqual('NAME', result.publisher.publisher_name)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import io
+import unittest
+
+from cwr.interested_party import Publisher, PublisherRecord
+from cwr.parser.decoder.file import default_file_decoder
+from cwr.parser.encoder.columnar import ColumnarEncoder, DictionaryColumn, \
+    NumericColumn, ObjectColumn
+from cwr.utils.generator import CWRFileGenerator
+
+"""
+Columnar encoding tests.
+
+The following cases are tested:
+- Numeric columns store the missing values apart from the values
+- Dictionary columns store each distinct value once
+- Each record type is encoded into its own table
+- The columns types come from the field configuration
+- Fields missing on a record are missing on its table row
+- Values can be summed by the values of another column
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _publisher(transaction_sequence_n, pr_society, pr_ownership_share,
+               publisher=None):
+    return PublisherRecord(record_type='SPU',
+                           transaction_sequence_n=transaction_sequence_n,
+                           publisher=publisher,
+                           pr_society=pr_society,
+                           pr_ownership_share=pr_ownership_share)
+
+
+class TestColumns(unittest.TestCase):
+    def test_numeric(self):
+        column = NumericColumn('share')
+
+        column.append(10.5)
+        column.append(None)
+        column.append(20)
+
+        self.assertEqual(3, len(column))
+        self.assertEqual([10.5, None, 20], column.to_list())
+        self.assertEqual([10.5, 0, 20], list(column.values))
+        self.assertEqual([1, 0, 1], list(column.mask))
+        self.assertEqual(30.5, column.sum())
+
+    def test_dictionary(self):
+        column = DictionaryColumn('society')
+
+        for value in (10, 52, None, 10, 10):
+            column.append(value)
+
+        self.assertEqual([10, 52], column.dictionary)
+        self.assertEqual([0, 1, -1, 0, 0], list(column.indexes))
+        self.assertEqual([10, 52, None, 10, 10], column.to_list())
+
+    def test_object(self):
+        column = ObjectColumn('title')
+
+        column.append('TITLE')
+        column.append(None)
+
+        self.assertEqual(['TITLE', None], column.to_list())
+
+
+class TestColumnarEncoder(unittest.TestCase):
+    def setUp(self):
+        self._encoder = ColumnarEncoder()
+
+    def test_records(self):
+        tables = self._encoder.encode([_publisher(0, 10, 50),
+                                       _publisher(0, 52, 50),
+                                       _publisher(1, 10, 100)])
+
+        table = tables['SPU']
+
+        self.assertEqual(['SPU'], list(tables.keys()))
+        self.assertEqual(3, len(table))
+        self.assertTrue(isinstance(table['pr_ownership_share'],
+                                   NumericColumn))
+        self.assertTrue(isinstance(table['pr_society'], DictionaryColumn))
+        self.assertEqual([10, 52], table['pr_society'].dictionary)
+        self.assertEqual([0, 0, 1],
+                         table['transaction_sequence_n'].to_list())
+
+    def test_missing_fields(self):
+        tables = self._encoder.encode(
+            [_publisher(0, 10, 50),
+             _publisher(0, 52, 50, Publisher('A1', 'NAME'))])
+
+        table = tables['SPU']
+
+        self.assertEqual([None, 'NAME'], table['publisher_name'].to_list())
+
+    def test_sum_by(self):
+        tables = self._encoder.encode([_publisher(0, 10, 50),
+                                       _publisher(0, 52, 25),
+                                       _publisher(1, 10, 100)])
+
+        table = tables['SPU']
+
+        self.assertEqual({0: 75, 1: 100},
+                         table.sum_by('transaction_sequence_n',
+                                      'pr_ownership_share'))
+        self.assertEqual({10: 150, 52: 25},
+                         table.sum_by('pr_society', 'pr_ownership_share'))
+
+    def test_file(self):
+        generator = CWRFileGenerator(
+            transaction_mix={'NWR': 1}, parties=2, seed=1,
+            creation_date_time=datetime.datetime(2016, 1, 2))
+        output = io.StringIO()
+        generator.write(output, 5)
+
+        cwr_file = default_file_decoder('layout').decode(
+            {'filename': generator.filename(),
+             'contents': output.getvalue()})
+
+        tables = self._encoder.encode(cwr_file)
+
+        self.assertEqual(1, len(tables['HDR']))
+        self.assertEqual(5, len(tables['NWR']))
+        self.assertEqual(10, len(tables['SWR']))
+        self.assertEqual(1, len(tables['TRL']))
+
+        publishers = tables['SPU'].sum_by('transaction_sequence_n',
+                                          'pr_ownership_share')
+        writers = tables['SWR'].sum_by('transaction_sequence_n',
+                                       'pr_ownership_share')
+        for transaction in range(5):
+            self.assertAlmostEqual(
+                100, publishers[transaction] + writers[transaction])
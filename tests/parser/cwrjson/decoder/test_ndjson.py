@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import io
+import unittest
+
+from cwr.parser.decoder.cwrjson import NDJSONDecoder
+from cwr.parser.decoder.file import default_file_decoder
+from cwr.parser.encoder.cwrjson import NDJSONEncoder
+from cwr.transmission import TransmissionHeader, TransmissionTrailer
+from cwr.utils.generator import CWRFileGenerator
+
+"""
+NDJSON decoding tests.
+
+The following cases are tested:
+- The lines are parsed into the transmission parts, in order
+- Decoding and encoding again returns the same lines
+- Only the transactions can be read
+- The lines can be parsed into a whole file
+- Lines which are not transmission parts raise an exception
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestNDJSONDecoder(unittest.TestCase):
+    def setUp(self):
+        generator = CWRFileGenerator(
+            transaction_mix={'AGR': 1, 'NWR': 1}, seed=1,
+            creation_date_time=datetime.datetime(2016, 1, 2))
+
+        output = io.StringIO()
+        generator.write(output, 4)
+
+        self._cwr_file = default_file_decoder('layout').decode(
+            {'filename': generator.filename(), 'contents': output.getvalue()})
+        self._lines = NDJSONEncoder().encode(self._cwr_file)
+        self._decoder = NDJSONDecoder()
+
+    def test_parts(self):
+        parts = list(self._decoder.decode(io.StringIO(self._lines)))
+
+        self.assertEqual(10, len(parts))
+        self.assertTrue(isinstance(parts[0], TransmissionHeader))
+        self.assertTrue(isinstance(parts[-1], TransmissionTrailer))
+        self.assertEqual('GRH', parts[1].record_type)
+        self.assertEqual(
+            [record.record_type for record in
+             self._cwr_file.transmission.groups[0].transactions[0]],
+            [record.record_type for record in parts[2]])
+
+    def test_round_trip(self):
+        output = io.StringIO()
+        NDJSONEncoder().write(output, self._decoder.decode(self._lines),
+                              self._decoder.decode_tag(
+                                  self._lines.splitlines()[0]))
+
+        self.assertEqual(self._lines, output.getvalue())
+
+    def test_transactions(self):
+        transactions = list(self._decoder.transactions(self._lines))
+
+        self.assertEqual(4, len(transactions))
+        self.assertEqual(['AGR', 'AGR', 'NWR', 'NWR'],
+                         [transaction[0].record_type
+                          for transaction in transactions])
+
+    def test_file(self):
+        decoded = self._decoder.decode_file(self._lines)
+        expected = self._cwr_file.transmission
+
+        self.assertEqual(2016, decoded.tag.year)
+        self.assertEqual([len(group.transactions) for group in expected.groups],
+                         [len(group.transactions)
+                          for group in decoded.transmission.groups])
+        self.assertEqual(expected.groups[1].transactions[0][0].title,
+                         decoded.transmission.groups[1].transactions[0][0].title)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, self._decoder.decode_line, '{"a": 1}')
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from cwr.parser.decoder.file import default_file_decoder, \
+    default_stream_decoder
+from cwr.parser.encoder.cwrjson import JSONEncoder, NDJSONEncoder
+from cwr.utils.generator import CWRFileGenerator
+
+"""
+NDJSON encoding tests.
+
+The following cases are tested:
+- Each part of the transmission is a line, in the order of the file
+- The lines contain the same values as the JSONEncoder output
+- The parts from a streaming decoder can be written as they are read
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestNDJSONEncoder(unittest.TestCase):
+    def setUp(self):
+        generator = CWRFileGenerator(
+            transaction_mix={'AGR': 1, 'NWR': 1}, seed=1,
+            creation_date_time=datetime.datetime(2016, 1, 2))
+
+        self._directory = tempfile.mkdtemp()
+        self._path = os.path.join(self._directory, generator.filename())
+        generator.write_file(self._path, 4)
+
+        self._cwr_file = default_file_decoder('layout').decode_file(
+            self._path)
+        self._encoder = NDJSONEncoder()
+
+    def tearDown(self):
+        os.remove(self._path)
+        os.rmdir(self._directory)
+
+    def test_lines(self):
+        lines = [json.loads(line)
+                 for line in self._encoder.encode(self._cwr_file).splitlines()]
+
+        self.assertEqual(['header', 'group_header', 'transaction',
+                          'transaction', 'group_trailer', 'group_header',
+                          'transaction', 'transaction', 'group_trailer',
+                          'trailer'],
+                         [[key for key in line if key != 'tag'][0]
+                          for line in lines])
+        self.assertEqual(2016, lines[0]['tag']['year'])
+        self.assertEqual('HDR', lines[0]['header']['record_type'])
+
+    def test_same_as_json(self):
+        expected = json.loads(JSONEncoder().encode(self._cwr_file))
+        lines = [json.loads(line)
+                 for line in self._encoder.encode(self._cwr_file).splitlines()]
+
+        self.assertEqual(expected['tag'], lines[0]['tag'])
+        self.assertEqual(expected['transmission']['header'],
+                         lines[0]['header'])
+        self.assertEqual(expected['transmission']['trailer'],
+                         lines[-1]['trailer'])
+
+        group = expected['transmission']['groups'][0]
+        self.assertEqual(group['group_header'], lines[1]['group_header'])
+        self.assertEqual(group['transactions'],
+                         [lines[2]['transaction'], lines[3]['transaction']])
+
+    def test_write_stream(self):
+        output = io.StringIO()
+
+        with open(self._path, encoding='latin-1') as f:
+            count = self._encoder.write(
+                output, default_stream_decoder('layout').decode(f),
+                self._cwr_file.tag)
+
+        self.assertEqual(10, count)
+        self.assertEqual(self._encoder.encode(self._cwr_file),
+                         output.getvalue())
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from cwr.parser.decoder.cache import CACHE_DIR_VARIABLE, ConfigurationCache, \
+    default_cache, user_cache_dir
+from cwr.parser.decoder.file import default_configs
+
+"""
+Decoders configuration cache tests.
+
+The following cases are tested:
+- Values are stored, and created again when the sources change
+- Unreadable files are replaced
+- The shared cache is kept while the folder does not change
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestConfigurationCache(unittest.TestCase):
+    def setUp(self):
+        self._path = tempfile.mkdtemp()
+        self._sources = tempfile.mkdtemp()
+
+        with open(os.path.join(self._sources, 'config.yml'), 'w') as f:
+            f.write('value: 1')
+
+        self._cache = ConfigurationCache(self._path, [self._sources])
+        self._calls = 0
+
+    def tearDown(self):
+        shutil.rmtree(self._path)
+        shutil.rmtree(self._sources)
+
+    def _builder(self):
+        self._calls += 1
+        return {'value': self._calls}
+
+    def test_stored(self):
+        self.assertEqual({'value': 1}, self._cache.load('id', self._builder))
+
+        cache = ConfigurationCache(self._path, [self._sources])
+
+        self.assertEqual({'value': 1}, cache.load('id', self._builder))
+        self.assertEqual(1, self._calls)
+
+    def test_sources_changed(self):
+        self._cache.load('id', self._builder)
+
+        with open(os.path.join(self._sources, 'config.yml'), 'w') as f:
+            f.write('value: 2')
+
+        cache = ConfigurationCache(self._path, [self._sources])
+
+        self.assertNotEqual(self._cache.key, cache.key)
+        self.assertEqual({'value': 2}, cache.load('id', self._builder))
+
+    def test_corrupt_file(self):
+        self._cache.load('id', self._builder)
+
+        for name in os.listdir(self._path):
+            with open(os.path.join(self._path, name), 'wb') as f:
+                f.write(b'not a pickle')
+
+        self.assertEqual({'value': 2}, self._cache.load('id', self._builder))
+
+    def test_incompatible_file(self):
+        self._cache.load('id', self._builder)
+
+        for name in os.listdir(self._path):
+            with open(os.path.join(self._path, name), 'wb') as f:
+                # Pickle protocol which does not exist
+                f.write(b'\x80\x7f')
+
+        self.assertEqual({'value': 2}, self._cache.load('id', self._builder))
+
+    def test_default_configs(self):
+        cache = ConfigurationCache(self._path)
+
+        configs = default_configs(cache)
+
+        self.assertTrue('work' in configs['records'])
+        self.assertTrue('work_transaction' in configs['transactions'])
+        self.assertTrue('values' in configs['fields']['language_code'])
+
+        cached = default_configs(cache)
+
+        self.assertEqual(['NWR', 'REV', 'ISW'],
+                         list(cached['records']['work'].head))
+        self.assertEqual(configs['fields'], cached['fields'])
+
+
+class TestUserCacheDir(unittest.TestCase):
+    def setUp(self):
+        self._previous = os.environ.get(CACHE_DIR_VARIABLE)
+
+    def tearDown(self):
+        if self._previous is None:
+            os.environ.pop(CACHE_DIR_VARIABLE, None)
+        else:
+            os.environ[CACHE_DIR_VARIABLE] = self._previous
+
+    def test_variable(self):
+        os.environ[CACHE_DIR_VARIABLE] = 'cache_folder'
+
+        self.assertEqual('cache_folder', user_cache_dir())
+
+    def test_disabled(self):
+        os.environ[CACHE_DIR_VARIABLE] = ''
+
+        self.assertEqual(None, user_cache_dir())
+        self.assertEqual(None, ConfigurationCache().path)
+
+    def test_default_cache(self):
+        os.environ[CACHE_DIR_VARIABLE] = 'cache_folder'
+
+        cache = default_cache()
+
+        self.assertEqual('cache_folder', cache.path)
+        self.assertTrue(cache is default_cache())
+
+        os.environ[CACHE_DIR_VARIABLE] = 'other_folder'
+
+        self.assertEqual('other_folder', default_cache().path)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+import io
+import unittest
+
+from pyparsing import ParseException
+
+from cwr.parser.decoder.file import default_file_decoder, \
+    default_stream_decoder, default_transaction_structures
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+CWR record dispatch and transaction structure tests.
+
+The following cases are tested:
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestTransactionStructure(unittest.TestCase):
+    def setUp(self):
+        self._structures = default_transaction_structures()
+
+    def test_transaction_types(self):
+        self.assertEqual('agreement_transaction',
+                         self._structures['AGR'].rule_id)
+        self.assertEqual('work_transaction', self._structures['NWR'].rule_id)
+        self.assertEqual('work_transaction', self._structures['REV'].rule_id)
+        self.assertEqual('acknowledgement_transaction',
+                         self._structures['ACK'].rule_id)
+
+    def test_agreement_valid(self):
+        self._structures['AGR'].validate(['AGR', 'TER', 'TER', 'IPA', 'NPA',
+                                          'IPA', 'TER', 'IPA', 'IPA'])
+
+    def test_work_valid(self):
+        self._structures['NWR'].validate(['NWR', 'SPU', 'NPN', 'SPT', 'SPT',
+                                          'SPU', 'OPU', 'SWR', 'SWT', 'PWR',
+                                          'OWR', 'ALT', 'ALT', 'EWT', 'VER',
+                                          'PER', 'REC', 'ORN', 'INS', 'IND',
+                                          'COM', 'ARI', 'XRF'])
+
+    def test_acknowledgement_valid(self):
+        self._structures['ACK'].validate(['ACK', 'MSG', 'MSG', 'AGR'])
+        self._structures['ACK'].validate(['ACK', 'NWR', 'SPU', 'SWR'])
+
+    def test_agreement_missing_ipa(self):
+        self.assertRaises(ParseException, self._structures['AGR'].validate,
+                          ['AGR', 'TER', 'IPA'])
+
+    def test_work_wrong_order(self):
+        self.assertRaises(ParseException, self._structures['NWR'].validate,
+                          ['NWR', 'PER', 'SPU'])
+
+    def test_work_repeated_optional(self):
+        self.assertRaises(ParseException, self._structures['NWR'].validate,
+                          ['NWR', 'EWT', 'EWT'])
+
+
+class TestDispatchFileDecode(unittest.TestCase):
+    def setUp(self):
+        self._parser = default_file_decoder(mode='dispatch')
+
+    def test_two_groups(self):
+        data = {'filename': 'CW12012311_22.V21', 'contents': _two_groups()}
+
+        result = self._parser.decode(data).transmission
+
+        self.assertEqual(2, len(result.groups))
+
+        transactions = result.groups[1].transactions
+
+        self.assertEqual(2, len(transactions))
+        self.assertEqual(10, len(transactions[0]))
+        self.assertEqual('NWR', transactions[0][0].record_type)
+        self.assertEqual('REC', transactions[0][9].record_type)
+
+    def test_wrong_order(self):
+        contents = _two_groups().replace(
+            'TER0000000000000000I2136\nIPA', 'IPA', 1)
+        data = {'filename': 'CW12012311_22.V21', 'contents': contents}
+
+        self.assertRaises(ParseException, self._parser.decode, data)
+
+
+class TestStreamStructure(unittest.TestCase):
+    def setUp(self):
+        self._parser = default_stream_decoder('layout')
+
+    def test_incomplete_transaction(self):
+        lines = [line for line in _two_groups().splitlines()
+                 if not line.startswith('IPA0000000000000002')]
+
+        self.assertRaises(ParseException, list, self._parser.decode(lines))
+
+    def test_error_on_record(self):
+        lines = _two_groups().splitlines()
+        lines.insert(3, lines[5])
+
+        result = self._parser.decode(io.StringIO('\n'.join(lines)))
+
+        self.assertEqual('HDR', next(result).record_type)
+        self.assertEqual('GRH', next(result).record_type)
+        self.assertRaises(ParseException, next, result)
@@ -8,6 +8,10 @@ from cwr.parser.decoder.file import default_filename_decoder
 CWR file name encoder tests.
 
 The following cases are tested:
+- Filenames following the old and the new conventions are parsed
+- Invalid filenames return an empty FileTag
+- The regular expression and the grammar create the same FileTag
+- Several filenames are parsed at once
 """
 
 __author__ = 'Bernardo Martínez Garrido'
@@ -50,3 +54,36 @@ class TestFileNameCWRDecodeInvalid(unittest.TestCase):
         self.assertEqual('', result.sender)
         self.assertEqual('', result.receiver)
         self.assertEqual('', result.version)
+
+
+class TestFileNameCWRDecodeModes(unittest.TestCase):
+    def setUp(self):
+        self._regex = default_filename_decoder('regex')
+        self._grammar = default_filename_decoder('grammar')
+
+    @staticmethod
+    def _values(tag):
+        return (tag.year, tag.sequence_n, tag.sender, tag.receiver,
+                tag.version)
+
+    def test_same_as_grammar(self):
+        names = ['CW12012311_22.V21', 'CW122311_22.V21', 'CW1201231_22.V21',
+                 'CW12012311A_22.zip', 'CW12012311_22.V21.txt',
+                 'CW12012311_22', 'CW120123ABCD_22.V21', 'cw12012311_22.V21',
+                 'CW12012311_22.ZIP', ' CW12012311_22.V21']
+
+        for name in names:
+            self.assertEqual(self._values(self._grammar.decode(name)),
+                             self._values(self._regex.decode(name)))
+
+    def test_decode_many(self):
+        result = self._regex.decode_many(['CW12012311_22.V21',
+                                          'CW122311_22.zip', 'invalid'])
+
+        self.assertEqual([(2012, 123, '11', '22', 2.1),
+                          (2012, 23, '11', '22', 2.2),
+                          (0, 0, '', '', '')],
+                         [self._values(tag) for tag in result])
+
+    def test_invalid_mode(self):
+        self.assertRaises(ValueError, default_filename_decoder, 'other')
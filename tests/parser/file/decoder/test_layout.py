@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import unittest
+
+from pyparsing import ParseException
+
+from cwr.group import GroupHeader
+from cwr.transmission import TransmissionHeader, TransmissionTrailer
+from cwr.parser.decoder.file import default_file_decoder, \
+    default_record_decoder
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+CWR record layouts decoder tests.
+
+The following cases are tested:
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestLayoutRecordDecodeValid(unittest.TestCase):
+    def setUp(self):
+        self._parser = default_record_decoder('layout')
+        self._grammar = default_record_decoder()
+
+    def test_same_as_grammar(self):
+        lines = _two_groups().splitlines()
+        lines.append(
+            'PER0000019900000709A NAME                            A FIRST NAME'
+            '                             00014107338I-000000229-7')
+        lines.append('GRT000010000017900000719')
+
+        for line in lines:
+            self.assertEqual(_values(self._grammar.decode(line)),
+                             _values(self._parser.decode(line)))
+
+    def test_header(self):
+        line = 'HDRPB226144593AGENCIA GRUPO MUSICAL                        ' \
+               '01.102013080902591120130809               '
+
+        result = self._parser.decode(line)
+
+        self.assertTrue(isinstance(result, TransmissionHeader))
+        self.assertEqual(226144593, result.sender_id)
+        self.assertEqual('AGENCIA GRUPO MUSICAL', result.sender_name)
+        self.assertEqual(datetime.datetime(2013, 8, 9, 2, 59, 11),
+                         result.creation_date_time)
+        self.assertEqual(datetime.date(2013, 8, 9), result.transmission_date)
+
+    def test_group_trailer_short(self):
+        result = self._parser.decode('GRT000010000017900000719')
+
+        self.assertEqual(1, result.group_id)
+        self.assertEqual(179, result.transaction_count)
+        self.assertEqual(719, result.record_count)
+        self.assertEqual(None, result.currency_indicator)
+
+    def test_work_shares(self):
+        line = 'SWR00000199000007061185684  A NAME                           ' \
+               '            YET ANOTHER NAME               C          00260583' \
+               '07861 0500061 0000061 00000    0000260582865             '
+
+        result = self._parser.decode(line)
+
+        self.assertEqual('A NAME', result.writer.writer_last_name)
+        self.assertEqual(50, result.pr_ownership_share)
+        self.assertEqual(0, result.mr_ownership_share)
+        self.assertEqual(61, result.pr_society)
+
+
+class TestLayoutRecordDecodeInvalid(unittest.TestCase):
+    def setUp(self):
+        self._parser = default_record_decoder('layout')
+
+    def test_unknown_record(self):
+        self.assertRaises(ParseException, self._parser.decode,
+                          'XYZ0000000000000000I2136')
+
+    def test_invalid_date(self):
+        self.assertRaises(ParseException, self._parser.decode,
+                          'ACK0000123400000023201213021020300123401234567AGR' +
+                          (' ' * 100) + '20130203AS')
+
+    def test_trailing_text(self):
+        self.assertRaises(ParseException, self._parser.decode,
+                          'TER0000000000000000I2136ABC')
+
+    def test_too_short(self):
+        self.assertRaises(ParseException, self._parser.decode,
+                          'TER0000000000000000I')
+
+
+class TestLayoutFileDecode(unittest.TestCase):
+    def setUp(self):
+        self._parser = default_file_decoder(mode='layout')
+
+    def test_two_groups(self):
+        data = {'filename': 'CW12012311_22.V21', 'contents': _two_groups()}
+
+        result = self._parser.decode(data).transmission
+
+        self.assertTrue(isinstance(result.header, TransmissionHeader))
+        self.assertTrue(isinstance(result.trailer, TransmissionTrailer))
+
+        self.assertEqual(2, len(result.groups))
+
+        group = result.groups[0]
+
+        self.assertTrue(isinstance(group.group_header, GroupHeader))
+        self.assertEqual('AGR', group.group_header.transaction_type)
+        self.assertEqual(2, len(group.transactions))
+        self.assertEqual(4, len(group.transactions[0]))
+
+        group = result.groups[1]
+
+        self.assertEqual('NWR', group.group_header.transaction_type)
+        self.assertEqual(2, len(group.transactions))
+        self.assertEqual(10, len(group.transactions[1]))
+
+    def test_empty_contents(self):
+        data = {'filename': 'CW12012311_22.V21', 'contents': ''}
+
+        self.assertRaises(ParseException, self._parser.decode, data)
+
+    def test_missing_trailer(self):
+        contents = _two_groups().rsplit('\n', 1)[0]
+        data = {'filename': 'CW12012311_22.V21', 'contents': contents}
+
+        self.assertRaises(ParseException, self._parser.decode, data)
+
+    def test_unknown_mode(self):
+        self.assertRaises(ValueError, default_file_decoder, 'other')
+
+
+def _attributes(instance):
+    """
+    Returns the attributes of a model instance, which are kept on its slots.
+    """
+    return {name: getattr(instance, name)
+            for cls in type(instance).__mro__
+            for name in getattr(cls, '__slots__', ())
+            if hasattr(instance, name)}
+
+
+def _values(record):
+    """
+    Returns the values of a record, taking them out of the Pyparsing results
+    when the grammar wraps them.
+    """
+    values = {}
+    for key, value in _attributes(record).items():
+        if hasattr(value, 'asList') and len(value) == 1:
+            value = value[0]
+        if hasattr(type(value), '__slots__'):
+            value = _attributes(value)
+        values[key] = value
+
+    return values
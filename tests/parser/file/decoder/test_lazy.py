@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import os
+import tempfile
+import unittest
+
+from pyparsing import ParseException
+
+from cwr.parser.decoder.file import default_file_decoder, \
+    default_lazy_file_decoder
+from cwr.utils.generator import CWRFileGenerator
+
+"""
+Lazy file decoder tests.
+
+The following cases are tested:
+- The groups and transactions are indexed
+- The transactions are parsed as the eager decoder does
+- Negative indexes and slices can be used
+- Parsed transactions are kept in a cache of limited size
+- Invalid files raise an exception
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestLazyFileDecoder(unittest.TestCase):
+    def setUp(self):
+        generator = CWRFileGenerator(
+            transaction_mix={'AGR': 1, 'NWR': 2}, seed=1,
+            creation_date_time=datetime.datetime(2016, 1, 2))
+
+        self._directory = tempfile.mkdtemp()
+        self._path = os.path.join(self._directory, generator.filename())
+        generator.write_file(self._path, 12)
+
+    def tearDown(self):
+        os.remove(self._path)
+        os.rmdir(self._directory)
+
+    def test_index(self):
+        with default_lazy_file_decoder().decode(self._path) as cwr_file:
+            transmission = cwr_file.transmission
+
+            self.assertEqual(2016, cwr_file.tag.year)
+            self.assertEqual('HDR', transmission.header.record_type)
+            self.assertEqual('TRL', transmission.trailer.record_type)
+            self.assertEqual(['AGR', 'NWR'],
+                             [group.group_header.transaction_type
+                              for group in transmission.groups])
+            self.assertEqual([4, 8], [len(group.transactions)
+                                      for group in transmission.groups])
+
+    def test_same_as_eager(self):
+        expected = default_file_decoder('layout').decode_file(self._path)
+
+        with default_lazy_file_decoder().decode(self._path) as cwr_file:
+            for group, expected_group in zip(
+                    cwr_file.transmission.groups,
+                    expected.transmission.groups):
+                for transaction, expected_transaction in zip(
+                        group.transactions, expected_group.transactions):
+                    self.assertEqual(
+                        [record.record_type
+                         for record in expected_transaction],
+                        [record.record_type for record in transaction])
+                    self.assertEqual(
+                        expected_transaction[0].transaction_sequence_n,
+                        transaction[0].transaction_sequence_n)
+
+    def test_indexes(self):
+        with default_lazy_file_decoder().decode(self._path) as cwr_file:
+            transactions = cwr_file.transmission.groups[1].transactions
+
+            self.assertEqual(transactions[7][0].title,
+                             transactions[-1][0].title)
+            self.assertEqual(3, len(transactions[2:5]))
+            self.assertRaises(IndexError, transactions.__getitem__, 8)
+
+    def test_cache(self):
+        decoder = default_lazy_file_decoder(cache_size=2)
+
+        with decoder.decode(self._path) as cwr_file:
+            transactions = cwr_file.transmission.groups[1].transactions
+
+            first = transactions[0]
+            second = transactions[1]
+            self.assertTrue(first is transactions[0])
+
+            transactions[2]
+
+            # The second transaction is the least recently used one
+            self.assertTrue(first is transactions[0])
+            self.assertFalse(second is transactions[1])
+
+    def test_invalid(self):
+        with open(self._path, 'w') as f:
+            f.write('NWR0000000000000000\n')
+
+        self.assertRaises(ParseException,
+                          default_lazy_file_decoder().decode, self._path)
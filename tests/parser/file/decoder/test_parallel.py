@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from unittest import mock
+
+from pyparsing import ParseException
+
+from cwr.parser.decoder.file import default_file_decoder, \
+    ParallelFileDecoder, StreamTransmissionDecoder
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+CWR parallel file decoder tests.
+
+The following cases are tested:
+- Files are parsed into the same transmission as with the stream decoder
+- Records on a wrong order are rejected
+- Small files, and all the files with a single processor, are parsed
+  without the pool
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestParallelFileDecode(unittest.TestCase):
+    def setUp(self):
+        # Small chunks, so the file is split at every boundary, and the pool
+        # is used even if there is a single processor
+        self._parser = StreamTransmissionDecoder(
+            ParallelFileDecoder('layout', 2, chunk_size=1, min_lines=0))
+
+        patcher = mock.patch('os.cpu_count', return_value=2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_two_groups(self):
+        result = self._parser.decode(_two_groups())
+
+        self.assertEqual('HDR', result.header.record_type)
+        self.assertEqual('TRL', result.trailer.record_type)
+
+        self.assertEqual(2, len(result.groups))
+
+        transactions = result.groups[0].transactions
+
+        self.assertEqual(2, len(transactions))
+        self.assertEqual(4, len(transactions[0]))
+        self.assertEqual('AGR', transactions[0][0].record_type)
+        self.assertEqual('IPA', transactions[1][3].record_type)
+
+        transactions = result.groups[1].transactions
+
+        self.assertEqual(2, len(transactions))
+        self.assertEqual(10, len(transactions[1]))
+        self.assertEqual('NWR', transactions[1][0].record_type)
+
+    def test_same_as_stream(self):
+        lines = _two_groups().splitlines()
+        lines = lines[:2] + lines[2:6] * 20 + lines[6:]
+
+        stream = default_file_decoder('layout').decode(
+            {'filename': 'CW12012311_22.V21', 'contents': '\n'.join(lines)})
+        stream = stream.transmission
+
+        result = self._parser.decode(lines)
+
+        self.assertEqual(len(stream.groups[0].transactions),
+                         len(result.groups[0].transactions))
+        for expected, transaction in zip(stream.groups[0].transactions,
+                                         result.groups[0].transactions):
+            self.assertEqual([r.record_sequence_n for r in expected],
+                             [r.record_sequence_n for r in transaction])
+
+    def test_wrong_order(self):
+        contents = _two_groups().replace(
+            'TER0000000000000000I2136\nIPA', 'IPA', 1)
+
+        self.assertRaises(ParseException, self._parser.decode, contents)
+
+    def test_serial(self):
+        lines = _two_groups().splitlines()
+        expected = self._parser.decode(lines)
+
+        with mock.patch('cwr.parser.decoder.file.ProcessPoolExecutor',
+                        side_effect=AssertionError('Pool used')):
+            small = StreamTransmissionDecoder(
+                ParallelFileDecoder('layout', 2, chunk_size=1)).decode(lines)
+            with mock.patch('os.cpu_count', return_value=1):
+                single = StreamTransmissionDecoder(
+                    ParallelFileDecoder('layout', 2, chunk_size=1,
+                                        min_lines=0)).decode(lines)
+
+        for result in (small, single):
+            self.assertEqual(len(expected.groups), len(result.groups))
+            for group, other in zip(expected.groups, result.groups):
+                self.assertEqual(
+                    [[r.record_type for r in t] for t in group.transactions],
+                    [[r.record_type for r in t] for t in other.transactions])
+
+    def test_grammar_mode(self):
+        self.assertRaises(ValueError, default_file_decoder, 'grammar', 2)
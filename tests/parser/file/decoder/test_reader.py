@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import io
+import os
+import tempfile
+import unittest
+
+from cwr.parser.decoder.file import default_file_decoder
+from cwr.parser.decoder.reader import MappedFileReader, charset_encoding
+from cwr.utils.generator import CWRFileGenerator
+
+"""
+Memory mapped file reader tests.
+
+The following cases are tested:
+- The CWR character sets are mapped to Python codecs
+- Anything before the header, blank lines and line breaks are skipped
+- Single fields are read from the mapped bytes
+- The encoding is taken from the header character set
+- Files are decoded from their path as when reading them into a string
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+_HEADER = 'HDRPB226144593AGENCIA GRUPO MUSICAL                        ' \
+          '01.102013080902591120130809'
+
+
+def _header(character_set=''):
+    return _HEADER + character_set.rjust(15)
+
+
+class TestCharsetEncoding(unittest.TestCase):
+    def test_default(self):
+        self.assertEqual('latin-1', charset_encoding(''))
+        self.assertEqual('latin-1', charset_encoding('ASCII'))
+
+    def test_tables(self):
+        self.assertEqual('big5', charset_encoding('Big5'))
+        self.assertEqual('gb2312', charset_encoding('GB'))
+
+    def test_unicode(self):
+        self.assertEqual('utf-8', charset_encoding('U+0400'))
+
+    def test_unknown(self):
+        self.assertEqual('latin-1', charset_encoding('UNKNOWN'))
+
+
+class TestMappedFileReader(unittest.TestCase):
+    def setUp(self):
+        handle, self._path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self._path)
+
+    def _write(self, contents):
+        with open(self._path, 'wb') as f:
+            f.write(contents)
+
+        return MappedFileReader(self._path)
+
+    def test_lines(self):
+        contents = _header() + '\r\n\r\nGRHAGR\r\n  \nTRL000'
+
+        with self._write(b'\xef\xbb\xbf' + contents.encode('latin-1')) as \
+                reader:
+            self.assertEqual('latin-1', reader.encoding)
+            self.assertEqual([_header(), 'GRHAGR', 'TRL000'],
+                             list(reader))
+
+    def test_fields(self):
+        contents = _header() + '\nGRHAGR0000102.10'
+
+        with self._write(contents.encode('latin-1')) as reader:
+            offsets = list(reader.offsets())
+
+            self.assertEqual(['HDR', 'GRH'],
+                             [reader.record_type(start)
+                              for start, _ in offsets])
+            self.assertEqual('AGENCIA GRUPO MUSICAL',
+                             reader.field(offsets[0][0], offsets[0][1],
+                                          14, 45))
+            self.assertEqual('02.10',
+                             reader.field(offsets[1][0], offsets[1][1],
+                                          11, 5))
+            self.assertEqual('', reader.field(offsets[1][0], offsets[1][1],
+                                              16, 10))
+
+    def test_header_charset(self):
+        contents = _header('U+0400') + '\nNWRЖЖTITLE'
+
+        with self._write(contents.encode('utf-8')) as reader:
+            offsets = list(reader.offsets())
+
+            self.assertEqual('utf-8', reader.encoding)
+            self.assertEqual('NWRЖЖTITLE', list(reader)[1])
+            self.assertEqual('TITLE', reader.field(offsets[1][0],
+                                                   offsets[1][1], 5, 5))
+
+    def test_empty(self):
+        with self._write(b'') as reader:
+            self.assertEqual([], list(reader))
+
+
+class TestFileDecoderPath(unittest.TestCase):
+    def setUp(self):
+        generator = CWRFileGenerator(
+            transaction_mix={'NWR': 1}, seed=1,
+            creation_date_time=datetime.datetime(2016, 1, 2))
+
+        self._directory = tempfile.mkdtemp()
+        self._path = os.path.join(self._directory, generator.filename())
+        generator.write_file(self._path, 5)
+
+    def tearDown(self):
+        os.remove(self._path)
+        os.rmdir(self._directory)
+
+    def _check(self, mode):
+        decoder = default_file_decoder(mode)
+
+        with io.open(self._path, 'r', encoding='latin-1', newline='') as f:
+            data = {'filename': os.path.basename(self._path),
+                    'contents': f.read()}
+
+        expected = decoder.decode(data)
+        result = decoder.decode_file(self._path)
+
+        self.assertEqual(expected.tag.sequence_n, result.tag.sequence_n)
+        self.assertEqual(len(expected.transmission.groups[0].transactions),
+                         len(result.transmission.groups[0].transactions))
+        self.assertEqual(
+            expected.transmission.groups[0].transactions[4][0].title,
+            result.transmission.groups[0].transactions[4][0].title)
+
+    def test_layout(self):
+        self._check('layout')
+
+    def test_grammar(self):
+        self._check('grammar')
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+import io
+import unittest
+
+from pyparsing import ParseException
+
+from cwr.group import GroupHeader, GroupTrailer
+from cwr.transmission import TransmissionHeader, TransmissionTrailer
+from cwr.parser.decoder.file import default_stream_decoder
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+CWR streaming file decoder tests.
+
+The following cases are tested:
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestStreamFileDecodeValid(unittest.TestCase):
+    def setUp(self):
+        self._parser = default_stream_decoder()
+
+    def test_two_groups(self):
+        result = list(self._parser.decode(io.StringIO(_two_groups())))
+
+        self.assertEqual(10, len(result))
+
+        self.assertTrue(isinstance(result[0], TransmissionHeader))
+        self.assertTrue(isinstance(result[1], GroupHeader))
+        self.assertEqual('AGR', result[1].transaction_type)
+        self.assertTrue(isinstance(result[4], GroupTrailer))
+        self.assertTrue(isinstance(result[5], GroupHeader))
+        self.assertEqual('NWR', result[5].transaction_type)
+        self.assertTrue(isinstance(result[8], GroupTrailer))
+        self.assertTrue(isinstance(result[9], TransmissionTrailer))
+
+        transaction = result[2]
+
+        self.assertEqual(4, len(transaction))
+
+        self.assertEqual('AGR', transaction[0].record_type)
+        self.assertEqual('TER', transaction[1].record_type)
+        self.assertEqual('IPA', transaction[2].record_type)
+        self.assertEqual('IPA', transaction[3].record_type)
+
+        transaction = result[6]
+
+        self.assertEqual(10, len(transaction))
+
+        self.assertEqual('NWR', transaction[0].record_type)
+        self.assertEqual('SPU', transaction[1].record_type)
+        self.assertEqual('REC', transaction[9].record_type)
+
+        self.assertEqual(10, len(result[7]))
+
+    def test_lines_list(self):
+        result = list(self._parser.decode(_two_groups().splitlines()))
+
+        self.assertEqual(10, len(result))
+
+    def test_windows_line_ends(self):
+        data = _two_groups().replace('\n', '\r\n')
+
+        result = list(self._parser.decode(io.StringIO(data, newline='')))
+
+        self.assertEqual(10, len(result))
+        self.assertEqual(10, len(result[6]))
+
+    def test_bom_and_empty_lines(self):
+        data = '\ufeff' + _two_groups() + '\n\n\n'
+
+        result = list(self._parser.decode(io.StringIO(data)))
+
+        self.assertEqual(10, len(result))
+        self.assertTrue(isinstance(result[0], TransmissionHeader))
+        self.assertTrue(isinstance(result[9], TransmissionTrailer))
+
+    def test_lazy(self):
+        lines = _two_groups().splitlines()
+
+        def _lines():
+            for line in lines[:3]:
+                yield line
+            raise AssertionError('The whole file has been read')
+
+        result = self._parser.decode(_lines())
+
+        self.assertTrue(isinstance(next(result), TransmissionHeader))
+        self.assertTrue(isinstance(next(result), GroupHeader))
+
+
+class TestStreamFileDecodeInvalid(unittest.TestCase):
+    def setUp(self):
+        self._parser = default_stream_decoder()
+
+    def test_empty_contents(self):
+        result = list(self._parser.decode(io.StringIO('')))
+
+        self.assertEqual(0, len(result))
+
+    def test_unknown_record(self):
+        data = _two_groups().replace('PER00000199', 'XYZ00000199')
+
+        self.assertRaises(ParseException, list,
+                          self._parser.decode(io.StringIO(data)))
+
+    def test_bad_record(self):
+        data = 'HDR Contents of the file'
+
+        self.assertRaises(ParseException, list,
+                          self._parser.decode(io.StringIO(data)))
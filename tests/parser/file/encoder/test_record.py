@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from cwr.parser.decoder.file import default_record_decoder
+from cwr.parser.encoder.file import default_file_encoder
+from cwr.parser.encoder.standart.record import CwrRecordEncoderException
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+Record encoders factory tests.
+
+The following cases are tested:
+"""
+
+__author__ = 'Yaroslav O. Holub'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestCwrRecordEncoderFactory(unittest.TestCase):
+    def setUp(self):
+        self._factory = default_file_encoder().record_encoder_factory
+        self._decoder = default_record_decoder('layout')
+
+    def test_encoder_reused(self):
+        first = self._decoder.decode('TER0000000000000000I2136')
+        second = self._decoder.decode('TER0000000100000002E0484')
+
+        encoder = self._factory.get_encoder(first)
+
+        self.assertIs(encoder, self._factory.get_encoder(second))
+        self.assertIs(encoder.get_layouts(), encoder.get_layouts())
+
+    def test_layouts_longest_first(self):
+        record = self._decoder.decode('GRT000010000017900000719')
+
+        layouts = self._factory.get_encoder(record).get_layouts()
+
+        lengths = [len(encoders) for _, encoders in layouts]
+        self.assertEqual(sorted(lengths, reverse=True), lengths)
+
+    def test_encode(self):
+        lines = ['HDRPB226144593AGENCIA GRUPO MUSICAL                        01.102013080902591120130809               ',
+                 'TER0000000000000000I2136',
+                 'SPT000001990000070570             050000500005000I0484Y001',
+                 'GRT000010000017900000719   0000000000',
+                 'TRL000020000053200005703']
+
+        for line in lines:
+            record = self._decoder.decode(line)
+            result = self._factory.get_encoder(record).encode(record)
+            self.assertEqual(line.rstrip(), result.rstrip())
+
+    def test_encode_short_trailer(self):
+        record = self._decoder.decode('GRT000010000017900000719')
+        record.currency_indicator = None
+
+        result = self._factory.get_encoder(record).encode(record)
+
+        self.assertTrue(result.startswith('GRT000010000017900000719'))
+
+
+class TestCwrRecordEncoderAccessors(unittest.TestCase):
+    def setUp(self):
+        self._factory = default_file_encoder().record_encoder_factory
+        self._decoder = default_record_decoder('layout')
+
+    def _assert_same_as_dictionary(self, record):
+        encoder = self._factory.get_encoder(record)
+
+        self.assertEqual(encoder.encode_dictionary(record), encoder.encode(record))
+
+    def test_same_as_dictionary(self):
+        lines = _two_groups().splitlines()
+        lines.append('ORN0000123400000023LIBPRODUCTION TITLE                                            IDENTIFIER     1234THE LIBRARY                                                 B1234567812345678901212341ABDFE       EPISODE TITLE                                               ABD12345            2012123ABDEFG         ')
+
+        for line in lines:
+            self._assert_same_as_dictionary(self._decoder.decode(line))
+
+    def test_without_publisher(self):
+        record = self._decoder.decode('SPU0000019900000702014271370  MUSIC SOCIETY                                 E          005101734040102328568410061 0500061 1000061 10000   0000000000000                            OS ')
+        record.publisher = None
+
+        encoder = self._factory.get_encoder(record)
+
+        # The publisher fields are required, on both paths
+        self.assertRaises(CwrRecordEncoderException, encoder.encode_dictionary, record)
+        self.assertRaises(CwrRecordEncoderException, encoder.encode, record)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import io
+import unittest
+
+from cwr.parser.decoder.file import default_stream_decoder, \
+    StreamTransmissionDecoder
+from cwr.parser.encoder.file import default_file_encoder, default_file_writer
+from tests.parser.file.decoder.test_file import _two_groups
+
+"""
+Streaming CWR file writer tests.
+
+The following cases are tested:
+"""
+
+__author__ = 'Yaroslav O. Holub'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestCwrFileWriter(unittest.TestCase):
+    def setUp(self):
+        self._transmission = StreamTransmissionDecoder(
+            default_stream_decoder('layout')).decode(_two_groups())
+
+    def test_write_transmission(self):
+        output = io.StringIO()
+        writer = default_file_writer(output)
+
+        trailer = writer.write_transmission(self._transmission.header,
+                                            self._transmission.groups)
+
+        lines = output.getvalue().split('\r\n')
+
+        self.assertEqual(34, len(lines) - 1)
+        self.assertEqual('', lines[-1])
+
+        self.assertEqual(2, trailer.group_count)
+        self.assertEqual(4, trailer.transaction_count)
+        self.assertEqual(34, trailer.record_count)
+        self.assertTrue(lines[33].startswith('TRL000020000000400000034'))
+
+        # AGR group: GRH, 2 transactions of 4 records, GRT
+        self.assertTrue(lines[10].startswith('GRT000010000000200000010'))
+        # NWR group: GRH, 2 transactions of 10 records, GRT
+        self.assertTrue(lines[32].startswith('GRT000010000000200000022'))
+
+    def test_same_records_as_encoder(self):
+        output = io.StringIO()
+        writer = default_file_writer(output)
+
+        writer.write_transmission(self._transmission.header,
+                                  self._transmission.groups)
+
+        expected = default_file_encoder().encode(self._transmission)
+
+        written = output.getvalue().split('\r\n')
+        expected = expected.split('\r\n')
+
+        # Only the trailers change, as their counts are set by the writer
+        for i in range(len(expected)):
+            if not expected[i].startswith(('GRT', 'TRL')):
+                self.assertEqual(expected[i], written[i])
+
+    def test_binary(self):
+        output = io.BytesIO()
+        writer = default_file_writer(output)
+
+        writer.write_transmission(self._transmission.header,
+                                  self._transmission.groups)
+
+        self.assertTrue(output.getvalue().startswith(b'HDRPB226144593'))
+
+    def test_generators(self):
+        output = io.StringIO()
+        writer = default_file_writer(output, buffer_size=3)
+
+        header = self._transmission.header
+        group = self._transmission.groups[1]
+        transaction = group.transactions[0]
+
+        writer.write_header(header)
+        writer.start_group(group.group_header)
+        for _ in range(5):
+            writer.write_transaction(record for record in transaction)
+        writer.end_group()
+
+        # The buffer is written as it fills
+        self.assertTrue(len(output.getvalue()) > 0)
+
+        trailer = writer.write_trailer()
+
+        self.assertEqual(1, trailer.group_count)
+        self.assertEqual(5, trailer.transaction_count)
+        self.assertEqual(54, trailer.record_count)
+
+    def test_write_parts(self):
+        output = io.StringIO()
+        writer = default_file_writer(output)
+
+        writer.write_parts(
+            default_stream_decoder('layout').decode(_two_groups().splitlines()))
+
+        self.assertEqual(34, writer.record_count)
+        self.assertEqual(34, len(output.getvalue().split('\r\n')) - 1)
+
+    def test_transaction_outside_group(self):
+        writer = default_file_writer(io.StringIO())
+
+        writer.write_header(self._transmission.header)
+
+        self.assertRaises(ValueError, writer.write_transaction,
+                          self._transmission.groups[0].transactions[0])
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+from cwr.parser.decoder.file import default_file_decoder
+from cwr.parser.encoder.file import default_file_writer
+from cwr.utils.diff import ADDED, CHANGED, REMOVED, diff_files, \
+    diff_transmissions
+from cwr.utils.generator import CWRFileGenerator
+
+"""
+Transmission diff tests.
+
+The following cases are tested:
+- Equal files have no differences, even if renumbered
+- Added, removed and changed transactions are found on files
+- Changed transactions receive the fields changed on each record
+- Transmissions are compared the same way as files
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestDiff(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+
+        self._generator = CWRFileGenerator(
+            transaction_mix={'NWR': 1}, seed=1,
+            creation_date_time=datetime.datetime(2016, 1, 2))
+        transactions = list(self._generator.transactions('NWR', 5))
+
+        self._old = self._write('CW160001SYN_000.V21', transactions[:4])
+        self._renumbered = self._write('CW160002SYN_000.V21',
+                                       transactions[:4], renumber=True)
+
+        changed = transactions[2]
+        self._old_title = changed[0].title
+        changed[0].title = 'NEW TITLE'
+        self._removed_record = changed.pop()
+
+        self._new = self._write('CW160003SYN_000.V21',
+                                [transactions[0], changed, transactions[3],
+                                 transactions[4]], renumber=True)
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def _write(self, name, transactions, renumber=False):
+        path = os.path.join(self._directory, name)
+
+        if renumber:
+            for transaction_sequence_n, transaction in enumerate(
+                    transactions):
+                for record in transaction:
+                    record.transaction_sequence_n = transaction_sequence_n
+
+        with open(path, 'wb') as handle:
+            writer = default_file_writer(handle)
+            writer.write_header(self._generator.header())
+            writer.start_group(self._generator.group_header(1, 'NWR'))
+            for transaction in transactions:
+                writer.write_transaction(transaction)
+            writer.end_group()
+            writer.write_trailer()
+
+        return path
+
+    def _decode(self, path):
+        with open(path, 'rb') as handle:
+            data = handle.read().decode('latin-1')
+
+        return default_file_decoder('layout').decode(
+            {'filename': os.path.basename(path), 'contents': data})
+
+    def _check(self, result):
+        self.assertEqual([(CHANGED, ('NWR', '00000000000002')),
+                          (ADDED, ('NWR', '00000000000004')),
+                          (REMOVED, ('NWR', '00000000000001'))],
+                         [(diff.status, diff.key) for diff in result])
+
+        changed, added, removed = result
+        self.assertEqual(None, added.old)
+        self.assertEqual('00000000000004', added.new[0].submitter_work_n)
+        self.assertEqual(None, removed.new)
+        self.assertEqual('00000000000001', removed.old[0].submitter_work_n)
+
+        records = changed.records
+        self.assertEqual(2, len(records))
+        self.assertEqual(CHANGED, records[0].status)
+        self.assertEqual('NWR', records[0].record_type)
+        self.assertEqual({'title': (self._old_title, 'NEW TITLE')},
+                         dict(records[0].fields))
+        self.assertEqual(REMOVED, records[1].status)
+        self.assertEqual(self._removed_record.record_type,
+                         records[1].record_type)
+
+    def test_equal_files(self):
+        self.assertEqual([], list(diff_files(self._old, self._renumbered)))
+
+    def test_files(self):
+        self._check(list(diff_files(self._old, self._new)))
+
+    def test_transmissions(self):
+        old = self._decode(self._old)
+
+        self.assertEqual([], list(diff_transmissions(
+            old, self._decode(self._renumbered))))
+        self._check(list(diff_transmissions(old, self._decode(self._new))))
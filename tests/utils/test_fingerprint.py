@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from cwr.parser.decoder.file import default_stream_decoder
+from cwr.utils.fingerprint import FingerprintIndex, fingerprint, \
+    normalize_title
+from cwr.utils.generator import CWRFileGenerator
+
+"""
+Work fingerprinting tests.
+
+The following cases are tested:
+- Titles are normalized
+- Works with the same values have the same fingerprint
+- Changing a value changes the digest, but keeps the other keys
+- Transactions which are not works have no fingerprint
+- Duplicated and conflicting works are found on the index
+- Files are read again only when they change
+- A batch of works is matched the same as each work on its own
+- The stream decoder is created once for each index
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _transactions(seed=1, count=3):
+    generator = CWRFileGenerator(transaction_mix={'NWR': 1}, seed=seed)
+    return list(generator.transactions('NWR', count))
+
+
+class TestFingerprint(unittest.TestCase):
+    def test_normalize_title(self):
+        self.assertEqual('CANCION DE AMOR',
+                         normalize_title(' Canción  de   Amor! '))
+        self.assertEqual('', normalize_title(None))
+
+    def test_same(self):
+        self.assertEqual(fingerprint(_transactions()[0]),
+                         fingerprint(_transactions()[0]))
+
+    def test_changed(self):
+        transaction = _transactions()[0]
+        expected = fingerprint(transaction)
+
+        transaction[0].iswc = 'T-034.524.680-1'
+        result = fingerprint(transaction)
+
+        self.assertNotEqual(expected.digest, result.digest)
+        self.assertTrue(('iswc', 'T0345246801') in result.keys)
+        self.assertTrue(set(expected.keys) < set(result.keys))
+
+    def test_title_case(self):
+        transaction = _transactions()[0]
+        expected = fingerprint(transaction)
+
+        transaction[0].title = transaction[0].title.lower() + '.'
+
+        self.assertEqual(expected.digest, fingerprint(transaction).digest)
+
+    def test_not_work(self):
+        generator = CWRFileGenerator(transaction_mix={'AGR': 1}, seed=1)
+
+        self.assertEqual(None,
+                         fingerprint(next(generator.transactions('AGR', 1))))
+
+
+class TestFingerprintIndex(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+
+        self._first = self._write('CW160001SYN_000.V21', 1)
+        self._copy = self._write('CW160002SYN_000.V21', 1)
+        self._other = self._write('CW160003SYN_000.V21', 2)
+
+        self._index = FingerprintIndex(os.path.join(self._directory,
+                                                    'works.db'))
+
+    def tearDown(self):
+        self._index.close()
+        shutil.rmtree(self._directory)
+
+    def _write(self, name, seed):
+        generator = CWRFileGenerator(
+            transaction_mix={'NWR': 1}, seed=seed,
+            creation_date_time=datetime.datetime(2016, 1, 2))
+        path = os.path.join(self._directory, name)
+        generator.write_file(path, 3)
+        return path
+
+    def test_check_file(self):
+        self._index.add_file(self._first)
+
+        matches = self._index.check_file(self._copy)
+
+        self.assertEqual(3, len(matches))
+        self.assertTrue(all(match.duplicate for match in matches))
+        self.assertEqual([0, 1, 2], [match.transaction_sequence_n
+                                     for match in matches])
+        self.assertEqual([], self._index.check_file(self._other))
+        self.assertEqual([], self._index.check_file(self._first))
+
+    def test_conflict(self):
+        self._index.add_file(self._first)
+
+        work = fingerprint(_transactions()[0])
+        changed = work._replace(digest='changed')
+
+        matches = self._index.matches(changed)
+
+        self.assertEqual(1, len(matches))
+        self.assertFalse(matches[0].duplicate)
+
+    def test_duplicates(self):
+        for path in (self._first, self._copy, self._other):
+            self._index.add_file(path)
+
+        groups = self._index.duplicates()
+
+        self.assertEqual(3, len(groups))
+        for group in groups:
+            self.assertEqual([os.path.abspath(self._first),
+                              os.path.abspath(self._copy)],
+                             [path for path, sequence_n in group])
+
+    def test_incremental(self):
+        self.assertTrue(self._index.add_file(self._first))
+        self.assertFalse(self._index.add_file(self._first))
+
+        self._index.remove_file(self._first)
+
+        self.assertEqual([], self._index.paths())
+        self.assertEqual([], self._index.check_file(self._copy))
+
+    def test_touched(self):
+        self.assertTrue(self._index.add_file(self._first))
+
+        stat = os.stat(self._first)
+        os.utime(self._first, ns=(stat.st_atime_ns,
+                                  stat.st_mtime_ns + 1000000000))
+
+        self.assertFalse(self._index.add_file(self._first))
+
+    def test_check_batch(self):
+        for path in (self._first, self._other):
+            self._index.add_file(path)
+
+        works = [fingerprint(transaction)
+                 for transaction in _transactions(1) + _transactions(2)]
+        works.append(works[0]._replace(digest='changed'))
+
+        expected = [match for work in works
+                    for match in self._index.matches(work)]
+
+        self.assertEqual(7, len(expected))
+        self.assertEqual(expected, list(self._index.check(works)))
+
+    def test_decoder_reused(self):
+        with mock.patch('cwr.utils.fingerprint.default_stream_decoder',
+                        wraps=default_stream_decoder) as factory:
+            self._index.add_file(self._first)
+            self._index.add_file(self._other)
+            self._index.check_file(self._copy)
+
+        self.assertEqual(1, factory.call_count)
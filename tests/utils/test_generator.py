@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import io
+import os
+import tempfile
+import unittest
+
+from cwr.interested_party import PublisherRecord, WriterRecord
+from cwr.parser.decoder.file import default_file_decoder
+from cwr.utils.generator import CWRFileGenerator
+from cwr.validation.engine import ValidationEngine
+
+"""
+Synthetic CWR files generator tests.
+
+The following cases are tested:
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _generator(version='2.1', **kwargs):
+    return CWRFileGenerator(version, seed=1,
+                            creation_date_time=datetime.datetime(2016, 1, 2),
+                            **kwargs)
+
+
+class TestCWRFileGenerator(unittest.TestCase):
+    def _decode(self, generator, transactions):
+        output = io.StringIO()
+        trailer = generator.write(output, transactions)
+
+        data = {'filename': generator.filename(),
+                'contents': output.getvalue()}
+
+        return trailer, default_file_decoder('layout').decode(data)
+
+    def test_valid_v21(self):
+        generator = _generator(transaction_mix={'AGR': 1, 'NWR': 2},
+                               depth=2)
+
+        trailer, cwr_file = self._decode(generator, 10)
+        transmission = cwr_file.transmission
+
+        self.assertEqual('CW160001SYN_000.V21', generator.filename())
+        self.assertEqual(2, trailer.group_count)
+        self.assertEqual(10, trailer.transaction_count)
+
+        groups = transmission.groups
+        self.assertEqual('AGR', groups[0].group_header.transaction_type)
+        self.assertEqual(3, len(groups[0].transactions))
+        self.assertEqual('NWR', groups[1].group_header.transaction_type)
+        self.assertEqual(7, len(groups[1].transactions))
+
+        # Headers and trailers of the transmission and groups are included
+        records = 2 + 2 * len(groups) + sum(
+            len(transaction) for group in groups
+            for transaction in group.transactions)
+        self.assertEqual(records, trailer.record_count)
+
+    def test_valid_v22(self):
+        generator = _generator('2.2', transaction_mix={'REV': 1, 'ISW': 1})
+
+        trailer, cwr_file = self._decode(generator, 4)
+        transmission = cwr_file.transmission
+
+        self.assertEqual('2.2', transmission.header.version_type)
+        self.assertEqual('02.20', transmission.groups[0].group_header
+                         .version_number)
+        self.assertEqual('ISW', transmission.groups[1].transactions[0][0]
+                         .record_type)
+
+    def test_depth(self):
+        generator = _generator(parties=3, depth=4)
+
+        transaction = next(generator.transactions('NWR', 1))
+
+        publishers = [record for record in transaction
+                      if isinstance(record, PublisherRecord)]
+        self.assertEqual(12, len(publishers))
+        self.assertEqual(['E', 'SE', 'SE', 'SE'],
+                         [record.publisher_type for record in publishers[:4]])
+
+        territories = [record for record in transaction
+                       if record.record_type == 'SPT']
+        self.assertEqual(48, len(territories))
+
+    def test_validates(self):
+        engine = ValidationEngine()
+
+        for depth in (2, 4):
+            generator = _generator(
+                transaction_mix={'AGR': 1, 'NWR': 1, 'REV': 1}, parties=3,
+                depth=depth)
+
+            cwr_file = self._decode(generator, 200)[1]
+
+            self.assertEqual([], engine.validate_file(cwr_file))
+
+    def test_shares(self):
+        generator = _generator(parties=3)
+
+        for transaction in generator.transactions('NWR', 5):
+            parties = [record for record in transaction
+                       if isinstance(record, (PublisherRecord, WriterRecord))]
+
+            self.assertAlmostEqual(
+                100, sum(record.pr_ownership_share for record in parties))
+            self.assertAlmostEqual(
+                100, sum(record.mr_ownership_share for record in parties))
+
+    def test_seed(self):
+        first = io.StringIO()
+        second = io.StringIO()
+
+        _generator().write(first, 5)
+        _generator().write(second, 5)
+
+        self.assertEqual(first.getvalue(), second.getvalue())
+
+    def test_write_file(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+
+        try:
+            trailer = _generator().write_file(path, 3)
+
+            with open(path, 'rb') as f:
+                lines = f.read().split(b'\r\n')
+        finally:
+            os.remove(path)
+
+        self.assertEqual(trailer.record_count, len(lines) - 1)
+
+    def test_invalid_transaction_type(self):
+        self.assertRaises(ValueError, CWRFileGenerator,
+                          transaction_mix={'ACK': 1})
+
+    def test_invalid_version(self):
+        self.assertRaises(ValueError, CWRFileGenerator, '3.0')
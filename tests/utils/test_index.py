@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from cwr.other import ISWCCode
+from cwr.utils.index import CWRIndex, normalize_key
+
+"""
+CWR files index tests.
+
+The following cases are tested:
+- Keys are normalized
+- ISWCs, submitter work numbers, IPI name numbers and cross references are
+  indexed
+- Only the matching transaction is parsed
+- Files are scanned again only when their contents change
+- Folders are indexed, removing the files which do not exist anymore
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _contents(submitter_work_n='KEY001'):
+    return '\n'.join([
+        'HDRPB226144593AGENCIA GRUPO MUSICAL                        '
+        '01.102013080902591120130809               ',
+        'GRHNWR0000102.100130400001  ',
+        'NWR0000000000000000WORK NAME                                      '
+        '               %-14sT012345678900000000            POP000240Y    '
+        '  ORI                                                   Y000000000'
+        '00                                                    ' %
+        submitter_work_n,
+        'SWR00000000000000011185684  A NAME                                '
+        '       YET ANOTHER NAME               C          0026058307861 050'
+        '0061 0000061 00000    0000260582865             ',
+        'XRF0000000000000002ISWT0123456789   WN',
+        'NWR0000000100000000REAL RAP                                       '
+        '               R1262                    00000000            POP000'
+        '410Y      ORI                                                   Y0'
+        '0000000000                                                     ',
+        'SPU0000000100000001014271370  MUSIC SOCIETY                       '
+        '          E          005101734040102328568410061 0500061 1000061 1'
+        '0000   0000000000000                            OS ',
+        'GRT000010000000200000007   0000000000',
+        'TRL000010000000200000009'])
+
+
+class TestNormalizeKey(unittest.TestCase):
+    def test_iswc(self):
+        self.assertEqual('T0345246801',
+                         normalize_key('iswc', 'T-034.524.680-1'))
+        self.assertEqual('T0000001231',
+                         normalize_key('iswc', ISWCCode(123, 1)))
+
+    def test_ipi_name_n(self):
+        self.assertEqual('260583078',
+                         normalize_key('ipi_name_n', '00260583078'))
+        self.assertEqual('260583078', normalize_key('ipi_name_n', 260583078))
+
+    def test_other(self):
+        self.assertEqual('KEY001', normalize_key('submitter_work_n',
+                                                 ' key001 '))
+
+
+class TestCWRIndex(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        self._path = os.path.join(self._directory, 'CW130001SND_RCV.V21')
+        self._write(self._path, _contents())
+
+        self._index = CWRIndex(os.path.join(self._directory, 'index.db'))
+
+    def tearDown(self):
+        self._index.close()
+        shutil.rmtree(self._directory)
+
+    @staticmethod
+    def _write(path, contents):
+        with open(path, 'w', encoding='latin-1') as f:
+            f.write(contents)
+
+    def test_find(self):
+        self._index.add_file(self._path)
+
+        first = self._index.find('iswc', 'T-012.345.678-9')
+        second = self._index.find('ipi_name_n', 510173404)
+
+        self.assertEqual(1, len(first))
+        self.assertEqual(os.path.abspath(self._path), first[0].path)
+        self.assertEqual(0, first[0].transaction_sequence_n)
+        self.assertEqual(first,
+                         self._index.find('submitter_work_n', 'KEY001'))
+        self.assertEqual(first, self._index.find('ipi_name_n', 260583078))
+        self.assertEqual(first,
+                         self._index.find('xrf_identifier', 'T0123456789'))
+
+        self.assertEqual(1, second[0].transaction_sequence_n)
+        self.assertEqual([], self._index.find('iswc', 'T0000000000'))
+        self.assertRaises(ValueError, self._index.find, 'title', 'WORK')
+
+    def test_transactions(self):
+        self._index.add_file(self._path)
+
+        result = self._index.transactions('submitter_work_n', 'R1262')
+
+        self.assertEqual(1, len(result))
+        entry, transaction = result[0]
+        self.assertEqual(['NWR', 'SPU'],
+                         [record.record_type for record in transaction])
+        self.assertEqual('REAL RAP', transaction[0].title)
+
+    def test_incremental(self):
+        self.assertTrue(self._index.add_file(self._path))
+        self.assertFalse(self._index.add_file(self._path))
+
+        # Same contents with a new modification time
+        os.utime(self._path, (0, 0))
+        self.assertFalse(self._index.add_file(self._path))
+
+        self._write(self._path, _contents('KEY002'))
+        self.assertTrue(self._index.add_file(self._path))
+
+        self.assertEqual([], self._index.find('submitter_work_n', 'KEY001'))
+        self.assertEqual(1, len(self._index.find('submitter_work_n',
+                                                 'KEY002')))
+
+    def test_directory(self):
+        other = os.path.join(self._directory, 'CW130002SND_RCV.V21')
+        self._write(other, _contents())
+
+        self.assertEqual(2, self._index.add_directory(self._directory))
+        self.assertEqual(2, len(self._index.find('iswc', 'T0123456789')))
+
+        os.remove(other)
+        self.assertEqual(0, self._index.add_directory(self._directory))
+        self.assertEqual([os.path.abspath(self._path)], self._index.paths())
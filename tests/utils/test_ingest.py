@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from cwr.utils.generator import CWRFileGenerator
+from cwr.utils.ingest import CallbackSink, CWRSink, JSONSink, \
+    ValidationSink, find_files, ingest, main
+
+"""
+Concurrent ingestion tests.
+
+The following cases are tested:
+- Files are found on folders, by glob and by path
+- The parsed files are sent to the sinks
+- Files which can't be encoded as JSON leave no output behind
+- The parsed files can be validated
+- Files failing do not stop the ingestion
+- The console command stores a report and exits with an error code when a
+  file fails
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestIngest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        self._output = tempfile.mkdtemp()
+
+        self._paths = []
+        for sequence_n in (1, 2):
+            generator = CWRFileGenerator(
+                transaction_mix={'NWR': 1}, seed=sequence_n,
+                creation_date_time=datetime.datetime(2016, 1, 2))
+            path = os.path.join(self._directory,
+                                generator.filename(sequence_n))
+            generator.write_file(path, 3)
+            self._paths.append(path)
+
+        self._invalid = os.path.join(self._directory, 'CW160003SYN_000.V21')
+        with open(self._invalid, 'w') as f:
+            f.write('NOT A CWR FILE')
+
+        with open(os.path.join(self._directory, 'README.txt'), 'w') as f:
+            f.write('Not ingested')
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+        shutil.rmtree(self._output)
+
+    def test_find_files(self):
+        expected = sorted(self._paths + [self._invalid])
+
+        self.assertEqual(expected, find_files([self._directory]))
+        self.assertEqual(expected, find_files(
+            [os.path.join(self._directory, 'CW*')]))
+        self.assertEqual([self._paths[0]], find_files([self._paths[0]]))
+
+    def test_callback(self):
+        received = []
+        sink = CallbackSink(
+            lambda cwr_file, path: received.append(
+                (path, cwr_file.tag.sequence_n)) or path)
+
+        results = list(ingest(self._paths + [self._invalid], sink, 1))
+
+        self.assertEqual([(self._paths[0], 1), (self._paths[1], 2)],
+                         sorted(received))
+
+        errors = [result for result in results if result.error]
+        self.assertEqual(1, len(errors))
+        self.assertEqual(self._invalid, errors[0].path)
+        self.assertEqual(sorted(self._paths),
+                         sorted(result.output for result in results
+                                if not result.error))
+
+    def test_cwr_sink(self):
+        results = list(ingest(self._paths, CWRSink(self._output), 1))
+
+        for result in results:
+            with open(result.path, 'rb') as f:
+                expected = f.read()
+            with open(result.output, 'rb') as f:
+                self.assertEqual(expected, f.read())
+
+    def test_json_sink(self):
+        results = list(ingest(self._paths[:1], JSONSink(self._output), 1))
+
+        with open(results[0].output) as f:
+            data = json.load(f)
+
+        self.assertEqual('HDR', data['transmission']['header']['record_type'])
+
+    def test_json_sink_failed(self):
+        sink = JSONSink(self._output)
+
+        self.assertRaises(Exception, sink.write, object(), self._paths[0])
+        self.assertEqual([], os.listdir(self._output))
+
+    def test_validation_sink(self):
+        results = list(ingest(self._paths[:1],
+                              ValidationSink(CWRSink(self._output)), 1))
+
+        self.assertEqual({'rejected_transactions': 0, 'rejected_groups': 0,
+                          'rejected_file': False, 'messages': 0,
+                          'output': os.path.join(
+                              self._output,
+                              os.path.basename(self._paths[0]))},
+                         results[0].output)
+
+    def test_main(self):
+        report = os.path.join(self._output, 'report.json')
+
+        code = main([self._directory, '--processes', '1', '--quiet',
+                     '--report', report])
+
+        with open(report) as f:
+            data = json.load(f)
+
+        self.assertEqual(1, code)
+        self.assertEqual(3, len(data))
+        self.assertEqual(1, len([entry for entry in data
+                                 if entry['error'] is not None]))
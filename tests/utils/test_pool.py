@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from cwr.utils.pool import default_window, imap_unordered
+
+"""
+Pool helpers tests.
+
+The following cases are tested:
+- Every task is run, and its result returned
+- No more tasks than the window are pending at the same time
+- Errors on a task are raised when its result is returned
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+def _square(value):
+    return value * value
+
+
+def _fail(value):
+    raise ValueError(value)
+
+
+class TestImapUnordered(unittest.TestCase):
+    def test_results(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            result = imap_unordered(executor, _square,
+                                    ((value,) for value in range(20)), 3)
+
+            self.assertEqual([value * value for value in range(20)],
+                             sorted(result))
+
+    def test_window(self):
+        submitted = []
+
+        def arguments():
+            for value in range(20):
+                submitted.append(value)
+                yield (value,)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            returned = 0
+            for _ in imap_unordered(executor, _square, arguments(), 3):
+                returned += 1
+                self.assertTrue(len(submitted) - returned < 3)
+
+        self.assertEqual(20, returned)
+
+    def test_error(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            result = imap_unordered(executor, _fail, [(1,)], 3)
+
+            self.assertRaises(ValueError, list, result)
+
+    def test_default_window(self):
+        self.assertEqual(6, default_window(3))
+        self.assertTrue(default_window() >= 2)
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from cwr.agreement import AgreementTerritoryRecord
+from cwr.interested_party import IPTerritoryOfControlRecord
+from cwr.utils.territory import TerritoryEngine, WORLD
+
+"""
+Territory coverage tests.
+
+The following cases are tested:
+- Countries and groups are expanded into bitsets
+- The World contains all the countries
+- The TIS hierarchy is used by default
+- Groups without members are unresolved, and only match themselves
+- Inclusions and exclusions are applied for each interested party
+- The coverage of several transactions is the union of their coverages
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+# Spain, Portugal, France and a group containing them
+_HIERARCHY = {2120: [724, 620, 2121], 2121: [250]}
+
+
+def _territory(record_type, ip_n, code, indicator='I'):
+    return IPTerritoryOfControlRecord(record_type=record_type, ip_n=ip_n,
+                                      tis_numeric_code=code,
+                                      inclusion_exclusion_indicator=indicator)
+
+
+class TestTerritoryEngine(unittest.TestCase):
+    def setUp(self):
+        self._engine = TerritoryEngine(hierarchy=_HIERARCHY)
+
+    def test_default_codes(self):
+        engine = TerritoryEngine()
+
+        self.assertTrue(724 in engine.countries)
+        self.assertFalse(WORLD in engine.countries)
+        self.assertEqual([], engine.unresolved)
+        self.assertEqual(engine.countries, engine.codes(engine.mask(WORLD)))
+
+    def test_default_hierarchy(self):
+        engine = TerritoryEngine()
+
+        # Spain is in Europe and in the European Union
+        self.assertTrue(engine.contains(2120, 724))
+        self.assertTrue(engine.contains(2123, 724))
+        self.assertTrue(engine.contains(2120, 2122))
+        self.assertTrue(engine.contains(WORLD, 2100))
+        self.assertFalse(engine.contains(2100, 724))
+
+    def test_unresolved(self):
+        engine = TerritoryEngine(hierarchy={})
+        transaction = [_territory('SPT', 'A', 2120)]
+
+        self.assertTrue(2120 in engine.unresolved)
+        self.assertEqual([2120], engine.codes(engine.mask(2120)))
+        self.assertTrue(engine.covers(transaction, engine.mask(2120)))
+        self.assertTrue(engine.covers(transaction, engine.mask(WORLD)))
+        self.assertFalse(engine.covers(transaction, engine.mask(724)))
+        self.assertFalse(engine.covers(transaction, engine.mask(2121)))
+
+    def test_hierarchy(self):
+        self.assertEqual([250, 620, 724],
+                         self._engine.codes(self._engine.mask(2120)))
+        self.assertTrue(self._engine.contains(2120, 2121))
+        self.assertTrue(self._engine.contains(WORLD, 2120))
+        self.assertFalse(self._engine.contains(2121, 2120))
+        self.assertFalse(2120 in self._engine.unresolved)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, self._engine.mask, 9999)
+        self.assertRaises(ValueError, TerritoryEngine,
+                          hierarchy={2120: [2121], 2121: [2120]})
+
+    def test_exclusion(self):
+        transaction = [_territory('SPT', 'A', WORLD),
+                       _territory('SPT', 'A', 2120, 'E'),
+                       _territory('SWT', 'B', 620)]
+
+        mask = self._engine.transaction_mask(transaction)
+
+        self.assertTrue(self._engine.covers(transaction,
+                                            self._engine.mask(620)))
+        self.assertFalse(self._engine.covers(transaction,
+                                             self._engine.mask(724)))
+        # Spain and France are excluded, Portugal is included again
+        self.assertEqual(
+            sorted(set(self._engine.countries) - set([250, 724])),
+            [code for code in self._engine.codes(mask)
+             if code in self._engine.countries])
+
+    def test_coverage(self):
+        transactions = [
+            [AgreementTerritoryRecord(record_type='TER',
+                                      tis_numeric_code=2121,
+                                      inclusion_exclusion_indicator='I')],
+            [_territory('SPT', 'A', 724)]]
+
+        self.assertEqual([250, 724], self._engine.codes(
+            self._engine.coverage(transactions)))
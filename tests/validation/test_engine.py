@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import io
+import unittest
+
+from cwr.parser.decoder.file import default_file_decoder, \
+    default_stream_decoder
+from cwr.interested_party import IPTerritoryOfControlRecord
+from cwr.utils.generator import CWRFileGenerator
+from cwr.validation.common import ValidationStatus
+from cwr.validation.engine import ValidationEngine, MESSAGE_FILE, \
+    MESSAGE_GROUP, MESSAGE_TRANSACTION, VALIDATION_COLLECTION, \
+    VALIDATION_GROUP_COUNT, VALIDATION_OWNERSHIP, \
+    VALIDATION_RECORD_SEQUENCE, VALIDATION_TRANSACTION_SEQUENCE, \
+    VALIDATION_TRANSMISSION_COUNT
+from cwr.validation.transaction import ValidationTransaction
+
+"""
+Validation engine tests.
+
+The following cases are tested:
+- Valid files have no messages
+- Ownership shares must add up to 100% or 0%
+- Collection shares for a territory must not exceed 100%
+- Collection shares of overlapping territories are added up for each country
+- Transaction and record sequence numbers must be continuous
+- The group and transmission trailers counts must be those of the file
+- Streamed files can be validated
+- Transactions with messages are rejected
+"""
+
+__author__ = 'Bernardo Martínez Garrido'
+__license__ = 'MIT'
+__status__ = 'Development'
+
+
+class TestValidationEngine(unittest.TestCase):
+    def setUp(self):
+        generator = CWRFileGenerator(
+            transaction_mix={'NWR': 1}, seed=1,
+            creation_date_time=datetime.datetime(2016, 1, 2))
+
+        output = io.StringIO()
+        generator.write(output, 3)
+        self._contents = output.getvalue()
+
+        self._cwr_file = default_file_decoder('layout').decode(
+            {'filename': generator.filename(), 'contents': self._contents})
+        self._group = self._cwr_file.transmission.groups[0]
+        self._transaction = self._group.transactions[0]
+
+        self._engine = ValidationEngine()
+
+    def _records(self, record_type):
+        return [record for record in self._transaction
+                if record.record_type == record_type]
+
+    def _validation_ns(self):
+        return [message.validation_n for message in
+                self._engine.validate_transaction(self._transaction)]
+
+    def test_valid(self):
+        self.assertEqual([], self._engine.validate_file(self._cwr_file))
+
+    def test_ownership(self):
+        self._records('SPU')[0].pr_ownership_share += 10
+
+        self.assertEqual([VALIDATION_OWNERSHIP], self._validation_ns())
+
+    def test_ownership_tolerance(self):
+        self._records('SPU')[0].mr_ownership_share += 0.05
+
+        self.assertEqual([], self._validation_ns())
+
+    def test_no_ownership(self):
+        for record in self._records('SPU') + self._records('SWR'):
+            record.pr_ownership_share = 0
+            record.mr_ownership_share = 0
+            record.sr_ownership_share = 0
+
+        self.assertEqual([], self._validation_ns())
+
+    def test_collection(self):
+        territory = self._records('SWT')[0]
+        territory.pr_collection_share = 80
+
+        self.assertEqual([VALIDATION_COLLECTION], self._validation_ns())
+
+        territory.inclusion_exclusion_indicator = 'E'
+
+        self.assertEqual([], self._validation_ns())
+
+    def _territories(self, *territories):
+        work = self._transaction[0]
+        transaction = [work]
+        for ip_n, code, indicator, share in territories:
+            transaction.append(IPTerritoryOfControlRecord(
+                record_type='SPT', transaction_sequence_n=0,
+                record_sequence_n=len(transaction), ip_n=ip_n,
+                tis_numeric_code=code, inclusion_exclusion_indicator=indicator,
+                pr_collection_share=share, mr_collection_share=0,
+                sr_collection_share=0))
+
+        return [(message.validation_n, message.message_text)
+                for message in self._engine.validate_transaction(transaction)]
+
+    def test_collection_overlapping(self):
+        # World and Spain, both with 60%
+        self.assertEqual(
+            [(VALIDATION_COLLECTION,
+              'PR collection shares for territory 724 add up to 120.00')],
+            self._territories(('A', 2136, 'I', 60), ('B', 724, 'I', 60)))
+
+        # Europe contains Spain, but not the United States
+        self.assertEqual(
+            [], self._territories(('A', 2120, 'I', 60), ('B', 840, 'I', 60)))
+
+    def test_collection_excluded(self):
+        # The World except Spain, and Spain
+        self.assertEqual(
+            [], self._territories(('A', 2136, 'I', 60), ('A', 724, 'E', 0),
+                                  ('B', 724, 'I', 60)))
+
+    def test_record_sequence(self):
+        self._transaction[2].record_sequence_n = 5
+
+        self.assertEqual([VALIDATION_RECORD_SEQUENCE],
+                         self._validation_ns())
+
+    def test_transaction_sequence(self):
+        for record in self._group.transactions[1]:
+            record.transaction_sequence_n = 2
+
+        result = self._engine.validate_file(self._cwr_file)
+
+        self.assertEqual(1, len(result))
+        self.assertTrue(result[0][0] is self._group.transactions[1])
+        self.assertEqual([VALIDATION_TRANSACTION_SEQUENCE],
+                         [message.validation_n for message in result[0][1]])
+
+    def test_counts(self):
+        self._group.group_trailer.record_count += 1
+        self._cwr_file.transmission.trailer.transaction_count += 1
+
+        result = self._engine.validate_file(self._cwr_file)
+
+        self.assertEqual([(MESSAGE_GROUP, VALIDATION_GROUP_COUNT),
+                          (MESSAGE_FILE, VALIDATION_TRANSMISSION_COUNT)],
+                         [(message.message_type, message.validation_n)
+                          for part, messages in result
+                          for message in messages])
+
+    def test_stream(self):
+        parts = default_stream_decoder('layout').decode(
+            io.StringIO(self._contents))
+
+        self.assertEqual([], [messages for part, messages
+                              in self._engine.validate_parts(parts)
+                              if messages])
+
+
+class TestValidationTransaction(unittest.TestCase):
+    def setUp(self):
+        generator = CWRFileGenerator(transaction_mix={'NWR': 1}, seed=1)
+        self._transaction = next(generator.transactions('NWR', 1))
+
+        self._validation = ValidationTransaction({})
+
+    def test_accepted(self):
+        status = self._validation.validate(self._transaction)
+
+        self.assertTrue(isinstance(status, ValidationStatus))
+        self.assertEqual('AS', status.code)
+
+    def test_rejected(self):
+        self._transaction[1].pr_ownership_share = 90
+
+        status = self._validation.validate(self._transaction)
+
+        self.assertEqual('RJ', status.code)
+        self.assertEqual(MESSAGE_TRANSACTION, status.message[0].message_type)
@@ -2,7 +2,6 @@
 import codecs
 import time
 import logging
-import os
 
 from cwr.parser.decoder.file import default_file_decoder
 from cwr.utils.printer import CWRPrinter
@@ -40,13 +39,9 @@ if __name__ == '__main__':
 
     decoder = default_file_decoder()
 
-    data = {}
-    data['filename'] = os.path.basename(path)
-    data['contents'] = codecs.open(path, 'r', 'latin-1').read()
-
-    start = time.clock()
-    data = decoder.decode(data)
-    end = time.clock()
+    start = time.perf_counter()
+    data = decoder.decode_file(path)
+    end = time.perf_counter()
     time_parse = (end - start)
 
     print('Parsed the file in %s seconds' % time_parse)